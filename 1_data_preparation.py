@@ -1,30 +1,52 @@
 import pandas as pd
 import json
+import os
 import numpy as np
 from datetime import datetime, timedelta
 import random
 
-def generate_sample_data():
+DATA_DIR = 'data'
+
+# Base row counts at scale 1
+BASE_CUSTOMERS = 500
+BASE_TXN_CUSTOMERS = 400
+BASE_LOANS = 300
+BASE_CREDIT_CARDS = 400
+BASE_SUPPORT_TICKETS = 250
+
+BRANCH_CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune', 'Ahmedabad']
+
+def dataset_rng(dataset, seed=None):
     """
-    Generate sample datasets for the banking system.
-    This creates realistic sample data matching the schema.
+    Independent random stream per dataset, so each dataset can be
+    generated on its own (and in parallel) and still be reproducible
+    for a given seed. seed=None gives fresh data on every run.
     """
-    
-    # 1. Generate Customers Dataset
+    return random.Random(None if seed is None else f"{seed}:{dataset}")
+
+def customer_count(scale=1):
+    return BASE_CUSTOMERS * scale
+
+def generate_customers(data_dir=DATA_DIR, seed=None, scale=1, now=None):
+    """
+    1. Generate Customers Dataset
+    """
+    rng = dataset_rng('customers', seed)
+    now = now or datetime.now()
     print("Generating customers data...")
     cities = ['Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune', 'Ahmedabad']
     account_types = ['Savings', 'Current', 'Salary', 'Fixed Deposit']
     genders = ['M', 'F']
     
     customers_data = []
-    for i in range(1, 501):  # 500 customers
+    for i in range(1, customer_count(scale) + 1):  # 500 customers per scale unit
         customer_id = f'CUST{str(i).zfill(5)}'
         name = f'Customer {i}'
-        gender = random.choice(genders)
-        age = random.randint(18, 75)
-        city = random.choice(cities)
-        account_type = random.choice(account_types)
-        join_date = (datetime.now() - timedelta(days=random.randint(1, 1825))).strftime('%Y-%m-%d')
+        gender = rng.choice(genders)
+        age = rng.randint(18, 75)
+        city = rng.choice(cities)
+        account_type = rng.choice(account_types)
+        join_date = (now - timedelta(days=rng.randint(1, 1825))).strftime('%Y-%m-%d')
         
         customers_data.append({
             'customer_id': customer_id,
@@ -37,15 +59,24 @@ def generate_sample_data():
         })
     
     customers_df = pd.DataFrame(customers_data)
-    customers_df.to_csv('data/customers.csv', index=False)
+    customers_df.to_csv(os.path.join(data_dir, 'customers.csv'), index=False)
     print(f"✓ Created customers.csv with {len(customers_df)} records")
-    
-    # 2. Generate Accounts Dataset
+
+def customer_ids(scale=1):
+    """Customer IDs in the same format generate_customers writes."""
+    return [f'CUST{str(i).zfill(5)}' for i in range(1, customer_count(scale) + 1)]
+
+def generate_accounts(data_dir=DATA_DIR, seed=None, scale=1, now=None):
+    """
+    2. Generate Accounts Dataset
+    """
+    rng = dataset_rng('accounts', seed)
+    now = now or datetime.now()
     print("Generating accounts data...")
     accounts_data = []
-    for customer_id in customers_df['customer_id']:
-        account_balance = round(random.uniform(1000, 500000), 2)
-        last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    for customer_id in customer_ids(scale):
+        account_balance = round(rng.uniform(1000, 500000), 2)
+        last_updated = now.strftime('%Y-%m-%d %H:%M:%S')
         
         accounts_data.append({
             'customer_id': customer_id,
@@ -54,10 +85,15 @@ def generate_sample_data():
         })
     
     accounts_df = pd.DataFrame(accounts_data)
-    accounts_df.to_csv('data/accounts.csv', index=False)
+    accounts_df.to_csv(os.path.join(data_dir, 'accounts.csv'), index=False)
     print(f"✓ Created accounts.csv with {len(accounts_df)} records")
-    
-    # 3. Generate Transactions Dataset
+
+def generate_transactions(data_dir=DATA_DIR, seed=None, scale=1, now=None):
+    """
+    3. Generate Transactions Dataset
+    """
+    rng = dataset_rng('transactions', seed)
+    now = now or datetime.now()
     print("Generating transactions data...")
     txn_types = ['deposit', 'withdrawal', 'transfer', 'online purchase', 'ATM withdrawal', 'online fraud']
     statuses = ['success', 'failed']
@@ -65,25 +101,25 @@ def generate_sample_data():
     transactions_data = []
     txn_count = 0
     
-    for customer_id in customers_df['customer_id'].sample(n=400):  # 400 customers have transactions
-        num_transactions = random.randint(5, 30)
+    for customer_id in rng.sample(customer_ids(scale), BASE_TXN_CUSTOMERS * scale):  # 400 customers have transactions
+        num_transactions = rng.randint(5, 30)
         
         for _ in range(num_transactions):
             txn_count += 1
             txn_id = f'TXN{str(txn_count).zfill(7)}'
-            txn_type = random.choice(txn_types)
+            txn_type = rng.choice(txn_types)
             
             # Fraud transactions are rare and have different amounts
             if txn_type == 'online fraud':
-                amount = round(random.uniform(50000, 200000), 2)
-                status = random.choice(['success', 'failed', 'failed'])  # More likely to fail
+                amount = round(rng.uniform(50000, 200000), 2)
+                status = rng.choice(['success', 'failed', 'failed'])  # More likely to fail
             else:
-                amount = round(random.uniform(100, 50000), 2)
-                status = random.choice(statuses) if random.random() > 0.9 else 'success'
+                amount = round(rng.uniform(100, 50000), 2)
+                status = rng.choice(statuses) if rng.random() > 0.9 else 'success'
             
-            txn_time = (datetime.now() - timedelta(days=random.randint(1, 365), 
-                                                   hours=random.randint(0, 23),
-                                                   minutes=random.randint(0, 59))).strftime('%Y-%m-%d %H:%M:%S')
+            txn_time = (now - timedelta(days=rng.randint(1, 365), 
+                                                   hours=rng.randint(0, 23),
+                                                   minutes=rng.randint(0, 59))).strftime('%Y-%m-%d %H:%M:%S')
             
             transactions_data.append({
                 'txn_id': txn_id,
@@ -95,13 +131,18 @@ def generate_sample_data():
             })
     
     transactions_df = pd.DataFrame(transactions_data)
-    transactions_df.to_csv('data/transactions.csv', index=False)
+    transactions_df.to_csv(os.path.join(data_dir, 'transactions.csv'), index=False)
     print(f"✓ Created transactions.csv with {len(transactions_df)} records")
-    
-    # 4. Generate Branches Dataset
+
+def generate_branches(data_dir=DATA_DIR, seed=None, scale=1, now=None):
+    """
+    4. Generate Branches Dataset
+    """
+    rng = dataset_rng('branches', seed)
+    now = now or datetime.now()
     print("Generating branches data...")
     branches_data = []
-    branch_cities = ['Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune', 'Ahmedabad']
+    branch_cities = BRANCH_CITIES
     
     for i, city in enumerate(branch_cities, 1):
         branches_data.append({
@@ -109,73 +150,91 @@ def generate_sample_data():
             'Branch_Name': f'{city} Main Branch',
             'City': city,
             'Manager_Name': f'Manager {i}',
-            'Total_Employees': random.randint(15, 50),
-            'Branch_Revenue': round(random.uniform(5000000, 20000000), 2),
-            'Opening_Date': (datetime.now() - timedelta(days=random.randint(365, 3650))).strftime('%Y-%m-%d'),
-            'Performance_Rating': random.randint(3, 5)
+            'Total_Employees': rng.randint(15, 50),
+            'Branch_Revenue': round(rng.uniform(5000000, 20000000), 2),
+            'Opening_Date': (now - timedelta(days=rng.randint(365, 3650))).strftime('%Y-%m-%d'),
+            'Performance_Rating': rng.randint(3, 5)
         })
     
-    with open('data/branches.json', 'w') as f:
+    with open(os.path.join(data_dir, 'branches.json'), 'w') as f:
         json.dump(branches_data, f, indent=2)
     print(f"✓ Created branches.json with {len(branches_data)} records")
-    
-    # 5. Generate Loans Dataset
+
+def generate_loans(data_dir=DATA_DIR, seed=None, scale=1, now=None):
+    """
+    5. Generate Loans Dataset
+    """
+    rng = dataset_rng('loans', seed)
+    now = now or datetime.now()
+    branch_cities = BRANCH_CITIES
     print("Generating loans data...")
     loan_types = ['Personal', 'Home', 'Auto', 'Business', 'Education']
     loan_statuses = ['Active', 'Closed', 'Approved']
     
     loans_data = []
-    for i in range(1, 301):  # 300 loans
-        customer_id_num = random.randint(1, 500)
+    for i in range(1, BASE_LOANS * scale + 1):  # 300 loans per scale unit
+        customer_id_num = rng.randint(1, customer_count(scale))
         loans_data.append({
             'Loan_ID': i,
             'Customer_ID': customer_id_num,
             'Account_ID': customer_id_num,
-            'Branch': random.choice(branch_cities),
-            'Loan_Type': random.choice(loan_types),
-            'Loan_Amount': random.randint(50000, 5000000),
-            'Interest_Rate': round(random.uniform(7.5, 15.0), 2),
-            'Loan_Term_Months': random.choice([12, 24, 36, 48, 60, 84, 120, 180, 240]),
-            'Start_Date': (datetime.now() - timedelta(days=random.randint(1, 730))).strftime('%Y-%m-%d'),
-            'End_Date': (datetime.now() + timedelta(days=random.randint(365, 3650))).strftime('%Y-%m-%d'),
-            'Loan_Status': random.choice(loan_statuses)
+            'Branch': rng.choice(branch_cities),
+            'Loan_Type': rng.choice(loan_types),
+            'Loan_Amount': rng.randint(50000, 5000000),
+            'Interest_Rate': round(rng.uniform(7.5, 15.0), 2),
+            'Loan_Term_Months': rng.choice([12, 24, 36, 48, 60, 84, 120, 180, 240]),
+            'Start_Date': (now - timedelta(days=rng.randint(1, 730))).strftime('%Y-%m-%d'),
+            'End_Date': (now + timedelta(days=rng.randint(365, 3650))).strftime('%Y-%m-%d'),
+            'Loan_Status': rng.choice(loan_statuses)
         })
     
-    with open('data/loans.json', 'w') as f:
+    with open(os.path.join(data_dir, 'loans.json'), 'w') as f:
         json.dump(loans_data, f, indent=2)
     print(f"✓ Created loans.json with {len(loans_data)} records")
-    
-    # 6. Generate Credit Cards Dataset
+
+def generate_credit_cards(data_dir=DATA_DIR, seed=None, scale=1, now=None):
+    """
+    6. Generate Credit Cards Dataset
+    """
+    rng = dataset_rng('credit_cards', seed)
+    now = now or datetime.now()
+    branch_cities = BRANCH_CITIES
     print("Generating credit cards data...")
     card_types = ['Silver', 'Gold', 'Platinum', 'Business']
     card_networks = ['Visa', 'MasterCard', 'RuPay', 'Amex']
     card_statuses = ['Active', 'Expired', 'Blocked']
     
     credit_cards_data = []
-    for i in range(1, 401):  # 400 credit cards
-        customer_id_num = random.randint(1, 500)
-        issued_date = datetime.now() - timedelta(days=random.randint(1, 1825))
+    for i in range(1, BASE_CREDIT_CARDS * scale + 1):  # 400 credit cards per scale unit
+        customer_id_num = rng.randint(1, customer_count(scale))
+        issued_date = now - timedelta(days=rng.randint(1, 1825))
         
         credit_cards_data.append({
             'Card_ID': i,
             'Customer_ID': customer_id_num,
             'Account_ID': customer_id_num,
-            'Branch': random.choice(branch_cities),
-            'Card_Number': ''.join([str(random.randint(0, 9)) for _ in range(16)]),
-            'Card_Type': random.choice(card_types),
-            'Card_Network': random.choice(card_networks),
-            'Credit_Limit': random.choice([50000, 100000, 200000, 500000, 1000000]),
-            'Current_Balance': round(random.uniform(0, 50000), 2),
+            'Branch': rng.choice(branch_cities),
+            'Card_Number': ''.join([str(rng.randint(0, 9)) for _ in range(16)]),
+            'Card_Type': rng.choice(card_types),
+            'Card_Network': rng.choice(card_networks),
+            'Credit_Limit': rng.choice([50000, 100000, 200000, 500000, 1000000]),
+            'Current_Balance': round(rng.uniform(0, 50000), 2),
             'Issued_Date': issued_date.strftime('%Y-%m-%d'),
             'Expiry_Date': (issued_date + timedelta(days=1825)).strftime('%Y-%m-%d'),
-            'Status': random.choice(card_statuses)
+            'Status': rng.choice(card_statuses)
         })
     
-    with open('data/credit_cards.json', 'w') as f:
+    with open(os.path.join(data_dir, 'credit_cards.json'), 'w') as f:
         json.dump(credit_cards_data, f, indent=2)
     print(f"✓ Created credit_cards.json with {len(credit_cards_data)} records")
-    
-    # 7. Generate Support Tickets Dataset
+
+def generate_support_tickets(data_dir=DATA_DIR, seed=None, scale=1, now=None):
+    """
+    7. Generate Support Tickets Dataset
+    """
+    rng = dataset_rng('support_tickets', seed)
+    now = now or datetime.now()
+    branch_cities = BRANCH_CITIES
     print("Generating support tickets data...")
     issue_categories = ['Loan Payment Delay', 'Card Not Working', 'EMI Auto-debit Failed', 
                        'Account Balance Mismatch', 'Online Banking Issue', 'ATM Card Blocked']
@@ -184,37 +243,55 @@ def generate_sample_data():
     channels = ['Email', 'Phone', 'In-person', 'Chat']
     
     support_tickets_data = []
-    for i in range(1, 251):  # 250 support tickets
-        date_opened = datetime.now() - timedelta(days=random.randint(1, 365))
-        is_closed = random.choice([True, True, False])  # 2/3 chance of being closed
+    for i in range(1, BASE_SUPPORT_TICKETS * scale + 1):  # 250 support tickets per scale unit
+        date_opened = now - timedelta(days=rng.randint(1, 365))
+        is_closed = rng.choice([True, True, False])  # 2/3 chance of being closed
         
         support_tickets_data.append({
             'Ticket_ID': f'TKT{str(i).zfill(5)}',
-            'Customer_ID': f'CUST{str(random.randint(1, 500)).zfill(5)}',
-            'Account_ID': f'CUST{str(random.randint(1, 500)).zfill(5)}',
-            'Loan_ID': random.randint(1, 300) if random.random() > 0.5 else '',
-            'Branch_Name': random.choice([f'{city} Main Branch' for city in branch_cities]),
-            'Issue_Category': random.choice(issue_categories),
+            'Customer_ID': f'CUST{str(rng.randint(1, customer_count(scale))).zfill(5)}',
+            'Account_ID': f'CUST{str(rng.randint(1, customer_count(scale))).zfill(5)}',
+            'Loan_ID': rng.randint(1, BASE_LOANS * scale) if rng.random() > 0.5 else '',
+            'Branch_Name': rng.choice([f'{city} Main Branch' for city in branch_cities]),
+            'Issue_Category': rng.choice(issue_categories),
             'Description': f'Issue description for ticket {i}',
             'Date_Opened': date_opened.strftime('%Y-%m-%d'),
-            'Date_Closed': (date_opened + timedelta(days=random.randint(1, 30))).strftime('%Y-%m-%d') if is_closed else '',
-            'Priority': random.choice(priorities),
-            'Status': random.choice(['Resolved', 'Closed']) if is_closed else random.choice(['In Progress', 'Open']),
+            'Date_Closed': (date_opened + timedelta(days=rng.randint(1, 30))).strftime('%Y-%m-%d') if is_closed else '',
+            'Priority': rng.choice(priorities),
+            'Status': rng.choice(['Resolved', 'Closed']) if is_closed else rng.choice(['In Progress', 'Open']),
             'Resolution_Remarks': f'Resolution remarks for ticket {i}' if is_closed else '',
-            'Support_Agent': f'Agent {random.randint(1, 20)}',
-            'Channel': random.choice(channels),
-            'Customer_Rating': random.randint(1, 5) if is_closed else ''
+            'Support_Agent': f'Agent {rng.randint(1, 20)}',
+            'Channel': rng.choice(channels),
+            'Customer_Rating': rng.randint(1, 5) if is_closed else ''
         })
     
     support_tickets_df = pd.DataFrame(support_tickets_data)
-    support_tickets_df.to_csv('data/support_tickets.csv', index=False)
+    support_tickets_df.to_csv(os.path.join(data_dir, 'support_tickets.csv'), index=False)
     print(f"✓ Created support_tickets.csv with {len(support_tickets_df)} records")
+
+# Dataset -> (generator, output file)
+DATASETS = {
+    'customers': (generate_customers, 'customers.csv'),
+    'accounts': (generate_accounts, 'accounts.csv'),
+    'transactions': (generate_transactions, 'transactions.csv'),
+    'branches': (generate_branches, 'branches.json'),
+    'loans': (generate_loans, 'loans.json'),
+    'credit_cards': (generate_credit_cards, 'credit_cards.json'),
+    'support_tickets': (generate_support_tickets, 'support_tickets.csv'),
+}
+
+def generate_sample_data(data_dir=DATA_DIR, seed=None, scale=1):
+    """
+    Generate sample datasets for the banking system.
+    This creates realistic sample data matching the schema.
+    """
+    now = datetime.now()
+    for generate, _ in DATASETS.values():
+        generate(data_dir, seed, scale, now)
     
     print("\n✅ All datasets generated successfully!")
 
 if __name__ == "__main__":
-    import os
-    
     # Create data directory if it doesn't exist
     if not os.path.exists('data'):
         os.makedirs('data')
@@ -2,191 +2,323 @@ import sqlite3
 import pandas as pd
 import json
 import os
+from branch_dimension import (
+    BRANCH_ID_SOURCES,
+    attach_branch_ids,
+    ensure_branch_id_triggers,
+    ensure_branch_indexes,
+    ensure_branch_summary_triggers,
+    rebuild_branch_summary,
+)
+from customer_keys import (
+    CUSTOMER_KEY_SOURCES,
+    CUSTOMER_KEYS_TABLE,
+    attach_customer_keys,
+    build_customer_keys,
+    ensure_customer_key_indexes,
+    ensure_customer_key_triggers,
+)
+from typed_columns import (
+    TYPED_DATE_COLUMNS,
+    attach_typed_columns,
+    ensure_typed_column_indexes,
+    ensure_typed_column_triggers,
+)
+from txn_partitions import (
+    ensure_upcoming_partitions,
+    insert_partitioned,
+    reset_partitions,
+    seal_partitions,
+)
+from txn_archive import clear_archive
+from change_log import ensure_change_capture
+from customer_segments import refresh_segments
+from ticket_sla import ensure_ticket_backlog
+from approx_analytics import build_approx
 
-def create_database():
+TABLES = ['customer_keys', 'customers', 'accounts', 'transactions', 'branches',
+          'loans', 'credit_cards', 'support_tickets', 'branch_summary',
+          'branch_loan_customers', 'transaction_archive', 'change_log', 'change_consumers',
+          'change_log_meta', 'ledger_openings', 'ledger_month_nets', 'ledger_frozen_nets',
+          'ledger_checkpoint', 'ledger_mismatches', 'ledger_runs', 'customer_segments',
+          'interest_balances', 'accrual_runs', 'ticket_open_counts', 'ticket_open_aging',
+          'ticket_sla_queue', 'approx_txn_strata', 'approx_txn_sample', 'approx_loan_months',
+          'approx_sketches']
+
+# State built from the loaded data by later runs; it no longer matches
+# once any table is reloaded, so finalize_database drops it.
+RELOAD_RESET_TABLES = ['ledger_openings', 'ledger_month_nets', 'ledger_frozen_nets',
+                       'ledger_checkpoint', 'ledger_mismatches', 'ledger_runs',
+                       'customer_segments', 'interest_balances', 'accrual_runs']
+
+DB_PATH = 'database/banking.db'
+DATA_DIR = 'data'
+
+# Declared schema per table; the loader appends into these so keys and types survive.
+# transactions is a view over monthly partitions (see txn_partitions).
+TABLE_SCHEMAS = {
+    'customers': '''
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    gender TEXT,
+    age INTEGER,
+    city TEXT,
+    account_type TEXT,
+    join_date DATE,
+    customer_key INTEGER,
+    branch_id INTEGER,
+    join_day INTEGER
+)
+''',
+    'accounts': '''
+CREATE TABLE IF NOT EXISTS accounts (
+    customer_id TEXT PRIMARY KEY,
+    account_balance REAL,
+    last_updated DATETIME,
+    customer_key INTEGER,
+    FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+)
+''',
+    'branches': '''
+CREATE TABLE IF NOT EXISTS branches (
+    Branch_ID INTEGER PRIMARY KEY,
+    Branch_Name TEXT,
+    City TEXT,
+    Manager_Name TEXT,
+    Total_Employees INTEGER,
+    Branch_Revenue REAL,
+    Opening_Date DATE,
+    Performance_Rating INTEGER
+)
+''',
+    'loans': '''
+CREATE TABLE IF NOT EXISTS loans (
+    Loan_ID INTEGER PRIMARY KEY,
+    Customer_ID INTEGER,
+    Account_ID INTEGER,
+    Branch TEXT,
+    Loan_Type TEXT,
+    Loan_Amount INTEGER,
+    Interest_Rate REAL,
+    Loan_Term_Months INTEGER,
+    Start_Date DATE,
+    End_Date DATE,
+    Loan_Status TEXT,
+    customer_key INTEGER,
+    branch_id INTEGER,
+    start_day INTEGER,
+    end_day INTEGER
+)
+''',
+    'credit_cards': '''
+CREATE TABLE IF NOT EXISTS credit_cards (
+    Card_ID INTEGER PRIMARY KEY,
+    Customer_ID INTEGER,
+    Account_ID INTEGER,
+    Branch TEXT,
+    Card_Number TEXT,
+    Card_Type TEXT,
+    Card_Network TEXT,
+    Credit_Limit INTEGER,
+    Current_Balance REAL,
+    Issued_Date DATE,
+    Expiry_Date DATE,
+    Status TEXT,
+    customer_key INTEGER,
+    branch_id INTEGER,
+    issued_day INTEGER,
+    expiry_day INTEGER
+)
+''',
+    'support_tickets': '''
+CREATE TABLE IF NOT EXISTS support_tickets (
+    Ticket_ID TEXT PRIMARY KEY,
+    Customer_ID TEXT,
+    Account_ID TEXT,
+    Loan_ID TEXT,
+    Branch_Name TEXT,
+    Issue_Category TEXT,
+    Description TEXT,
+    Date_Opened DATE,
+    Date_Closed DATE,
+    Priority TEXT,
+    Status TEXT,
+    Resolution_Remarks TEXT,
+    Support_Agent TEXT,
+    Channel TEXT,
+    Customer_Rating INTEGER,
+    customer_key INTEGER,
+    branch_id INTEGER,
+    opened_day INTEGER,
+    closed_day INTEGER
+)
+''',
+}
+
+def create_table(cursor, table_name):
+    """
+    Drop and recreate one table from its declared schema.
+    """
+    if table_name == 'transactions':
+        # Reloaded months are live again, so any archived copy would be read twice
+        reset_partitions(cursor.connection)
+        clear_archive(cursor.connection)
+        return
+    cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+    cursor.execute(CUSTOMER_KEYS_TABLE if table_name == 'customer_keys' else TABLE_SCHEMAS[table_name])
+
+def create_database(db_path=DB_PATH):
     """
     Create SQLite database and tables for the banking system.
     """
     
     # Create database directory if it doesn't exist
-    if not os.path.exists('database'):
-        os.makedirs('database')
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
     # Connect to SQLite database
-    conn = sqlite3.connect('database/banking.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     print("Creating database tables...")
     
-    # 1. Create Customers Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS customers (
-        customer_id TEXT PRIMARY KEY,
-        name TEXT NOT NULL,
-        gender TEXT,
-        age INTEGER,
-        city TEXT,
-        account_type TEXT,
-        join_date DATE
-    )
-    ''')
-    print("✓ Created customers table")
-    
-    # 2. Create Accounts Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS accounts (
-        customer_id TEXT PRIMARY KEY,
-        account_balance REAL,
-        last_updated DATETIME,
-        FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
-    )
-    ''')
-    print("✓ Created accounts table")
-    
-    # 3. Create Transactions Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS transactions (
-        txn_id TEXT PRIMARY KEY,
-        customer_id TEXT,
-        txn_type TEXT,
-        amount REAL,
-        txn_time DATETIME,
-        status TEXT,
-        FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
-    )
-    ''')
-    print("✓ Created transactions table")
-    
-    # 4. Create Branches Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS branches (
-        Branch_ID INTEGER PRIMARY KEY,
-        Branch_Name TEXT,
-        City TEXT,
-        Manager_Name TEXT,
-        Total_Employees INTEGER,
-        Branch_Revenue REAL,
-        Opening_Date DATE,
-        Performance_Rating INTEGER
-    )
-    ''')
-    print("✓ Created branches table")
-    
-    # 5. Create Loans Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS loans (
-        Loan_ID INTEGER PRIMARY KEY,
-        Customer_ID INTEGER,
-        Account_ID INTEGER,
-        Branch TEXT,
-        Loan_Type TEXT,
-        Loan_Amount INTEGER,
-        Interest_Rate REAL,
-        Loan_Term_Months INTEGER,
-        Start_Date DATE,
-        End_Date DATE,
-        Loan_Status TEXT
-    )
-    ''')
-    print("✓ Created loans table")
-    
-    # 6. Create Credit Cards Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS credit_cards (
-        Card_ID INTEGER PRIMARY KEY,
-        Customer_ID INTEGER,
-        Account_ID INTEGER,
-        Branch TEXT,
-        Card_Number TEXT,
-        Card_Type TEXT,
-        Card_Network TEXT,
-        Credit_Limit INTEGER,
-        Current_Balance REAL,
-        Issued_Date DATE,
-        Expiry_Date DATE,
-        Status TEXT
-    )
-    ''')
-    print("✓ Created credit_cards table")
-    
-    # 7. Create Support Tickets Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS support_tickets (
-        Ticket_ID TEXT PRIMARY KEY,
-        Customer_ID TEXT,
-        Account_ID TEXT,
-        Loan_ID TEXT,
-        Branch_Name TEXT,
-        Issue_Category TEXT,
-        Description TEXT,
-        Date_Opened DATE,
-        Date_Closed DATE,
-        Priority TEXT,
-        Status TEXT,
-        Resolution_Remarks TEXT,
-        Support_Agent TEXT,
-        Channel TEXT,
-        Customer_Rating INTEGER
-    )
-    ''')
-    print("✓ Created support_tickets table")
+    # Start from a clean schema so reloads keep declared keys and types
+    for table_name in TABLES:
+        if table_name != 'transactions':
+            cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+    
+    for table_name in ['customer_keys'] + list(TABLE_SCHEMAS) + ['transactions']:
+        create_table(cursor, table_name)
+        print(f"✓ Created {table_name} table")
     
     conn.commit()
     print("\n✅ All tables created successfully!")
     
     return conn
 
-def load_data_to_database(conn):
+# Table -> source file in the data directory
+DATA_FILES = {
+    'customers': 'customers.csv',
+    'accounts': 'accounts.csv',
+    'transactions': 'transactions.csv',
+    'branches': 'branches.json',
+    'loans': 'loans.json',
+    'credit_cards': 'credit_cards.json',
+    'support_tickets': 'support_tickets.csv',
+}
+
+def read_dataset(table_name, data_dir=DATA_DIR):
+    """
+    Read one generated dataset into a DataFrame.
+    """
+    path = os.path.join(data_dir, DATA_FILES[table_name])
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            return pd.DataFrame(json.load(f))
+    df = pd.read_csv(path)
+    if table_name == 'support_tickets':
+        df['Loan_ID'] = df['Loan_ID'].astype('Int64')
+    return df
+
+def prepare_table(table_name, customer_keys_df, branches_df, data_dir=DATA_DIR):
+    """
+    Read a dataset and attach its customer keys, branch ids and typed
+    date columns, ready to load.
+    """
+    if table_name == 'customer_keys':
+        return customer_keys_df
+    df = read_dataset(table_name, data_dir)
+    if table_name in CUSTOMER_KEY_SOURCES:
+        df = attach_customer_keys(df, table_name, customer_keys_df)
+    if table_name in BRANCH_ID_SOURCES:
+        df = attach_branch_ids(df, table_name, branches_df)
+    if table_name in TYPED_DATE_COLUMNS:
+        df = attach_typed_columns(df, table_name)
+    return df
+
+def load_table(conn, table_name, df):
+    """
+    Append a prepared dataset; transactions are routed to month partitions.
+    """
+    if table_name == 'transactions':
+        insert_partitioned(conn, df)
+    else:
+        df.to_sql(table_name, conn, if_exists='append', index=False)
+
+def load_data_to_database(conn, data_dir=DATA_DIR):
     """
     Load data from CSV and JSON files into the database.
     """
     
     print("\nLoading data into database...")
     
-    # 1. Load Customers
-    customers_df = pd.read_csv('data/customers.csv')
-    customers_df.to_sql('customers', conn, if_exists='replace', index=False)
-    print(f"✓ Loaded {len(customers_df)} customers")
-    
-    # 2. Load Accounts
-    accounts_df = pd.read_csv('data/accounts.csv')
-    accounts_df.to_sql('accounts', conn, if_exists='replace', index=False)
-    print(f"✓ Loaded {len(accounts_df)} accounts")
-    
-    # 3. Load Transactions
-    transactions_df = pd.read_csv('data/transactions.csv')
-    transactions_df.to_sql('transactions', conn, if_exists='replace', index=False)
-    print(f"✓ Loaded {len(transactions_df)} transactions")
-    
-    # 4. Load Branches
-    with open('data/branches.json', 'r') as f:
-        branches_data = json.load(f)
-    branches_df = pd.DataFrame(branches_data)
-    branches_df.to_sql('branches', conn, if_exists='replace', index=False)
+    # 0. Assign Customer Surrogate Keys
+    customer_keys_df = build_customer_keys(read_dataset('customers', data_dir))
+    customer_keys_df.to_sql('customer_keys', conn, if_exists='append', index=False)
+    print(f"✓ Assigned {len(customer_keys_df)} customer keys")
+    
+    # 1. Load Branches
+    branches_df = read_dataset('branches', data_dir)
+    branches_df.to_sql('branches', conn, if_exists='append', index=False)
     print(f"✓ Loaded {len(branches_df)} branches")
     
-    # 5. Load Loans
-    with open('data/loans.json', 'r') as f:
-        loans_data = json.load(f)
-    loans_df = pd.DataFrame(loans_data)
-    loans_df.to_sql('loans', conn, if_exists='replace', index=False)
-    print(f"✓ Loaded {len(loans_df)} loans")
-    
-    # 6. Load Credit Cards
-    with open('data/credit_cards.json', 'r') as f:
-        credit_cards_data = json.load(f)
-    credit_cards_df = pd.DataFrame(credit_cards_data)
-    credit_cards_df.to_sql('credit_cards', conn, if_exists='replace', index=False)
-    print(f"✓ Loaded {len(credit_cards_df)} credit cards")
-    
-    # 7. Load Support Tickets
-    support_tickets_df = pd.read_csv('data/support_tickets.csv')
-    support_tickets_df.to_sql('support_tickets', conn, if_exists='replace', index=False)
-    print(f"✓ Loaded {len(support_tickets_df)} support tickets")
+    # 2-7. Load Customers, Accounts, Transactions, Loans, Credit Cards, Support Tickets
+    for table_name in ['customers', 'accounts', 'transactions', 'loans', 'credit_cards', 'support_tickets']:
+        df = prepare_table(table_name, customer_keys_df, branches_df, data_dir)
+        load_table(conn, table_name, df)
+        print(f"✓ Loaded {len(df)} {table_name.replace('_', ' ')}")
     
-    conn.commit()
+    finalize_database(conn)
     print("\n✅ All data loaded successfully!")
 
+def finalize_database(conn):
+    """
+    Indexes, triggers and roll-ups that need every table loaded.
+    """
+    # Reconciliation state, RFM scores and accrued interest from the previous data start over
+    for table_name in RELOAD_RESET_TABLES:
+        conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+    
+    # 8. Index and maintain customer keys for joins and point lookups
+    ensure_customer_key_indexes(conn)
+    ensure_customer_key_triggers(conn)
+    print("✓ Created customer key indexes and triggers")
+    
+    # 9. Build branch roll-ups and keep them current from here on
+    ensure_branch_indexes(conn)
+    ensure_branch_id_triggers(conn)
+    rebuild_branch_summary(conn)
+    ensure_branch_summary_triggers(conn)
+    print("✓ Built branch summary and branch triggers")
+    
+    # 10. Index and maintain the integer date columns used by range filters
+    ensure_typed_column_indexes(conn)
+    ensure_typed_column_triggers(conn)
+    print("✓ Created typed date indexes and triggers")
+    
+    # 11. Open partitions for upcoming months, compact and seal old ones
+    ensure_upcoming_partitions(conn)
+    sealed = seal_partitions(conn)
+    print(f"✓ Sealed {len(sealed)} transaction partitions")
+    
+    # 12. Log every later write for incremental consumers
+    ensure_change_capture(conn)
+    print("✓ Enabled change capture")
+    
+    # 13. Score customers into RFM segments; later refreshes follow the change log
+    result = refresh_segments(conn)
+    print(f"✓ Built {result['customers']} customer segments")
+    
+    # 14. Open-ticket counters and SLA queue, kept current by triggers
+    ensure_ticket_backlog(conn)
+    print("✓ Built support ticket backlog and SLA triggers")
+    
+    # 15. Samples and sketches for approximate answers; later loads follow the change log
+    result = build_approx(conn)
+    print(f"✓ Sampled {result['transactions']} transactions and sketched {result['loans']} loans for approximate queries")
+    
+    conn.commit()
+
 if __name__ == "__main__":
     conn = create_database()
     load_data_to_database(conn)
@@ -0,0 +1,256 @@
+"""
+Read-only analytics snapshot.
+publish_snapshot() copies banking.db with SQLite's online backup API into
+a new file next to it (banking-snapshot-<stamp>.db) and then atomically
+replaces a small JSON pointer naming the current copy. SnapshotManager
+serves analytical reads from the newest copy, opened with immutable=1 and
+a large mmap_size: no locks are shared with CRUD writers and pages are
+read straight from the OS page cache. Readers move to a new snapshot on
+their next query; the previous one stays open until the swap after that,
+so reads already running on it can finish.
+
+Run from the project root to publish once, or every N seconds:
+    python analytics_snapshot.py
+    python analytics_snapshot.py --interval 60
+"""
+import argparse
+import glob
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from arrow_results import AdbcSQLiteReader, arrow_to_frame
+from backends import SQLiteBackend
+from result_store import database_fingerprint
+
+DB_PATH = 'database/banking.db'
+# Snapshots are mapped, not read(); 1 GiB covers the database many times over
+MMAP_SIZE = 1 << 30
+KEEP_SNAPSHOTS = 2
+PUBLISH_INTERVAL = 60
+# How often readers look for a newer pointer
+CHECK_INTERVAL = 1.0
+
+
+def _snapshot_base(db_path):
+    return os.path.splitext(os.path.abspath(db_path))[0] + "-snapshot"
+
+
+def pointer_path(db_path=DB_PATH):
+    """JSON file naming the current snapshot of db_path."""
+    return _snapshot_base(db_path) + ".json"
+
+
+def read_pointer(db_path=DB_PATH):
+    """The current snapshot's metadata, or None if none was published."""
+    try:
+        with open(pointer_path(db_path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def snapshot_age(db_path=DB_PATH):
+    """Seconds since the current snapshot was published, or None."""
+    pointer = read_pointer(db_path)
+    return time.time() - pointer["published_at"] if pointer else None
+
+
+def format_age(seconds):
+    if seconds < 90:
+        return f"{seconds:.0f} s"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def publish_snapshot(db_path=DB_PATH, force=False, keep=KEEP_SNAPSHOTS):
+    """
+    Copy db_path into a new snapshot file and point readers at it.
+    Skipped when the database has not changed since the current snapshot
+    unless force is set. Returns (metadata, published).
+    """
+    current = read_pointer(db_path)
+    fingerprint = database_fingerprint(db_path)
+    if current and not force and current["source_fingerprint"] == fingerprint:
+        return current, False
+
+    start = time.perf_counter()
+    base = _snapshot_base(db_path)
+    path = f"{base}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db"
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(path + ".tmp")
+    try:
+        # One step: the copy is a single consistent read of the source
+        source.backup(target)
+        # immutable=1 readers never look at a WAL, so the copy must not use one
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+    os.replace(path + ".tmp", path)
+    # Nothing may change an immutable database under its readers
+    os.chmod(path, 0o444)
+
+    entry = {
+        "file_name": os.path.basename(path),
+        "published_at": time.time(),
+        "source_fingerprint": fingerprint,
+        "size_bytes": os.path.getsize(path),
+        "copy_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    pointer = pointer_path(db_path)
+    with open(pointer + ".tmp", "w") as f:
+        json.dump(entry, f, indent=2)
+    os.replace(pointer + ".tmp", pointer)
+
+    _prune_snapshots(base, keep)
+    return entry, True
+
+
+def _prune_snapshots(base, keep):
+    """Delete all but the newest `keep` snapshot files."""
+    for path in sorted(glob.glob(f"{glob.escape(base)}-*.db"))[:-keep]:
+        try:
+            os.chmod(path, 0o644)
+            os.remove(path)
+        except OSError:
+            # Still open somewhere (Windows); retried on the next publish
+            pass
+
+
+class SnapshotBackend(SQLiteBackend):
+    """
+    Reads one published snapshot file, read-only and memory-mapped.
+    """
+    name = "snapshot"
+
+    def __init__(self, path, entry):
+        uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro&immutable=1"
+        pragma = f"PRAGMA mmap_size={MMAP_SIZE}"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute(pragma)
+        super().__init__(conn, reader=AdbcSQLiteReader(uri, fallback_conn=conn, init_sql=[pragma]))
+        self.entry = entry
+
+
+class SnapshotManager:
+    """
+    Backend-compatible front for the current snapshot of a database.
+    Publishes a first snapshot if there is none.
+    """
+    name = "snapshot"
+    dialect = "sqlite"
+
+    def __init__(self, db_path=DB_PATH, check_interval=CHECK_INTERVAL):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._backend = None
+        self._previous = None
+        self._pointer_mtime = None
+        self._checked = 0.0
+
+    def current(self):
+        """
+        The snapshot to run the next read on. A read that needs several
+        statements should resolve this once and use it throughout.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._backend is None or now - self._checked >= self.check_interval:
+                self._checked = now
+                self._swap_if_newer()
+            return self._backend
+
+    def _swap_if_newer(self):
+        pointer = pointer_path(self.db_path)
+        if not os.path.exists(pointer):
+            publish_snapshot(self.db_path)
+        mtime = os.stat(pointer).st_mtime_ns
+        if mtime == self._pointer_mtime and self._backend is not None:
+            return
+        entry = read_pointer(self.db_path)
+        path = os.path.join(os.path.dirname(pointer), entry["file_name"])
+        backend = SnapshotBackend(path, entry)
+        # Keep one generation back open for reads that already resolved it
+        if self._previous is not None:
+            self._previous.close()
+        self._previous, self._backend = self._backend, backend
+        self._pointer_mtime = mtime
+
+    @property
+    def conn(self):
+        return self.current().conn
+
+    @property
+    def snapshot_id(self):
+        return self.current().entry["file_name"]
+
+    def age_seconds(self):
+        return time.time() - self.current().entry["published_at"]
+
+    def read_arrow(self, sql, params=None):
+        return self.current().read_arrow(sql, params)
+
+    def read_frame(self, sql, params=None):
+        return arrow_to_frame(self.read_arrow(sql, params))
+
+    def close(self):
+        with self._lock:
+            for backend in (self._previous, self._backend):
+                if backend is not None:
+                    backend.close()
+            self._previous = self._backend = None
+
+
+class SnapshotPublisher(threading.Thread):
+    """
+    Background thread that republishes the snapshot every `interval`
+    seconds when the database has changed.
+    """
+
+    def __init__(self, db_path=DB_PATH, interval=PUBLISH_INTERVAL):
+        super().__init__(name="snapshot-publisher", daemon=True)
+        self.db_path = db_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                publish_snapshot(self.db_path)
+            except Exception as e:
+                print(f"⚠️ Snapshot publish failed: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish read-only analytics snapshots of banking.db")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--interval", type=float, help="keep publishing every N seconds")
+    parser.add_argument("--force", action="store_true", help="publish even if nothing changed")
+    args = parser.parse_args()
+
+    while True:
+        entry, published = publish_snapshot(args.db, force=args.force)
+        if published:
+            print(f"✓ Published {entry['file_name']} "
+                  f"({entry['size_bytes'] / 1024:,.0f} KB in {entry['copy_ms']:.0f} ms)")
+        else:
+            print(f"♻️ {entry['file_name']} is current "
+                  f"({format_age(time.time() - entry['published_at'])} old)")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
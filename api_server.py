@@ -0,0 +1,354 @@
+"""
+Local read-only HTTP API for BankSight.
+Exposes the tables, column filters and the named analytical queries over
+plain HTTP using only the standard library:
+
+    GET /health
+    GET /tables
+    GET /tables/<table>?limit=500&after=<rowid>&<column>=<value>
+    GET /queries
+    GET /queries/<Q1 | full query key>
+
+Responses stream as JSON (default) or CSV (?format=csv or Accept:
+text/csv) straight from a pooled read-only connection's cursor. Table
+pages use keyset pagination on rowid (txn_id for the partitioned
+transactions view): pass the returned next_after (or the first column of
+the last row) as ?after= to get the next page. Every response
+carries an ETag derived from the database fingerprint, so a client
+polling with If-None-Match gets a 304 without touching the database
+until the data changes.
+
+Run from the project root, e.g.:
+    python api_server.py --port 8000
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from backends import DB_PATH, PARQUET_DIR, SQLiteBackend, create_analytics_backend, query_for_backend
+from result_store import database_fingerprint
+from sql_queries import get_all_queries
+from txn_archive import archived_months, read_with_archive, touches_transactions
+
+API_TABLES = ['customers', 'accounts', 'transactions', 'branches',
+              'loans', 'credit_cards', 'support_tickets', 'branch_summary']
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 10000
+FETCH_ROWS = 1000
+RESERVED_PARAMS = {'limit', 'after', 'format'}
+# Views have no rowid, so they page on their primary key instead
+PAGE_KEYS = {'transactions': 'txn_id'}
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of read-only SQLite connections shared by the
+    request threads. Callers block while every connection is in use.
+    """
+
+    def __init__(self, db_path=DB_PATH, size=8):
+        self.db_path = db_path
+        self._pool = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(sqlite3.connect(
+                f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+            ))
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def table_columns(conn, table_name):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+
+def build_table_query(columns, table_name, params):
+    """
+    Keyset-paginated SELECT for a table. Filters follow the Filter Data
+    page: repeated values match with IN, a value containing % with LIKE,
+    anything else with =. Column names are checked against the schema and
+    values are always bound.
+    """
+    key = PAGE_KEYS.get(table_name, 'rowid')
+    try:
+        limit = min(int(params.get('limit', [DEFAULT_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+        after = params.get('after', [''])[0]
+        if key == 'rowid':
+            after = int(after or 0)
+    except ValueError:
+        raise ApiError(400, "limit and after must be integers (after is a txn_id for transactions)")
+    if limit < 1:
+        raise ApiError(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    where = [f"{key} > ?"]
+    values = [after]
+    for column, column_values in params.items():
+        if column in RESERVED_PARAMS:
+            continue
+        if column not in columns:
+            raise ApiError(400, f"Unknown column: {column}")
+        if len(column_values) > 1:
+            where.append(f"{column} IN ({', '.join('?' for _ in column_values)})")
+            values.extend(column_values)
+        elif '%' in column_values[0]:
+            where.append(f"{column} LIKE ?")
+            values.append(column_values[0])
+        else:
+            where.append(f"{column} = ?")
+            values.append(column_values[0])
+
+    select = "rowid AS _rowid, *" if key == 'rowid' else "*"
+    sql = (f"SELECT {select} FROM {table_name} "
+           f"WHERE {' AND '.join(where)} ORDER BY {key} LIMIT ?")
+    return sql, values + [limit], limit
+
+
+def iter_cursor(cursor):
+    """Yield rows from a cursor in batches."""
+    while True:
+        rows = cursor.fetchmany(FETCH_ROWS)
+        if not rows:
+            return
+        yield from rows
+
+
+def iter_arrow(table):
+    """Yield rows from an Arrow table batch by batch."""
+    for batch in table.to_batches(FETCH_ROWS):
+        columns = [column.to_pylist() for column in batch.columns]
+        yield from zip(*columns)
+
+
+class BankSightHandler(BaseHTTPRequestHandler):
+    server_version = "BankSightAPI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    # Set on the server class in create_server()
+    pool = None
+    olap_backend = None
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ----- dispatch -----
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query, keep_blank_values=True)
+        parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+
+        try:
+            fmt = params.get('format', [''])[0] or (
+                'csv' if 'text/csv' in self.headers.get('Accept', '') else 'json'
+            )
+            if fmt not in ('json', 'csv'):
+                raise ApiError(400, "format must be json or csv")
+
+            # Same data version + same request = same body
+            fingerprint = database_fingerprint(self.pool.db_path)
+            etag = '"' + hashlib.sha1(f"{fingerprint}|{fmt}|{self.path}".encode()).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            if parts == ['health']:
+                self.send_json({"status": "ok", "data_version": fingerprint}, etag)
+            elif parts == ['tables']:
+                self.list_tables(etag)
+            elif len(parts) == 2 and parts[0] == 'tables':
+                self.get_table(parts[1], params, fmt, etag)
+            elif parts == ['queries']:
+                self.list_queries(etag)
+            elif len(parts) == 2 and parts[0] == 'queries':
+                self.run_named_query(parts[1], fmt, etag)
+            else:
+                raise ApiError(404, "Not found")
+        except ApiError as e:
+            self.send_json({"error": str(e)}, status=e.status)
+        except sqlite3.Error as e:
+            self.send_json({"error": str(e)}, status=500)
+
+    # ----- endpoints -----
+
+    def list_tables(self, etag):
+        with self.pool.connection() as conn:
+            tables = [
+                {"name": name,
+                 "rows": conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0],
+                 "columns": table_columns(conn, name)}
+                for name in API_TABLES
+            ]
+        self.send_json({"tables": tables}, etag)
+
+    def get_table(self, table_name, params, fmt, etag):
+        if table_name not in API_TABLES:
+            raise ApiError(404, f"Unknown table: {table_name}")
+
+        with self.pool.connection() as conn:
+            sql, values, limit = build_table_query(table_columns(conn, table_name), table_name, params)
+            cursor = conn.execute(sql, values)
+            names = [col[0] for col in cursor.description]
+            self.stream_rows(names, iter_cursor(cursor), fmt, etag, page_size=limit)
+
+    def list_queries(self, etag):
+        queries = [
+            {"id": key.split(':')[0], "name": key,
+             "description": info["description"], "workload": info["workload"]}
+            for key, info in get_all_queries().items()
+        ]
+        self.send_json({"queries": queries}, etag)
+
+    def run_named_query(self, name, fmt, etag):
+        queries = get_all_queries()
+        by_id = {key.split(':')[0].upper(): key for key in queries}
+        key = name if name in queries else by_id.get(name.upper())
+        if key is None:
+            raise ApiError(404, f"Unknown query: {name}")
+        query_info = queries[key]
+
+        with self.pool.connection() as conn:
+            # Scan-heavy queries go to DuckDB when the server was started with it
+            if self.olap_backend is not None and query_info.get("workload") == "olap":
+                sql = query_for_backend(query_info, self.olap_backend)
+                table = read_with_archive(conn, self.olap_backend, sql)
+                self.stream_rows(table.column_names, iter_arrow(table), fmt, etag)
+                return
+
+            # Archived history has to be unioned in, which a plain cursor cannot do
+            if archived_months(conn) and touches_transactions(query_info["query"]):
+                table = read_with_archive(conn, SQLiteBackend(conn), query_info["query"])
+                self.stream_rows(table.column_names, iter_arrow(table), fmt, etag)
+                return
+
+            cursor = conn.execute(query_info["query"])
+            names = [col[0] for col in cursor.description]
+            self.stream_rows(names, iter_cursor(cursor), fmt, etag)
+
+    # ----- responses -----
+
+    def send_json(self, payload, etag=None, status=200):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def write_chunk(self, data):
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+    def stream_rows(self, names, rows, fmt, etag, page_size=None):
+        """
+        Send rows with chunked transfer encoding as they are fetched.
+        For table pages the JSON body ends with next_after, the page key
+        (first column) to pass as ?after= for the next page (null on the
+        last page).
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv' if fmt == 'csv' else 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('ETag', etag)
+        self.end_headers()
+
+        buffer = io.StringIO()
+        count = 0
+        last_key = None
+
+        if fmt == 'csv':
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+        else:
+            buffer.write('{"columns": ' + json.dumps(names) + ', "rows": [')
+
+        for row in rows:
+            if fmt == 'csv':
+                writer.writerow(row)
+            else:
+                buffer.write((',' if count else '') + json.dumps(dict(zip(names, row)), default=str))
+            count += 1
+            if page_size is not None:
+                last_key = row[0]
+            if count % FETCH_ROWS == 0:
+                self.write_chunk(buffer.getvalue().encode())
+                buffer.seek(0)
+                buffer.truncate()
+
+        if fmt == 'json':
+            next_after = last_key if page_size is not None and count == page_size else None
+            buffer.write(f'], "count": {count}, "next_after": {json.dumps(next_after)}}}')
+        self.write_chunk(buffer.getvalue().encode())
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def create_server(host='127.0.0.1', port=8000, db_path=DB_PATH, pool_size=8, engine='sqlite', verbose=False):
+    """
+    Build a threaded HTTP server bound to host:port.
+    """
+    handler = type('Handler', (BankSightHandler,), {
+        'pool': ConnectionPool(db_path, pool_size),
+        'olap_backend': None,
+    })
+    if engine == 'auto':
+        parquet_dir = PARQUET_DIR if os.path.isdir(PARQUET_DIR) else None
+        handler.olap_backend = create_analytics_backend(db_path=db_path, parquet_dir=parquet_dir)
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BankSight read-only HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--engine", choices=["sqlite", "auto"], default="sqlite",
+                        help="auto runs OLAP queries on DuckDB when available")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.db, args.pool_size, args.engine, args.verbose)
+    print(f"✓ Serving BankSight API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.pool.close()
+        print("\n✓ Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,954 @@
+"""
+Approximate analytics: samples and sketches for the big tables.
+Exploratory answers for queries that would otherwise scan every
+transaction, with 95% error bounds:
+- stratified reservoir samples of transactions (per month and type),
+  next to each stratum's exact row count, give totals and averages as
+  stratified estimates;
+- Count-Min sketches of high-value transactions per customer and month
+  add up over a window and never undercount, so they prune the
+  customers an exact "5+ high-value transactions" check has to read;
+- HyperLogLog sketches of loan customers per branch and start month
+  merge into distinct customer counts for any run of months, next to
+  exact loan counts and amounts per branch and month.
+
+build_approx() scans everything once (the loader runs it); afterwards
+refresh_approx() follows the change log: new transactions go through the
+reservoirs and sketches, and an update or delete recounts and tops up
+only the strata and loan groups it touched. ApproxRefresher runs it in the background
+while the app is up, so run_approximate() only reads; answers lag the
+database by up to one refresh interval.
+
+Run from the project root to refresh once, or every N seconds:
+    python approx_analytics.py
+    python approx_analytics.py --rebuild
+    python approx_analytics.py --interval 60
+"""
+import argparse
+import math
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from arrow_results import AdbcSQLiteReader
+from backends import SQLiteBackend
+from change_log import (CHANGE_LOG_TABLE, change_capture_enabled, changes_since, consumer_position,
+                        latest_version, save_position)
+from txn_archive import archived_months, read_with_archive
+from txn_partitions import DEFAULT_PARTITION, list_partitions, month_key
+
+DB_PATH = 'database/banking.db'
+CONSUMER = 'approx_analytics'
+# Rows kept per stratum; a year of one transaction type is ~24k rows
+TXN_SAMPLE_ROWS = 2048
+# Count-Min: overcount at most e/width of the total with probability 1 - e^-depth
+CM_WIDTH = 2048
+CM_DEPTH = 4
+CM_HASH_KEYS = ('countmin-row-00a', 'countmin-row-01b', 'countmin-row-02c', 'countmin-row-03d')
+HIGH_VALUE_AMOUNT = 200000
+HIGH_VALUE_MIN_COUNT = 5
+# 2^14 registers: 0.8% standard error on distinct counts
+HLL_PRECISION = 14
+# 95% confidence
+Z = 1.96
+KEY_BATCH = 500
+REFRESH_INTERVAL = 60
+
+APPROX_SCHEMAS = [
+    '''
+CREATE TABLE IF NOT EXISTS approx_txn_strata (
+    txn_month INTEGER NOT NULL,
+    txn_type TEXT NOT NULL,
+    population INTEGER NOT NULL,
+    PRIMARY KEY (txn_month, txn_type)
+) WITHOUT ROWID
+''',
+    '''
+CREATE TABLE IF NOT EXISTS approx_txn_sample (
+    txn_month INTEGER NOT NULL,
+    txn_type TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    txn_id TEXT,
+    amount REAL,
+    status TEXT,
+    PRIMARY KEY (txn_month, txn_type, slot)
+) WITHOUT ROWID
+''',
+    "CREATE INDEX IF NOT EXISTS idx_approx_txn_sample_txn_id ON approx_txn_sample(txn_id)",
+    '''
+CREATE TABLE IF NOT EXISTS approx_loan_months (
+    branch_id INTEGER NOT NULL,
+    start_month INTEGER NOT NULL,
+    loans INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (branch_id, start_month)
+) WITHOUT ROWID
+''',
+    # kind 'hll' (zlib-compressed uint8 registers) or 'cms' (int64 counters, depth x width)
+    '''
+CREATE TABLE IF NOT EXISTS approx_sketches (
+    sketch TEXT NOT NULL,
+    group_id INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (sketch, group_id, month)
+)
+''',
+]
+
+TXN_TABLES = ['approx_txn_strata', 'approx_txn_sample']
+APPROX_TABLES = TXN_TABLES + ['approx_loan_months', 'approx_sketches']
+
+TXN_SAMPLE_COLUMNS_SQL = "SELECT txn_month, txn_type, txn_id, amount, status, customer_key FROM transactions"
+TXN_ROW_SQL = ("SELECT txn_month, COALESCE(txn_type, ''), txn_id, amount, status, customer_key "
+               "FROM transactions")
+LOAN_ROW_SQL = '''
+SELECT branch_id, CAST(strftime('%Y%m', start_day * 86400, 'unixepoch') AS INTEGER) AS start_month,
+       Loan_ID, Loan_Amount, Customer_ID
+FROM loans
+'''
+LOAN_GROUP_COUNTS_SQL = '''
+SELECT branch_id, CAST(strftime('%Y%m', start_day * 86400, 'unixepoch') AS INTEGER), COUNT(*)
+FROM loans
+WHERE branch_id IS NOT NULL AND start_day IS NOT NULL
+GROUP BY 1, 2
+'''
+EPOCH = pd.Timestamp("1970-01-01")
+
+
+def ensure_approx_tables(conn):
+    """Create the tables; True if any was missing and a full build is due."""
+    existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(approx_txn_sample)")]
+    # Samples kept before txn_id was stored cannot follow updates: start over
+    if columns and 'txn_id' not in columns:
+        for table_name in APPROX_TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        existing = set()
+    for statement in APPROX_SCHEMAS:
+        conn.execute(statement)
+    conn.commit()
+    return not set(APPROX_TABLES) <= existing
+
+
+def _hashes(values, hash_key=None):
+    """
+    64-bit hashes of values. Integer arrays hash as int64; anything else
+    as strings, so keys hash the same however they were read.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        values = values.astype(np.int64)
+    else:
+        values = np.asarray([str(value) for value in values], dtype=object)
+    if hash_key is None:
+        return pd.util.hash_array(values)
+    return pd.util.hash_array(values, hash_key=hash_key)
+
+
+def hll_new():
+    return np.zeros(1 << HLL_PRECISION, dtype=np.uint8)
+
+
+def hll_add(registers, values):
+    """Add values to HyperLogLog registers in place."""
+    if len(values) == 0:
+        return registers
+    hashes = _hashes(values)
+    index = (hashes >> np.uint64(64 - HLL_PRECISION)).astype(np.intp)
+    rest = hashes & np.uint64((1 << (64 - HLL_PRECISION)) - 1)
+    # rest < 2^50 converts to float exactly, so frexp gives its bit length
+    bit_length = np.frexp(rest.astype(np.float64))[1]
+    rank = (64 - HLL_PRECISION - bit_length + 1).astype(np.uint8)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def hll_count(registers):
+    """(estimated distinct values, 95% margin)."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        # Linear counting is far more accurate while registers are sparse
+        estimate = m * math.log(m / zeros)
+    return estimate, Z * 1.04 / math.sqrt(m) * estimate
+
+
+def cms_new():
+    return np.zeros((CM_DEPTH, CM_WIDTH), dtype=np.int64)
+
+
+def _cms_columns(keys):
+    return [(_hashes(keys, hash_key) % np.uint64(CM_WIDTH)).astype(np.intp) for hash_key in CM_HASH_KEYS]
+
+
+def cms_add(table, keys):
+    """Count keys into a Count-Min table in place."""
+    if len(keys):
+        for row, columns in enumerate(_cms_columns(keys)):
+            np.add.at(table[row], columns, 1)
+    return table
+
+
+def cms_estimate(table, keys):
+    """Estimated counts of keys; never below the true count."""
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.min([table[row][columns] for row, columns in enumerate(_cms_columns(keys))], axis=0)
+
+
+def _load_sketches(conn, sketch, months=None):
+    """{(group_id, month): array} for one sketch, optionally only some months."""
+    rows = conn.execute("SELECT group_id, month, kind, data FROM approx_sketches WHERE sketch = ?", (sketch,))
+    sketches = {}
+    for group_id, month, kind, data in rows:
+        if months is not None and month not in months:
+            continue
+        if kind == 'hll':
+            sketches[(group_id, month)] = np.frombuffer(zlib.decompress(data), dtype=np.uint8).copy()
+        else:
+            sketches[(group_id, month)] = np.frombuffer(data, dtype=np.int64).reshape(CM_DEPTH, CM_WIDTH).copy()
+    return sketches
+
+
+def _save_sketches(conn, sketch, kind, sketches):
+    # Registers of small groups are mostly zero and compress to a few hundred bytes
+    encode = (lambda array: zlib.compress(array.tobytes())) if kind == 'hll' else (lambda array: array.tobytes())
+    conn.executemany(
+        "INSERT OR REPLACE INTO approx_sketches VALUES (?, ?, ?, ?, ?)",
+        [(sketch, int(group_id), int(month), kind, encode(array)) for (group_id, month), array in sketches.items()],
+    )
+
+
+def _initial_sample(frame, size, rng):
+    """Uniform sample of up to size rows, as a full reservoir pass would leave it."""
+    if len(frame) <= size:
+        return frame
+    return frame.iloc[np.sort(rng.choice(len(frame), size, replace=False))]
+
+
+def _sample_row(month, txn_type, slot, row):
+    txn_id, amount, status = row
+    return (month, txn_type, slot, None if txn_id is None else str(txn_id),
+            None if pd.isna(amount) else amount, None if pd.isna(status) else status)
+
+
+def _stratum_state(conn, strata, stratum):
+    """[population, set of used slots] of a stratum, cached in strata."""
+    if stratum not in strata:
+        found = conn.execute("SELECT population FROM approx_txn_strata WHERE txn_month = ? AND txn_type = ?",
+                             stratum).fetchone()
+        slots = {slot for (slot,) in conn.execute(
+            "SELECT slot FROM approx_txn_sample WHERE txn_month = ? AND txn_type = ?", stratum)}
+        strata[stratum] = [found[0] if found else 0, slots]
+    return strata[stratum]
+
+
+def _reservoir_add(conn, rows, strata, rng, counted=False):
+    """
+    Algorithm R over (txn_month, txn_type, txn_id, amount, status) rows.
+    Each joins its stratum's population unless already counted; a sample
+    holding the whole stratum takes it into a free slot, otherwise it
+    replaces a random one of the k slots with probability k / population.
+    """
+    for row in rows:
+        stratum = tuple(row[:2])
+        state = _stratum_state(conn, strata, stratum)
+        if not counted:
+            state[0] += 1
+            conn.execute("INSERT OR REPLACE INTO approx_txn_strata VALUES (?, ?, ?)", (*stratum, state[0]))
+        population, slots = state
+        if len(slots) >= population - 1 and len(slots) < TXN_SAMPLE_ROWS:
+            slot = len(slots) if len(slots) not in slots else min(set(range(TXN_SAMPLE_ROWS)) - slots)
+        else:
+            pick = int(rng.integers(population))
+            if pick >= len(slots):
+                continue
+            slot = sorted(slots)[pick]
+        slots.add(slot)
+        conn.execute("INSERT OR REPLACE INTO approx_txn_sample VALUES (?, ?, ?, ?, ?, ?)",
+                     _sample_row(*stratum, slot, row[2:5]))
+
+
+def _own_backend(conn):
+    """
+    Reads through conn itself: a second (ADBC) connection holding a read
+    lock would make SQLite roll back conn's open write transaction when
+    it spills to disk.
+    """
+    return SQLiteBackend(conn, reader=AdbcSQLiteReader(None, fallback_conn=conn))
+
+
+def _transaction_months(conn):
+    """Every month holding transactions: partitions, archive and the default partition."""
+    months = {month for month, _, _ in list_partitions(conn) if month}
+    months.update(month for month, _ in archived_months(conn))
+    months.update(month for (month,) in conn.execute(
+        f"SELECT DISTINCT txn_month FROM {DEFAULT_PARTITION} WHERE txn_month IS NOT NULL"
+    ))
+    return sorted(months)
+
+
+def _month_start(month):
+    return pd.Timestamp(year=month // 100, month=month % 100, day=1)
+
+
+def build_transaction_samples(conn, rng):
+    """Rebuild the transaction reservoirs and Count-Min sketches, a month at a time."""
+    for table_name in TXN_TABLES:
+        conn.execute(f"DELETE FROM {table_name}")
+    conn.execute("DELETE FROM approx_sketches WHERE sketch = 'high_value_customers'")
+    backend = _own_backend(conn)
+    rows = 0
+    for month in _transaction_months(conn):
+        start = _month_start(month)
+        frame = read_with_archive(conn, backend, TXN_SAMPLE_COLUMNS_SQL,
+                                  start, start + pd.DateOffset(months=1)).to_pandas()
+        frame = frame[frame["txn_month"] == month]
+        rows += len(frame)
+        for txn_type, group in frame.groupby(frame["txn_type"].fillna(""), sort=True):
+            sample = _initial_sample(group, TXN_SAMPLE_ROWS, rng)
+            conn.execute("INSERT INTO approx_txn_strata VALUES (?, ?, ?)", (month, txn_type, len(group)))
+            conn.executemany(
+                "INSERT INTO approx_txn_sample VALUES (?, ?, ?, ?, ?, ?)",
+                [_sample_row(month, txn_type, slot, row) for slot, row in enumerate(zip(
+                    sample["txn_id"], sample["amount"], sample["status"]))],
+            )
+        high_value = frame.loc[frame["amount"] > HIGH_VALUE_AMOUNT, "customer_key"].dropna().astype(np.int64)
+        if len(high_value):
+            _save_sketches(conn, 'high_value_customers', 'cms',
+                           {(0, month): cms_add(cms_new(), high_value.to_numpy())})
+    return rows
+
+
+def _save_loan_groups(conn, frame):
+    """Totals and customer sketch of each (branch_id, start_month) group in frame."""
+    sketches = {}
+    for (branch_id, start_month), group in frame.groupby(["branch_id", "start_month"]):
+        conn.execute("INSERT OR REPLACE INTO approx_loan_months VALUES (?, ?, ?, ?)",
+                     (int(branch_id), int(start_month), len(group), float(group["Loan_Amount"].fillna(0).sum())))
+        sketches[(branch_id, start_month)] = hll_add(
+            hll_new(), group["Customer_ID"].dropna().astype(np.int64).to_numpy())
+    _save_sketches(conn, 'loan_customers', 'hll', sketches)
+
+
+def build_loan_sketches(conn):
+    """Rebuild the loan totals and customer HyperLogLogs per branch and start month."""
+    conn.execute("DELETE FROM approx_loan_months")
+    conn.execute("DELETE FROM approx_sketches WHERE sketch = 'loan_customers'")
+    frame = pd.read_sql_query(LOAN_ROW_SQL + " WHERE branch_id IS NOT NULL AND start_day IS NOT NULL", conn)
+    _save_loan_groups(conn, frame)
+    return len(frame)
+
+
+def build_approx(conn, seed=None):
+    """
+    Rebuild every sample and sketch from a full scan and record the change
+    log position they reflect. Returns a summary dict.
+    """
+    start = time.perf_counter()
+    ensure_approx_tables(conn)
+    rng = np.random.default_rng(seed)
+    version = latest_version(conn) if change_capture_enabled(conn) else None
+    try:
+        transactions = build_transaction_samples(conn, rng)
+        loans = build_loan_sketches(conn)
+        if version is not None:
+            save_position(conn, CONSUMER, version)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {"mode": "full", "transactions": transactions, "loans": loans,
+            "seconds": time.perf_counter() - start}
+
+
+def _fetch_rows(conn, sql, key_column, keys):
+    rows = []
+    for i in range(0, len(keys), KEY_BATCH):
+        batch = keys[i:i + KEY_BATCH]
+        rows.extend(conn.execute(f"{sql} WHERE {key_column} IN ({', '.join('?' for _ in batch)})", batch))
+    return rows
+
+
+def _add_high_value(conn, rows):
+    """
+    Count high-value rows into their months' Count-Min sketches. Nothing
+    is ever taken out, so updates and deletes can only overcount.
+    """
+    high_value = {}
+    for month, _, _, amount, _, customer_key in rows:
+        if amount is not None and amount > HIGH_VALUE_AMOUNT and customer_key is not None:
+            high_value.setdefault(month, []).append(customer_key)
+    if high_value:
+        sketches = _load_sketches(conn, 'high_value_customers', set(high_value))
+        for month, keys in high_value.items():
+            sketches[(0, month)] = cms_add(sketches.get((0, month), cms_new()), np.array(keys, dtype=np.int64))
+        _save_sketches(conn, 'high_value_customers', 'cms', sketches)
+
+
+def _first_ops(conn, table_name, after, through):
+    """{pk: op} of each row's first logged change in (after, through]."""
+    rows = conn.execute(
+        f"SELECT pk, op, MIN(version) FROM {CHANGE_LOG_TABLE} "
+        "WHERE version > ? AND version <= ? AND table_name = ? GROUP BY pk",
+        (after, through, table_name),
+    )
+    return {pk: op for pk, op, _ in rows}
+
+
+def _month_epochs(month):
+    start = _month_start(month)
+    return int(start.timestamp()), int((start + pd.DateOffset(months=1)).timestamp())
+
+
+def _live_month_totals(conn):
+    """Row count of every live month: its partition plus the default partition."""
+    totals = {month: conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+              for month, table_name, _ in list_partitions(conn) if month}
+    for month, count in conn.execute(f"SELECT txn_month, COUNT(*) FROM {DEFAULT_PARTITION} "
+                                     "WHERE txn_month IS NOT NULL GROUP BY txn_month"):
+        totals[month] = totals.get(month, 0) + count
+    return totals
+
+
+def _recount_month(conn, month, strata):
+    """Exact populations of one month's strata; a type that is gone takes its sample with it."""
+    counts = dict(conn.execute(
+        "SELECT COALESCE(txn_type, ''), COUNT(*) FROM transactions "
+        "WHERE txn_epoch >= ? AND txn_epoch < ? AND txn_month = ? GROUP BY COALESCE(txn_type, '')",
+        (*_month_epochs(month), month),
+    ).fetchall())
+    conn.execute("DELETE FROM approx_txn_strata WHERE txn_month = ?", (month,))
+    conn.executemany("INSERT INTO approx_txn_strata VALUES (?, ?, ?)",
+                     [(month, txn_type, population) for txn_type, population in counts.items()])
+    conn.execute(f"DELETE FROM approx_txn_sample WHERE txn_month = ? "
+                 f"AND txn_type NOT IN ({', '.join('?' for _ in counts) or 'NULL'})", (month, *counts))
+    for stratum in [stratum for stratum in strata if stratum[0] == month and stratum[1] not in counts]:
+        del strata[stratum]
+    for txn_type, population in counts.items():
+        _stratum_state(conn, strata, (month, txn_type))[0] = population
+
+
+def _top_up(conn, stratum, strata, rng):
+    """
+    Refill a sample that lost rows up to min(size, population) with rows
+    drawn uniformly from the rest of its stratum; the sample stays uniform.
+    """
+    population, slots = _stratum_state(conn, strata, stratum)
+    missing = min(TXN_SAMPLE_ROWS, population) - len(slots)
+    if missing <= 0:
+        return
+    month, txn_type = stratum
+    sampled = {txn_id for (txn_id,) in conn.execute(
+        "SELECT txn_id FROM approx_txn_sample WHERE txn_month = ? AND txn_type = ?", stratum)}
+    rows = [row for row in conn.execute(
+        f"{TXN_ROW_SQL} WHERE txn_epoch >= ? AND txn_epoch < ? AND txn_month = ? AND COALESCE(txn_type, '') = ?",
+        (*_month_epochs(month), month, txn_type),
+    ) if str(row[2]) not in sampled]
+    picks = np.sort(rng.choice(len(rows), min(missing, len(rows)), replace=False))
+    free = sorted(set(range(TXN_SAMPLE_ROWS)) - slots)
+    for slot, pick in zip(free, picks):
+        slots.add(slot)
+        conn.execute("INSERT INTO approx_txn_sample VALUES (?, ?, ?, ?, ?, ?)",
+                     _sample_row(month, txn_type, slot, rows[pick][2:5]))
+
+
+def _apply_changes(conn, txn_ids, first_ops, rng):
+    """
+    Fold changed transactions into the reservoirs and sketches. New rows go
+    through Algorithm R; a row that existed before is updated in its slot,
+    or leaves the sample when it changed stratum or was deleted. Only the
+    months rows left or joined are recounted and topped up. Returns the
+    number of changed transactions.
+    """
+    strata = {}
+    current = {str(row[2]): row for row in _fetch_rows(conn, TXN_ROW_SQL, "txn_id", txn_ids) if row[0] is not None}
+    existing = [txn_id for txn_id in txn_ids if first_ops.get(txn_id) != 'I']
+
+    # 1. Sampled rows that existed: update in place, or free the slot
+    sampled = _fetch_rows(conn, "SELECT txn_id, txn_month, txn_type, slot FROM approx_txn_sample", "txn_id", existing)
+    months, moved, stayed = set(), [], set()
+    for txn_id, month, txn_type, slot in sampled:
+        row = current.get(txn_id)
+        if row is not None and tuple(row[:2]) == (month, txn_type):
+            conn.execute("INSERT OR REPLACE INTO approx_txn_sample VALUES (?, ?, ?, ?, ?, ?)",
+                         _sample_row(month, txn_type, slot, row[2:5]))
+            stayed.add(txn_id)
+            continue
+        conn.execute("DELETE FROM approx_txn_sample WHERE txn_month = ? AND txn_type = ? AND slot = ?",
+                     (month, txn_type, slot))
+        months.add(month)
+        if row is not None:
+            moved.append(row[:5])
+
+    # 2. New rows join their strata
+    _reservoir_add(conn, [row[:5] for txn_id, row in current.items() if first_ops.get(txn_id) == 'I'], strata, rng)
+
+    # 3. Recount the months rows may have left or joined. An unsampled
+    # row's old month is not logged; it shows up as a changed month total.
+    months.update(current[txn_id][0] for txn_id in existing if txn_id in current and txn_id not in stayed)
+    if len(sampled) < len(existing):
+        stored = dict(conn.execute("SELECT txn_month, SUM(population) FROM approx_txn_strata GROUP BY txn_month"))
+        live = _live_month_totals(conn)
+        archived = {month for month, _ in archived_months(conn)}
+        months.update(month for month in set(stored) | set(live)
+                      if month not in archived and stored.get(month, 0) != live.get(month, 0))
+    for month in sorted(months):
+        _recount_month(conn, month, strata)
+
+    # 4. Rows that changed stratum are offered to their new one, already counted
+    _reservoir_add(conn, moved, strata, rng, counted=True)
+    for stratum in [stratum for stratum in strata if stratum[0] in months]:
+        _top_up(conn, stratum, strata, rng)
+
+    _add_high_value(conn, list(current.values()))
+    return len(txn_ids)
+
+
+def _rebuild_loan_group(conn, branch_id, start_month):
+    conn.execute("DELETE FROM approx_loan_months WHERE branch_id = ? AND start_month = ?", (branch_id, start_month))
+    conn.execute("DELETE FROM approx_sketches WHERE sketch = 'loan_customers' AND group_id = ? AND month = ?",
+                 (branch_id, start_month))
+    first_day = (_month_start(start_month) - EPOCH).days
+    next_day = (_month_start(start_month) + pd.DateOffset(months=1) - EPOCH).days
+    frame = pd.read_sql_query(LOAN_ROW_SQL + " WHERE branch_id = ? AND start_day >= ? AND start_day < ?",
+                              conn, params=(branch_id, first_day, next_day))
+    _save_loan_groups(conn, frame)
+
+
+def _apply_loan_changes(conn, loan_ids, first_ops):
+    """
+    Fold changed loans into the loan totals and sketches. A new loan adds
+    to its group. A HyperLogLog cannot forget a customer, so each group an
+    updated or deleted loan left or joined is rebuilt from its own rows; a
+    loan's old group is not logged and shows up as a changed group count.
+    Returns the number of changed loans.
+    """
+    current = {str(row[2]): row for row in _fetch_rows(conn, LOAN_ROW_SQL, "Loan_ID", loan_ids)
+               if row[0] is not None and row[1] is not None}
+
+    # 1. New loans add to their group's totals and sketch
+    added = {}
+    for loan_id, (branch_id, start_month, _, amount, customer_id) in current.items():
+        if first_ops.get(loan_id) == 'I':
+            added.setdefault((branch_id, start_month), []).append((amount, customer_id))
+    sketches = _load_sketches(conn, 'loan_customers', {start_month for _, start_month in added})
+    for group, values in added.items():
+        conn.execute(
+            "INSERT INTO approx_loan_months VALUES (?, ?, ?, ?) ON CONFLICT (branch_id, start_month) "
+            "DO UPDATE SET loans = loans + excluded.loans, volume = volume + excluded.volume",
+            (*group, len(values), float(sum(amount or 0 for amount, _ in values))),
+        )
+        customers = np.array([customer_id for _, customer_id in values if customer_id is not None], dtype=np.int64)
+        sketches[group] = hll_add(sketches.get(group, hll_new()), customers)
+    _save_sketches(conn, 'loan_customers', 'hll', {group: sketches[group] for group in added})
+
+    # 2. Groups updated or deleted loans left or joined are rebuilt
+    existing = [loan_id for loan_id in loan_ids if first_ops.get(loan_id) != 'I']
+    if existing:
+        groups = {tuple(current[loan_id][:2]) for loan_id in existing if loan_id in current}
+        stored = {(branch_id, start_month): loans for branch_id, start_month, loans in conn.execute(
+            "SELECT branch_id, start_month, loans FROM approx_loan_months")}
+        live = {(branch_id, start_month): loans for branch_id, start_month, loans in conn.execute(
+            LOAN_GROUP_COUNTS_SQL)}
+        groups.update(group for group in set(stored) | set(live) if stored.get(group, 0) != live.get(group, 0))
+        for branch_id, start_month in sorted(groups):
+            _rebuild_loan_group(conn, branch_id, start_month)
+    return len(loan_ids)
+
+
+def refresh_approx(conn, full=False, seed=None):
+    """
+    Bring samples and sketches up to date with the change log: inserts
+    go through the reservoirs and sketches; updates and deletes recount
+    and top up only the strata, and rebuild only the loan groups, they
+    touched. A trimmed log rebuilds everything; without change capture
+    only full=True does. Returns a summary dict.
+    """
+    created = ensure_approx_tables(conn)
+    capture = change_capture_enabled(conn)
+    position = consumer_position(conn, CONSUMER, default=None) if capture else None
+    if full or created or (capture and position is None):
+        return build_approx(conn, seed)
+    if not capture:
+        # Nothing to follow: samples stay as last built
+        return {"mode": "unchanged", "transactions": 0, "loans": 0, "seconds": 0.0}
+    try:
+        changes, version = changes_since(conn, position, tables=["transactions", "loans"])
+    except ValueError:
+        return build_approx(conn, seed)
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    counts = {"transactions": 0, "loans": 0}
+    try:
+        keys = {table_name: group["pk"].tolist() for table_name, group in changes.groupby("table_name")}
+        if keys.get("transactions"):
+            counts["transactions"] = _apply_changes(
+                conn, keys["transactions"], _first_ops(conn, "transactions", position, version), rng)
+        if keys.get("loans"):
+            counts["loans"] = _apply_loan_changes(conn, keys["loans"], _first_ops(conn, "loans", position, version))
+        save_position(conn, CONSUMER, version)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {"mode": "incremental", **counts, "seconds": time.perf_counter() - start}
+
+
+def pending_changes(conn):
+    """Transactions and loans changed since the samples were last refreshed."""
+    if not change_capture_enabled(conn):
+        return 0
+    position = consumer_position(conn, CONSUMER, default=None)
+    if position is None:
+        return 0
+    return conn.execute(
+        f"SELECT COUNT(DISTINCT table_name || ':' || pk) FROM {CHANGE_LOG_TABLE} "
+        "WHERE version > ? AND table_name IN ('transactions', 'loans')",
+        (position,),
+    ).fetchone()[0]
+
+
+class ApproxRefresher(threading.Thread):
+    """
+    Background thread that folds logged changes into the samples and
+    sketches every `interval` seconds, on a connection of its own.
+    """
+
+    def __init__(self, db_path=DB_PATH, interval=REFRESH_INTERVAL):
+        super().__init__(name="approx-refresher", daemon=True)
+        self.db_path = db_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    refresh_approx(conn)
+                finally:
+                    conn.close()
+            except Exception as e:
+                print(f"⚠️ Approximate refresh failed: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def approx_available(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'approx_sketches'"
+    ).fetchone() is not None
+
+
+def _month_range(start=None, end=None):
+    """txn_month bounds (first, last) for [start, end); None for open ends."""
+    first = int(pd.Timestamp(start).strftime('%Y%m')) if start is not None else None
+    last = int((pd.Timestamp(end) - pd.Timedelta(seconds=1)).strftime('%Y%m')) if end is not None else None
+    return first, last
+
+
+def split_window(start=None, end=None):
+    """
+    [start, end) as the whole months inside it, (first, last) txn_month
+    bounds (None for open ends; first > last when there are none), plus
+    the partial months at either edge as [lo, hi) ranges to read exactly.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    first = last = None
+    edges = []
+    if start is not None:
+        month_start = _month_start(month_key(start))
+        first = month_key(start)
+        if start != month_start:
+            next_month = month_start + pd.DateOffset(months=1)
+            first = month_key(next_month)
+            edges.append((start, next_month if end is None else min(next_month, end)))
+    if end is not None:
+        month_start = _month_start(month_key(end))
+        last = month_key(month_start - pd.DateOffset(months=1))
+        if end != month_start:
+            lo = month_start if start is None else max(month_start, start)
+            # Start and end in the same month: the first edge already covers it
+            if not edges or lo >= edges[0][1]:
+                edges.append((lo, end))
+    return first, last, edges
+
+
+def _month_where(column, first=None, last=None):
+    terms = ["1 = 1"]
+    if first is not None:
+        terms.append(f"{column} >= {first}")
+    if last is not None:
+        terms.append(f"{column} <= {last}")
+    return " AND ".join(terms)
+
+
+def stratified_totals(strata, value_columns):
+    """
+    Per-stratum sample aggregates -> population totals and variances.
+    strata has N, n and, per value column c, c_sum and c_sumsq.
+    """
+    n = strata["n"].astype(float)
+    fpc = (1 - n / strata["N"]).clip(lower=0)
+    out = pd.DataFrame(index=strata.index)
+    for column in value_columns:
+        mean = strata[f"{column}_sum"] / n
+        variance = ((strata[f"{column}_sumsq"] - n * mean ** 2) / (n - 1)).where(n > 1, 0.0).clip(lower=0)
+        out[column] = strata["N"] * mean
+        out[f"{column}_var"] = strata["N"] ** 2 * fpc * variance / n
+    return out
+
+
+def _margin(variance):
+    return Z * np.sqrt(variance)
+
+
+EDGE_VOLUME_SQL = '''
+SELECT COALESCE(txn_type, '') AS txn_type, COUNT(*) AS N, SUM(COALESCE(amount, 0)) AS volume,
+       SUM(status = 'success') AS successful, SUM(status = 'failed') AS failed
+FROM transactions
+GROUP BY COALESCE(txn_type, '')
+'''
+
+
+def approx_transaction_volume(conn, start=None, end=None):
+    """
+    Q5 from the transaction reservoirs: exact counts, estimated sums and
+    averages over whole months; partial months at the window's edges are
+    read exactly and add no error.
+    """
+    first, last, edges = split_window(start, end)
+    strata = pd.read_sql_query(f'''
+    SELECT st.txn_type, st.txn_month, st.population AS N, COUNT(*) AS n,
+           SUM(COALESCE(s.amount, 0)) AS volume_sum, SUM(COALESCE(s.amount, 0) * COALESCE(s.amount, 0)) AS volume_sumsq,
+           SUM(s.status = 'success') AS successful_sum, SUM(s.status = 'success') AS successful_sumsq,
+           SUM(s.status = 'failed') AS failed_sum, SUM(s.status = 'failed') AS failed_sumsq
+    FROM approx_txn_strata st JOIN approx_txn_sample s USING (txn_month, txn_type)
+    WHERE {_month_where("st.txn_month", first, last)}
+    GROUP BY st.txn_type, st.txn_month
+    ''', conn)
+    columns = ["volume", "successful", "failed"]
+    totals = stratified_totals(strata, columns)
+    totals["txn_type"] = strata["txn_type"]
+    totals["N"] = strata["N"]
+    exact = [read_with_archive(conn, _own_backend(conn), EDGE_VOLUME_SQL, lo, hi).to_pandas() for lo, hi in edges]
+    exact = [frame for frame in exact if len(frame)]
+    grouped = pd.concat([totals] + exact, ignore_index=True).groupby("txn_type").sum().fillna(0.0).astype(float)
+
+    result = pd.DataFrame({"txn_type": grouped.index, "total_transactions": grouped["N"].astype(int)})
+    result["total_volume"] = grouped["volume"].round(2).values
+    result["total_volume_moe"] = _margin(grouped["volume_var"]).round(2).values
+    result["avg_amount"] = (grouped["volume"] / grouped["N"]).round(2).values
+    result["avg_amount_moe"] = (_margin(grouped["volume_var"]) / grouped["N"]).round(2).values
+    for column in ("successful", "failed"):
+        result[column] = grouped[column].round().astype(int).values
+        result[f"{column}_moe"] = _margin(grouped[f"{column}_var"]).round().astype(int).values
+    result = result.sort_values("total_volume", ascending=False, ignore_index=True)
+    sampled = int(strata["n"].sum())
+    note = f"{sampled:,} sampled of {int(strata['N'].sum()):,} transactions in {len(strata):,} strata"
+    if exact:
+        note += f", {int(sum(frame['N'].sum() for frame in exact)):,} in partial months read exactly"
+    return result, note
+
+
+HIGH_VALUE_SQL = '''
+SELECT
+    t.customer_id,
+    c.name,
+    c.city,
+    COUNT(*) as high_value_txn_count,
+    ROUND(SUM(t.amount), 2) as total_high_value_amount,
+    ROUND(AVG(t.amount), 2) as avg_high_value_amount
+FROM transactions t
+JOIN customers c ON t.customer_key = c.customer_key
+WHERE t.amount > {amount} AND t.customer_key IN ({keys})
+GROUP BY t.customer_key, t.customer_id, c.name, c.city
+HAVING COUNT(*) >= {min_count}
+ORDER BY high_value_txn_count DESC
+'''
+
+
+def high_value_candidates(conn, start=None, end=None):
+    """
+    Customer keys whose Count-Min estimate over the window reaches
+    HIGH_VALUE_MIN_COUNT; a superset of the true answer.
+    """
+    first, last = _month_range(start, end)
+    sketches = _load_sketches(conn, 'high_value_customers')
+    table = cms_new()
+    for (_, month), sketch in sketches.items():
+        if (first is None or month >= first) and (last is None or month <= last):
+            table += sketch
+    keys = np.array([key for (key,) in conn.execute("SELECT customer_key FROM customers")
+                     if key is not None], dtype=np.int64)
+    return keys[cms_estimate(table, keys) >= HIGH_VALUE_MIN_COUNT], len(keys)
+
+
+def approx_high_value_accounts(conn, start=None, end=None):
+    """Q8, exact, reading only the customers the Count-Min sketch cannot rule out."""
+    candidates, customers = high_value_candidates(conn, start, end)
+    if not len(candidates):
+        empty = pd.DataFrame(columns=["customer_id", "name", "city", "high_value_txn_count",
+                                      "total_high_value_amount", "avg_high_value_amount"])
+        return empty, f"no candidates among {customers:,} customers"
+    sql = HIGH_VALUE_SQL.format(amount=HIGH_VALUE_AMOUNT, min_count=HIGH_VALUE_MIN_COUNT,
+                                keys=", ".join(str(key) for key in candidates.tolist()))
+    df = read_with_archive(conn, _own_backend(conn), sql, start, end).to_pandas()
+    return df, f"exact; {len(candidates):,} of {customers:,} customers left after Count-Min pruning"
+
+
+def _loan_customer_registers(conn, first_month=None, partial=None):
+    """
+    HyperLogLog registers of loan customers per branch: the sketches of
+    start months from first_month on (all when None) merged, plus the
+    customers of the loans in partial, read exactly.
+    """
+    registers = {}
+    for (branch_id, month), sketch in _load_sketches(conn, 'loan_customers').items():
+        if first_month is None or month >= first_month:
+            np.maximum(registers.setdefault(branch_id, hll_new()), sketch, out=registers[branch_id])
+    if partial is not None:
+        for branch_id, group in partial.groupby("branch_id"):
+            hll_add(registers.setdefault(branch_id, hll_new()),
+                    group["Customer_ID"].dropna().astype(np.int64).to_numpy())
+    return registers
+
+
+def approx_branch_loans(conn, start=None, end=None, months=6, limit=5):
+    """
+    Q7 from the loan totals and customer sketches. Months wholly after
+    the cutoff are merged and the cutoff's own month is read exactly, so
+    only the distinct customer counts are estimated. start/end limit
+    transactions, which Q7 does not read.
+    """
+    # The cutoff day exactly as the catalog query computes it
+    cutoff_day = conn.execute(
+        f"SELECT CAST(julianday('now', '-{int(months)} months', 'start of day') - 2440587.5 AS INTEGER)"
+    ).fetchone()[0]
+    cutoff_month = month_key(EPOCH + pd.Timedelta(days=cutoff_day))
+    next_month = _month_start(cutoff_month) + pd.DateOffset(months=1)
+
+    totals = pd.read_sql_query(
+        "SELECT branch_id, SUM(loans) AS loans, SUM(volume) AS volume FROM approx_loan_months "
+        "WHERE start_month > ? GROUP BY branch_id", conn, params=(cutoff_month,)).set_index("branch_id")
+    partial = pd.read_sql_query(LOAN_ROW_SQL + " WHERE branch_id IS NOT NULL AND start_day >= ? AND start_day < ?",
+                                conn, params=(cutoff_day, (next_month - EPOCH).days))
+    exact = partial.groupby("branch_id").agg(loans=("Loan_ID", "size"), volume=("Loan_Amount", "sum"))
+    registers = _loan_customer_registers(conn, month_key(next_month), partial)
+
+    branches = pd.read_sql_query("SELECT Branch_ID, Branch_Name, City FROM branches", conn)
+    rows = []
+    for branch_id, name, city in branches.itertuples(index=False):
+        loans = totals["loans"].get(branch_id, 0) + exact["loans"].get(branch_id, 0)
+        if not loans:
+            continue
+        customers, customers_moe = hll_count(registers.get(branch_id, hll_new()))
+        volume = totals["volume"].get(branch_id, 0.0) + exact["volume"].get(branch_id, 0.0)
+        rows.append({
+            "Branch_Name": name, "City": city,
+            "total_customers": int(round(customers)), "total_customers_moe": int(math.ceil(customers_moe)),
+            "total_loans": int(loans), "total_loan_volume": round(float(volume), 2),
+        })
+    result = pd.DataFrame(rows, columns=["Branch_Name", "City", "total_customers", "total_customers_moe",
+                                         "total_loans", "total_loan_volume"])
+    result = result.sort_values("total_loan_volume", ascending=False, ignore_index=True).head(limit)
+    return result, (f"{len(registers):,} branches' customer sketches, "
+                    f"{len(partial):,} loans in the cutoff month read exactly")
+
+
+BRANCH_PERFORMANCE_SQL = '''
+SELECT
+    b.Branch_ID,
+    b.Branch_Name,
+    b.City,
+    b.Manager_Name,
+    b.Total_Employees,
+    s.total_loans,
+    ROUND(s.total_loan_amount, 2) as total_loan_amount,
+    s.total_cards,
+    s.open_tickets,
+    ROUND(b.Branch_Revenue, 2) as branch_revenue,
+    b.Performance_Rating
+FROM branches b
+JOIN branch_summary s ON s.branch_id = b.Branch_ID
+ORDER BY b.Performance_Rating DESC, branch_revenue DESC
+'''
+
+
+def approx_branch_performance(conn, start=None, end=None):
+    """
+    Q13 with each branch's distinct loan customers merged from its
+    customer sketches; the other columns are read from branch_summary.
+    """
+    df = pd.read_sql_query(BRANCH_PERFORMANCE_SQL, conn)
+    registers = _loan_customer_registers(conn)
+    estimates = [hll_count(registers[branch_id]) if branch_id in registers else (0.0, 0.0)
+                 for branch_id in df.pop("Branch_ID")]
+    df.insert(4, "total_loan_customers", [int(round(customers)) for customers, _ in estimates])
+    df.insert(5, "total_loan_customers_moe", [int(math.ceil(moe)) for _, moe in estimates])
+    return df, f"loan customers from {len(registers):,} branches' sketches; the rest exact"
+
+
+# Catalog "approximate" name -> estimator(conn, start, end) -> (df, note)
+ESTIMATORS = {
+    "transaction_volume": approx_transaction_volume,
+    "branch_loans": approx_branch_loans,
+    "high_value_accounts": approx_high_value_accounts,
+    "branch_performance": approx_branch_performance,
+}
+
+
+def run_approximate(conn, name, start=None, end=None):
+    """
+    Answer a catalog query from the samples and sketches as they stand;
+    the loader and ApproxRefresher keep them current. Columns ending in
+    _moe are 95% margins of error. Returns (df, note).
+    """
+    if not approx_available(conn):
+        raise ValueError("No samples or sketches yet; run python approx_analytics.py")
+    df, note = ESTIMATORS[name](conn, start, end)
+    pending = pending_changes(conn)
+    if pending:
+        note += f"; {pending:,} newer changes not folded in yet"
+    return df, note
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Approximate analytics from samples and sketches")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="rebuild every sample and sketch")
+    parser.add_argument("--interval", type=float, help="keep refreshing every N seconds")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        while True:
+            result = refresh_approx(conn, full=args.rebuild)
+            print(f"✓ {result['mode'].capitalize()} refresh in {result['seconds'] * 1000:,.0f} ms "
+                  f"({result['transactions']:,} transactions, {result['loans']:,} loans)")
+            if not args.interval:
+                break
+            args.rebuild = False
+            time.sleep(args.interval)
+        for name, estimator in ESTIMATORS.items():
+            start = time.perf_counter()
+            df, note = estimator(conn)
+            print(f"\n{name} ({note}, {(time.perf_counter() - start) * 1000:,.0f} ms)")
+            print(df.head(10).to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Arrow result path.
+Query results are fetched as Arrow tables (ADBC for SQLite, native for
+DuckDB) and wrapped as Arrow-backed pandas frames, so large results never
+become per-cell Python objects on their way to st.dataframe or an export.
+"""
+import io
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+FETCH_BATCH_ROWS = 65536
+
+
+def arrow_to_frame(table):
+    """
+    Wrap an Arrow table as a pandas DataFrame backed by Arrow arrays.
+    """
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def frame_to_arrow(df):
+    """
+    Return the Arrow table behind a frame (zero-copy for Arrow-backed frames).
+    """
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def fetch_arrow_sqlite3(conn, sql, params=None, batch_rows=FETCH_BATCH_ROWS):
+    """
+    Build an Arrow table from a plain sqlite3 connection.
+    Rows are transposed into columns batch by batch, skipping the pandas
+    object-dtype frame that read_sql_query would build. Used when ADBC is
+    not installed or the query needs the caller's own connection.
+    """
+    cursor = conn.execute(sql, params or ())
+    names = [col[0] for col in cursor.description]
+    batches = []
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            break
+        columns = list(zip(*rows))
+        batches.append(pa.record_batch(
+            [_to_arrow_array(values) for values in columns], names=names
+        ))
+    if not batches:
+        return pa.table({name: pa.array([], type=pa.null()) for name in names})
+    return _concat_batches(batches)
+
+
+def _to_arrow_array(values):
+    """SQLite columns may mix types; fall back to strings when they do."""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _concat_batches(batches):
+    """Concatenate batches whose inferred types may differ between batches."""
+    tables = [pa.Table.from_batches([batch]) for batch in batches]
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        tables = [t.cast(pa.schema([(f.name, pa.string()) for f in t.schema])) for t in tables]
+        return pa.concat_tables(tables)
+
+
+class AdbcSQLiteReader:
+    """
+    Fetches SQLite results straight into Arrow through the ADBC driver.
+    ADBC connections are not thread-safe, so each thread gets its own.
+    Falls back to fetch_arrow_sqlite3 if the driver is missing or cannot
+    type a column (e.g. mixed values written through the CRUD page).
+    db_path may be a SQLite URI; init_sql runs on every new connection.
+    """
+
+    def __init__(self, db_path, fallback_conn=None, init_sql=()):
+        self.db_path = db_path
+        self.fallback_conn = fallback_conn
+        self.init_sql = list(init_sql)
+        self._local = threading.local()
+        try:
+            import adbc_driver_sqlite.dbapi  # noqa: F401
+            self.available = db_path is not None
+        except ImportError:
+            self.available = False
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import adbc_driver_sqlite.dbapi
+
+            conn = adbc_driver_sqlite.dbapi.connect(self.db_path)
+            for statement in self.init_sql:
+                cursor = conn.cursor()
+                cursor.execute(statement)
+                cursor.close()
+            self._local.conn = conn
+        return conn
+
+    def fetch_arrow(self, sql, params=None):
+        if self.available:
+            try:
+                cursor = self._connection().cursor()
+                try:
+                    cursor.execute(sql, params)
+                    return cursor.fetch_arrow_table()
+                finally:
+                    cursor.close()
+            except Exception:
+                if self.fallback_conn is None:
+                    raise
+        return fetch_arrow_sqlite3(self.fallback_conn, sql, params)
+
+
+def frame_to_csv_bytes(df):
+    """
+    Serialize a frame to CSV with Arrow's writer.
+    """
+    import pyarrow.csv as pa_csv
+
+    buffer = io.BytesIO()
+    pa_csv.write_csv(frame_to_arrow(df), buffer)
+    return buffer.getvalue()
+
+
+def frame_to_parquet_bytes(df):
+    """
+    Serialize a frame to a zstd-compressed Parquet file in memory.
+    """
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    pq.write_table(frame_to_arrow(df), buffer, compression="zstd")
+    return buffer.getvalue()
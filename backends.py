@@ -0,0 +1,195 @@
+"""
+Query backends for BankSight.
+SQLite serves the OLTP paths (CRUD, simulation) and remains the default
+for everything. An optional embedded DuckDB engine can serve the
+scan-heavy analytical queries from banking.db (read-only ATTACH) or from
+Parquet snapshots of it.
+"""
+import os
+import sqlite3
+
+import pandas as pd
+
+from arrow_results import AdbcSQLiteReader, arrow_to_frame
+from index_advisor import captured
+
+DB_PATH = 'database/banking.db'
+PARQUET_DIR = 'database/parquet'
+
+SNAPSHOT_TABLES = ['customer_keys', 'customers', 'accounts', 'transactions', 'branches',
+                   'loans', 'credit_cards', 'support_tickets', 'branch_summary',
+                   'customer_segments', 'ticket_open_counts', 'ticket_sla_queue']
+
+
+class SQLiteBackend:
+    """
+    Runs queries on a SQLite connection.
+    Reads go through ADBC into Arrow when the driver is installed.
+    """
+    name = "sqlite"
+    dialect = "sqlite"
+
+    def __init__(self, conn=None, db_path=DB_PATH, reader=None):
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn = conn
+        self.reader = reader or AdbcSQLiteReader(database_file(conn), fallback_conn=conn)
+
+    def read_arrow(self, sql, params=None):
+        with captured(sql, params, source="backend"):
+            return self.reader.fetch_arrow(sql, params)
+
+    def read_frame(self, sql, params=None):
+        return arrow_to_frame(self.read_arrow(sql, params))
+
+    def close(self):
+        self.conn.close()
+
+
+class DuckDBBackend:
+    """
+    Runs queries on an in-process DuckDB engine over read-only data.
+    With parquet_dir set, each table is a view over <parquet_dir>/<table>.parquet;
+    otherwise banking.db is attached read-only through the sqlite extension.
+    """
+    name = "duckdb"
+    dialect = "duckdb"
+
+    def __init__(self, db_path=DB_PATH, parquet_dir=None):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise RuntimeError("DuckDB backend requires the 'duckdb' package (pip install duckdb)") from e
+
+        self.conn = duckdb.connect()
+        self.source = parquet_dir or db_path
+
+        if parquet_dir:
+            source = "read_parquet('{path}')"
+        else:
+            self.conn.execute("INSTALL sqlite")
+            self.conn.execute("LOAD sqlite")
+            self.conn.execute(f"ATTACH '{db_path}' AS bank (TYPE sqlite, READ_ONLY)")
+            source = "bank.{table_name}"
+
+        # Views in the default catalog are visible to every cursor
+        for table_name in self._available_tables(parquet_dir):
+            path = os.path.join(parquet_dir, f"{table_name}.parquet") if parquet_dir else None
+            self.conn.execute(
+                f"CREATE VIEW {table_name} AS SELECT * FROM "
+                + source.format(path=path, table_name=table_name)
+            )
+
+    def _available_tables(self, parquet_dir):
+        if parquet_dir:
+            return [t for t in SNAPSHOT_TABLES
+                    if os.path.exists(os.path.join(parquet_dir, f"{t}.parquet"))]
+        attached = {row[0] for row in self.conn.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_catalog = 'bank'"
+        ).fetchall()}
+        return [t for t in SNAPSHOT_TABLES if t in attached]
+
+    def read_arrow(self, sql, params=None):
+        # A cursor per call keeps concurrent Streamlit sessions independent
+        result = self.conn.cursor().execute(sql, params or [])
+        if hasattr(result, "to_arrow_table"):
+            return result.to_arrow_table()
+        return result.fetch_arrow_table()
+
+    def read_frame(self, sql, params=None):
+        return arrow_to_frame(self.read_arrow(sql, params))
+
+    def close(self):
+        self.conn.close()
+
+
+def database_file(conn):
+    """
+    Return the file behind a SQLite connection's main database, or None
+    for in-memory databases.
+    """
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path or None
+    return None
+
+
+class QueryRouter:
+    """
+    Picks a backend per query: OLAP queries go to the analytics backend
+    when one is configured, everything else stays on SQLite.
+    """
+
+    def __init__(self, oltp_backend, olap_backend=None):
+        self.oltp_backend = oltp_backend
+        self.olap_backend = olap_backend
+
+    def backend_for(self, query_info):
+        if self.olap_backend is not None and query_info.get("workload") == "olap":
+            return self.olap_backend
+        return self.oltp_backend
+
+
+def query_for_backend(query_info, backend):
+    """
+    Return the SQL text of a catalog query in the backend's dialect.
+    """
+    return query_info.get(f"{backend.dialect}_query", query_info["query"])
+
+
+def export_parquet_snapshot(conn, out_dir=PARQUET_DIR, chunksize=500000):
+    """
+    Write every analytics table to <out_dir>/<table>.parquet.
+    Tables are streamed in chunks so large transaction tables never sit
+    fully in memory. Files are written next to their target and renamed
+    into place, so a DuckDB backend never sees a half-written file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    # transactions is a view over its month partitions
+    existing = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+    )}
+    for table_name in SNAPSHOT_TABLES:
+        if table_name not in existing:
+            continue
+
+        path = os.path.join(out_dir, f"{table_name}.parquet")
+        tmp_path = path + ".tmp"
+        writer = None
+        rows = 0
+        for chunk in pd.read_sql_query(f"SELECT * FROM {table_name}", conn, chunksize=chunksize):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema, compression="zstd")
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+        if writer is not None:
+            writer.close()
+            os.replace(tmp_path, path)
+        print(f"✓ Exported {rows:,} rows from {table_name}")
+
+
+def create_analytics_backend(db_path=DB_PATH, parquet_dir=None):
+    """
+    Return a DuckDB backend if DuckDB is usable here, else None so callers
+    fall back to SQLite.
+    """
+    try:
+        return DuckDBBackend(db_path=db_path, parquet_dir=parquet_dir)
+    except Exception as e:
+        print(f"⚠️ DuckDB analytics backend unavailable, using SQLite: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Refresh the Parquet snapshot served by the DuckDB analytics backend
+    conn = sqlite3.connect(DB_PATH)
+    export_parquet_snapshot(conn)
+    conn.close()
+    print(f"\n🎉 Parquet snapshot saved at: {PARQUET_DIR}")
@@ -0,0 +1,242 @@
+"""
+Headless analytics pack.
+Runs any subset of the catalog in sql_queries.get_all_queries()
+concurrently, each query on its own read-only connection, and writes
+every result as CSV and/or Parquet plus a timing summary. A manifest in
+the output directory remembers the database fingerprint each result was
+produced at, so unchanged queries over unchanged data are reused.
+
+Run from the project root, e.g.:
+    python batch_report.py
+    python batch_report.py --queries Q1 Q5 Q16 --format parquet --workers 4
+    python batch_report.py --engine auto --force
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backends import DB_PATH, PARQUET_DIR, SQLiteBackend, create_analytics_backend, query_for_backend
+from result_store import database_fingerprint
+from sql_queries import get_all_queries
+from txn_archive import read_with_archive
+
+REPORT_DIR = 'reports'
+MANIFEST_FILE = 'manifest.json'
+SUMMARY_FILE = 'timing_summary.csv'
+FORMATS = ('csv', 'parquet')
+
+
+def select_queries(queries, selected=None):
+    """
+    Pick catalog entries by full key or by their "Q<n>" prefix.
+    """
+    if not selected:
+        return list(queries)
+    by_id = {key.split(':')[0].strip().upper(): key for key in queries}
+    keys = []
+    for item in selected:
+        key = item if item in queries else by_id.get(item.strip().upper())
+        if key is None:
+            raise ValueError(f"Unknown query: {item}")
+        keys.append(key)
+    return keys
+
+
+def result_basename(query_key):
+    """File-system friendly name for a query, e.g. Q1_Customers_per_City."""
+    return re.sub(r'[^A-Za-z0-9]+', '_', query_key).strip('_')
+
+
+def open_read_connection(db_path):
+    """A dedicated read-only connection for one worker task."""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+
+def write_result(table, out_dir, basename, formats):
+    """
+    Write an Arrow table in each format, renaming into place so a reader
+    never sees a partial file. Returns the written file names.
+    """
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    written = []
+    for fmt in formats:
+        name = f"{basename}.{fmt}"
+        path = os.path.join(out_dir, name)
+        tmp_path = path + ".tmp"
+        if fmt == 'csv':
+            pa_csv.write_csv(table, tmp_path)
+        else:
+            pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        written.append(name)
+    return written
+
+
+def run_query(query_key, query_info, db_path, out_dir, formats, olap_backend=None):
+    """
+    Run one catalog query and write its result. Returns a manifest entry.
+    """
+    conn = open_read_connection(db_path)
+    try:
+        backend = SQLiteBackend(conn)
+        if olap_backend is not None and query_info.get("workload") == "olap":
+            backend = olap_backend
+        sql = query_for_backend(query_info, backend)
+
+        start = time.perf_counter()
+        table = read_with_archive(conn, backend, sql)
+        query_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        files = write_result(table, out_dir, result_basename(query_key), formats)
+        write_ms = (time.perf_counter() - start) * 1000
+    finally:
+        conn.close()
+
+    return {
+        "engine": backend.name,
+        "rows": table.num_rows,
+        "files": files,
+        "query_ms": round(query_ms, 1),
+        "write_ms": round(write_ms, 1),
+    }
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"queries": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def is_reusable(entry, fingerprint, query_info, formats, out_dir):
+    """
+    A previous result is reused when it was produced at the same database
+    fingerprint, from the same SQL, and every requested file still exists.
+    """
+    if entry is None or entry.get("fingerprint") != fingerprint:
+        return False
+    if entry.get("catalog_sha") != _catalog_sha(query_info):
+        return False
+    basename = os.path.splitext(entry["files"][0])[0] if entry.get("files") else None
+    return basename is not None and all(
+        os.path.exists(os.path.join(out_dir, f"{basename}.{fmt}")) for fmt in formats
+    )
+
+
+def _catalog_sha(query_info):
+    """Hash of a catalog entry's SQL in every dialect."""
+    texts = [query_info[k] for k in sorted(query_info) if k.endswith("query")]
+    return hashlib.sha256("\n".join(texts).encode()).hexdigest()
+
+
+def run_batch(query_keys=None, db_path=DB_PATH, out_dir=REPORT_DIR, formats=FORMATS,
+              workers=None, engine="sqlite", force=False):
+    """
+    Run the selected queries and write the pack. Returns the summary rows.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    queries = get_all_queries()
+    keys = select_queries(queries, query_keys)
+    fingerprint = database_fingerprint(db_path)
+    manifest = load_manifest(out_dir)
+
+    olap_backend = None
+    if engine == "auto":
+        parquet_dir = PARQUET_DIR if os.path.isdir(PARQUET_DIR) else None
+        olap_backend = create_analytics_backend(db_path=db_path, parquet_dir=parquet_dir)
+
+    summary = {}
+    pending = []
+    for key in keys:
+        entry = manifest["queries"].get(key)
+        if not force and is_reusable(entry, fingerprint, queries[key], formats, out_dir):
+            summary[key] = {"query": key, "status": "reused", "engine": entry["engine"],
+                            "rows": entry["rows"], "query_ms": 0.0, "write_ms": 0.0}
+        else:
+            pending.append(key)
+
+    print(f"Running {len(pending)} of {len(keys)} queries "
+          f"({len(keys) - len(pending)} reused) with {workers or 'default'} workers\n")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_query, key, queries[key], db_path, out_dir, formats, olap_backend): key
+            for key in pending
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"✗ {key}: {e}")
+                summary[key] = {"query": key, "status": "failed", "engine": "",
+                                "rows": 0, "query_ms": 0.0, "write_ms": 0.0}
+                manifest["queries"].pop(key, None)
+                continue
+            entry["fingerprint"] = fingerprint
+            entry["catalog_sha"] = _catalog_sha(queries[key])
+            manifest["queries"][key] = entry
+            summary[key] = {"query": key, "status": "ran", "engine": entry["engine"],
+                            "rows": entry["rows"], "query_ms": entry["query_ms"],
+                            "write_ms": entry["write_ms"]}
+            print(f"✓ {key}: {entry['rows']:,} rows in {entry['query_ms']:.1f} ms")
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if olap_backend is not None:
+        olap_backend.close()
+    save_manifest(out_dir, manifest)
+
+    rows = [summary[key] for key in keys]
+    with open(os.path.join(out_dir, SUMMARY_FILE), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["query", "status", "engine", "rows", "query_ms", "write_ms"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"\n{'Query':<58}{'Status':>8}{'Rows':>9}{'Query ms':>11}{'Write ms':>10}")
+    for row in rows:
+        print(f"{row['query'][:57]:<58}{row['status']:>8}{row['rows']:>9,}"
+              f"{row['query_ms']:>11.1f}{row['write_ms']:>10.1f}")
+    serial_ms = sum(row["query_ms"] + row["write_ms"] for row in rows)
+    print(f"\nWall time: {wall_ms:,.1f} ms (sum of task times: {serial_ms:,.1f} ms)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run BankSight analytical queries headlessly")
+    parser.add_argument("--queries", nargs="*", help="query keys or ids such as Q1 Q5 (default: all)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", choices=["sqlite", "auto"], default="sqlite",
+                        help="auto runs OLAP queries on DuckDB when available")
+    parser.add_argument("--force", action="store_true", help="ignore reusable results")
+    args = parser.parse_args()
+
+    rows = run_batch(args.queries, args.db, args.out, args.format, args.workers, args.engine, args.force)
+    failed = [row for row in rows if row["status"] == "failed"]
+    if failed:
+        raise SystemExit(f"⚠️ {len(failed)} queries failed")
+    print(f"\n🎉 Analytics pack saved at: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
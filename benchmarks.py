@@ -0,0 +1,662 @@
+"""
+Benchmarks for the BankSight database layer.
+Run from the project root, e.g.:
+    python benchmarks.py keys --scale 20
+    python benchmarks.py backends --scale 50
+    python benchmarks.py arrow --scale 50
+    python benchmarks.py app --repeat 3
+    python benchmarks.py postings --threads 16 --postings 4000
+    python benchmarks.py reconcile --scale 2000
+    python benchmarks.py statements --scale 2000 --workers 8
+    python benchmarks.py interest --accounts 10000000
+    python benchmarks.py approx --scale 200
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from approx_analytics import build_approx
+from arrow_results import AdbcSQLiteReader, arrow_to_frame, fetch_arrow_sqlite3
+from backends import DuckDBBackend, SQLiteBackend, export_parquet_snapshot, query_for_backend
+from interest_accrual import accrue_interest
+from posting_queue import PostingQueue, apply_posting
+from reconciliation import reconcile
+from sql_queries import execute_query, get_all_queries
+from statements import generate_statements
+from txn_archive import touches_transactions
+from txn_partitions import TRANSACTION_COLUMNS, partition_tables, refresh_row_counts, unsealed
+
+DEFAULT_DB = 'database/banking.db'
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+# Runs in a fresh interpreter so the first render pays every import
+APP_TIMING_SCRIPT = '''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+def timed(run):
+    start = time.perf_counter()
+    run()
+    return (time.perf_counter() - start) * 1000
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+result = {"first_render_ms": timed(at.run), "pages": {}}
+nav = at.sidebar.radio[0]
+for page in nav.options:
+    first_visit = timed(lambda: at.sidebar.radio[0].set_value(page).run())
+    rerun = timed(at.run)
+    result["pages"][page] = [first_visit, rerun]
+print(json.dumps(result))
+'''
+
+
+def time_query(conn, sql, repeat=5):
+    """
+    Run a query several times and return the median wall time in ms.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def index_size_bytes(conn, index_name):
+    """
+    Return the on-disk size of an index using the dbstat virtual table,
+    or None if SQLite was built without it.
+    """
+    try:
+        row = conn.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (index_name,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0]
+
+
+def scratch_copy(db_path):
+    """
+    Copy a database into a temporary directory with the backup API so
+    benchmarks can add indexes and rows without touching the original.
+    """
+    scratch_dir = tempfile.mkdtemp(prefix='banksight_bench_')
+    scratch_path = os.path.join(scratch_dir, 'banking.db')
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(scratch_path)
+    source.backup(target)
+    source.close()
+    return target, scratch_dir
+
+
+def scale_transactions(conn, factor):
+    """
+    Replicate the transactions table `factor` times with fresh txn_ids.
+    Copies stay in their month partition, sealed ones included.
+    """
+    if factor <= 1:
+        return
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    select_cols = ", ".join(
+        "txn_id || '-' || :copy" if col == 'txn_id' else col for col in TRANSACTION_COLUMNS
+    )
+    with unsealed(conn):
+        for table_name in partition_tables(conn):
+            conn.execute(f"CREATE TEMP TABLE txn_seed AS SELECT * FROM {table_name}")
+            for copy in range(1, factor):
+                conn.execute(
+                    f"INSERT INTO {table_name} ({columns}) SELECT {select_cols} FROM txn_seed",
+                    {"copy": copy},
+                )
+            conn.execute("DROP TABLE txn_seed")
+    refresh_row_counts(conn)
+
+
+def scale_accounts(conn, factor, transactions=True):
+    """
+    Replicate customers and accounts `factor` times as new customers (with
+    their own customer_key), each copy with its own copy of the original
+    customer's transactions unless transactions=False.
+    """
+    if factor <= 1:
+        return
+    stride = conn.execute("SELECT MAX(customer_key) FROM customers").fetchone()[0]
+
+    def copy_select(table_columns, text_columns):
+        return ", ".join(
+            f"{col} || '-' || :copy" if col in text_columns
+            else "customer_key + :copy * :stride" if col == 'customer_key'
+            else col
+            for col in table_columns
+        )
+
+    seeds = {}
+    for table_name in ('customers', 'accounts'):
+        table_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+        conn.execute(f"CREATE TEMP TABLE {table_name}_seed AS SELECT * FROM {table_name}")
+        seeds[table_name] = (", ".join(table_columns), copy_select(table_columns, ('customer_id',)))
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    txn_select = copy_select(TRANSACTION_COLUMNS, ('txn_id', 'customer_id'))
+    with unsealed(conn):
+        for copy in range(1, factor):
+            for table_name, (table_columns, select) in seeds.items():
+                conn.execute(f"INSERT INTO {table_name} ({table_columns}) "
+                             f"SELECT {select} FROM {table_name}_seed", {"copy": copy, "stride": stride})
+        for table_name in partition_tables(conn) if transactions else []:
+            conn.execute(f"CREATE TEMP TABLE txn_seed AS SELECT * FROM {table_name}")
+            for copy in range(1, factor):
+                conn.execute(f"INSERT INTO {table_name} ({columns}) SELECT {txn_select} FROM txn_seed",
+                             {"copy": copy, "stride": stride})
+            conn.execute("DROP TABLE txn_seed")
+    for table_name in seeds:
+        conn.execute(f"DROP TABLE {table_name}_seed")
+    refresh_row_counts(conn)
+
+
+def drop_change_capture(conn):
+    """Scaling is a reload, not a stream of changes to capture."""
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_cdc_%'"
+    ).fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+
+
+# Each benchmark pair is (text-key join, surrogate-key join) for the same answer
+KEY_JOIN_BENCHMARKS = {
+    "customers ⋈ accounts": (
+        """SELECT c.city, COUNT(*), AVG(a.account_balance)
+           FROM customers c JOIN accounts a ON c.customer_id = a.customer_id
+           GROUP BY c.city""",
+        """SELECT c.city, COUNT(*), AVG(a.account_balance)
+           FROM customers c JOIN accounts a ON c.customer_key = a.customer_key
+           GROUP BY c.city""",
+    ),
+    "transactions ⋈ customers": (
+        """SELECT c.city, COUNT(*), SUM(t.amount)
+           FROM transactions t JOIN customers c ON t.customer_id = c.customer_id
+           GROUP BY c.city""",
+        """SELECT c.city, COUNT(*), SUM(t.amount)
+           FROM transactions t JOIN customers c ON t.customer_key = c.customer_key
+           GROUP BY c.city""",
+    ),
+    "loans ⋈ customers": (
+        """SELECT c.city, COUNT(*), SUM(l.Loan_Amount)
+           FROM loans l JOIN customers c
+             ON c.customer_id = 'CUST' || printf('%05d', l.Customer_ID)
+           GROUP BY c.city""",
+        """SELECT c.city, COUNT(*), SUM(l.Loan_Amount)
+           FROM loans l JOIN customers c ON l.customer_key = c.customer_key
+           GROUP BY c.city""",
+    ),
+    "credit_cards ⋈ transactions": (
+        """SELECT cc.Card_Type, COUNT(*), SUM(t.amount)
+           FROM credit_cards cc JOIN transactions t
+             ON t.customer_id = 'CUST' || printf('%05d', cc.Customer_ID)
+           GROUP BY cc.Card_Type""",
+        """SELECT cc.Card_Type, COUNT(*), SUM(t.amount)
+           FROM credit_cards cc JOIN transactions t ON t.customer_key = cc.customer_key
+           GROUP BY cc.Card_Type""",
+    ),
+}
+
+KEY_INDEX_PAIRS = [
+    ("accounts", "customer_id", "customer_key"),
+    ("transactions", "customer_id", "customer_key"),
+    ("support_tickets", "Customer_ID", "customer_key"),
+]
+
+
+def benchmark_keys(db_path=DEFAULT_DB, scale=1, repeat=5):
+    """
+    Compare text customer IDs with integer surrogate keys:
+    index size per table and latency of representative cross-domain joins.
+    """
+    conn, scratch_dir = scratch_copy(db_path)
+    try:
+        scale_transactions(conn, scale)
+        txn_count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        print(f"Benchmarking customer keys on {txn_count:,} transactions\n")
+
+        # Build both index flavours side by side; the loader only keeps key indexes
+        print(f"{'Index':<20}{'TEXT key':>14}{'INTEGER key':>14}{'Saved':>9}")
+        for table_name, text_col, key_col in KEY_INDEX_PAIRS:
+            # Partitioned transactions: one index per partition, sizes summed
+            targets = partition_tables(conn) if table_name == "transactions" else [table_name]
+            text_size = key_size = 0
+            for target in targets:
+                conn.execute(f"CREATE INDEX bench_text_{target} ON {target}({text_col})")
+                conn.execute(f"CREATE INDEX bench_key_{target} ON {target}({key_col})")
+                conn.commit()
+                text_part = index_size_bytes(conn, f"bench_text_{target}")
+                key_part = index_size_bytes(conn, f"bench_key_{target}")
+                if text_part is None:
+                    text_size = None
+                    break
+                text_size += text_part
+                key_size += key_part
+            if text_size is None:
+                print(f"{table_name:<20}{'dbstat unavailable':>28}")
+                continue
+            saved = 100 * (1 - key_size / text_size)
+            print(f"{table_name:<20}{text_size:>14,}{key_size:>14,}{saved:>8.1f}%")
+
+        print(f"\n{'Join':<30}{'TEXT ms':>10}{'INTEGER ms':>12}{'Speedup':>10}")
+        for name, (text_sql, key_sql) in KEY_JOIN_BENCHMARKS.items():
+            text_ms = time_query(conn, text_sql, repeat)
+            key_ms = time_query(conn, key_sql, repeat)
+            print(f"{name:<30}{text_ms:>10.2f}{key_ms:>12.2f}{text_ms / key_ms:>9.1f}x")
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def time_frame(backend, sql, repeat=5):
+    """
+    Median wall time in ms to fetch a query into a DataFrame, plus the result.
+    """
+    timings = []
+    df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = backend.read_frame(sql)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), df
+
+
+def benchmark_backends(db_path=DEFAULT_DB, scale=1, repeat=5, parquet_dir=None):
+    """
+    Run every catalog query on SQLite and on DuckDB and compare latency.
+    DuckDB reads a Parquet snapshot (exported to a scratch directory unless
+    parquet_dir is given) so the comparison needs no sqlite extension.
+    """
+    conn, scratch_dir = scratch_copy(db_path)
+    try:
+        scale_transactions(conn, scale)
+        txn_count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        print(f"Benchmarking backends on {txn_count:,} transactions\n")
+
+        if parquet_dir is None:
+            parquet_dir = os.path.join(scratch_dir, 'parquet')
+            export_parquet_snapshot(conn, parquet_dir)
+            print()
+
+        sqlite_backend = SQLiteBackend(conn)  # reads the scratch file via ADBC
+        duckdb_backend = DuckDBBackend(parquet_dir=parquet_dir)
+
+        print(f"{'Query':<58}{'Workload':>9}{'SQLite ms':>11}{'DuckDB ms':>11}{'Speedup':>9}{'Rows':>7}")
+        for key, query_info in get_all_queries().items():
+            sqlite_ms, sqlite_df = time_frame(
+                sqlite_backend, query_for_backend(query_info, sqlite_backend), repeat)
+            try:
+                duckdb_ms, duckdb_df = time_frame(
+                    duckdb_backend, query_for_backend(query_info, duckdb_backend), repeat)
+            except Exception as e:
+                print(f"{key[:57]:<58}{query_info.get('workload', ''):>9}{sqlite_ms:>11.2f}"
+                      f"  ✗ DuckDB error: {e}")
+                continue
+            rows = "ok" if len(sqlite_df) == len(duckdb_df) else f"{len(sqlite_df)}≠{len(duckdb_df)}"
+            print(f"{key[:57]:<58}{query_info.get('workload', ''):>9}{sqlite_ms:>11.2f}"
+                  f"{duckdb_ms:>11.2f}{sqlite_ms / duckdb_ms:>8.1f}x{rows:>7}")
+
+        duckdb_backend.close()
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def benchmark_arrow(db_path=DEFAULT_DB, scale=1, repeat=5):
+    """
+    Compare pd.read_sql_query with the Arrow result path on a full
+    transactions read: wall time and resulting frame memory.
+    """
+    conn, scratch_dir = scratch_copy(db_path)
+    try:
+        scale_transactions(conn, scale)
+        scratch_path = os.path.join(scratch_dir, 'banking.db')
+        sql = "SELECT * FROM transactions"
+        txn_count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        print(f"Benchmarking result fetch on {txn_count:,} transactions\n")
+
+        adbc = AdbcSQLiteReader(scratch_path)
+        paths = {
+            "pd.read_sql_query": lambda: pd.read_sql_query(sql, conn),
+            "sqlite3 → Arrow": lambda: arrow_to_frame(fetch_arrow_sqlite3(conn, sql)),
+        }
+        if adbc.available:
+            paths["ADBC → Arrow"] = lambda: arrow_to_frame(adbc.fetch_arrow(sql))
+        else:
+            print("(adbc-driver-sqlite not installed, skipping ADBC)\n")
+
+        print(f"{'Path':<22}{'ms':>10}{'Frame MB':>11}")
+        for name, fetch in paths.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                df = fetch()
+                timings.append((time.perf_counter() - start) * 1000)
+            memory_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+            print(f"{name:<22}{statistics.median(timings):>10.1f}{memory_mb:>11.1f}")
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def benchmark_app(app_path=APP_PATH, repeat=3):
+    """
+    Time the Streamlit app headlessly: first render in a fresh process,
+    then the first visit to each page and a plain rerun on it.
+    Run from the directory the app is normally started from.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", APP_TIMING_SCRIPT, app_path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    first_render = statistics.median(run["first_render_ms"] for run in runs)
+    print(f"First render (cold process): {first_render:,.0f} ms\n")
+    print(f"{'Page':<32}{'First visit ms':>16}{'Rerun ms':>12}")
+    for page in runs[0]["pages"]:
+        first_visit = statistics.median(run["pages"][page][0] for run in runs)
+        rerun = statistics.median(run["pages"][page][1] for run in runs)
+        print(f"{page:<32}{first_visit:>16.1f}{rerun:>12.1f}")
+
+
+def _direct_posting(db_path, customer_id, txn_type, amount, local):
+    """
+    One posting the way the simulation page used to do it: read the
+    balance, check it, write the new value and commit on its own (plus
+    the same ledger row the queue writes).
+    """
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        conn = local.conn = sqlite3.connect(db_path, timeout=30)
+    balance = conn.execute(
+        "SELECT account_balance FROM accounts WHERE customer_id = ?", (customer_id,)
+    ).fetchone()[0]
+    new_balance = apply_posting(balance, txn_type, amount)
+    if new_balance is None:
+        return False
+    now = str(datetime.now().replace(microsecond=0))
+    conn.execute("UPDATE accounts SET account_balance = ?, last_updated = ? WHERE customer_id = ?",
+                 (new_balance, now, customer_id))
+    conn.execute("INSERT INTO transactions (txn_id, customer_id, txn_type, amount, txn_time, status) "
+                 "VALUES (?, ?, ?, ?, ?, 'success')",
+                 (f"SIM{uuid.uuid4().hex[:12].upper()}", customer_id, txn_type, amount, now))
+    conn.commit()
+    return True
+
+
+def benchmark_postings(db_path=DEFAULT_DB, threads=16, postings=4000, accounts=50, seed=7):
+    """
+    Postings/sec for per-request commits versus the group-commit queue,
+    with `threads` concurrent sessions posting to `accounts` customers.
+    Also checks that no posting was lost: every final balance must equal
+    the opening balance plus the accepted postings.
+    """
+    import threading
+
+    rng = random.Random(seed)
+    with sqlite3.connect(db_path) as conn:
+        customer_ids = [row[0] for row in conn.execute(
+            "SELECT customer_id FROM accounts ORDER BY customer_id LIMIT ?", (accounts,)
+        )]
+    workload = [(rng.choice(customer_ids), rng.choice(["deposit", "withdrawal"]),
+                 round(rng.uniform(100, 5000), 2)) for _ in range(postings)]
+
+    def run(name, make_post):
+        conn, scratch_dir = scratch_copy(db_path)
+        scratch_path = os.path.join(scratch_dir, 'banking.db')
+        opening = dict(conn.execute("SELECT customer_id, account_balance FROM accounts"))
+        conn.close()
+        post, finish = make_post(scratch_path)
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                accepted = list(pool.map(lambda item: post(*item), workload))
+            seconds = time.perf_counter() - start
+            note = finish()
+
+            expected = dict(opening)
+            for (customer_id, txn_type, amount), ok in zip(workload, accepted):
+                if ok:
+                    expected[customer_id] += amount if txn_type == "deposit" else -amount
+            with sqlite3.connect(scratch_path) as check:
+                final = dict(check.execute("SELECT customer_id, account_balance FROM accounts"))
+            lost = sum(1 for customer_id in customer_ids
+                       if abs(final[customer_id] - expected[customer_id]) > 0.005)
+            print(f"{name:<22}{postings / seconds:>14,.0f}{seconds * 1000:>12,.0f}"
+                  f"{sum(accepted):>10,}{lost:>16}  {note}")
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    def direct(path):
+        local = threading.local()
+        return (lambda *item: _direct_posting(path, *item, local)), (lambda: "")
+
+    def queued(path):
+        posting_queue = PostingQueue(path)
+
+        def finish():
+            posting_queue.close()
+            stats = posting_queue.stats()
+            return f"({stats['batches']:,} commits, {stats['avg_batch']:.1f} postings each)"
+        return (lambda *item: posting_queue.post(*item)["ok"]), finish
+
+    print(f"{postings:,} postings from {threads} threads over {accounts} accounts\n")
+    print(f"{'Approach':<22}{'Postings/s':>14}{'Total ms':>12}{'Accepted':>10}{'Wrong balances':>16}")
+    run("Commit per posting", direct)
+    run("Group-commit queue", queued)
+
+
+def benchmark_reconcile(db_path=DEFAULT_DB, scale=1, repeat=3):
+    """
+    Time ledger reconciliation with accounts replicated `scale` times:
+    the first run (freezes every sealed month), then incremental runs
+    that only rescan the open partitions.
+    """
+    conn, scratch_dir = scratch_copy(db_path)
+    try:
+        drop_change_capture(conn)
+        start = time.perf_counter()
+        scale_accounts(conn, scale)
+        conn.commit()
+        accounts = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        txn_count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        print(f"Reconciling {accounts:,} accounts, {txn_count:,} transactions "
+              f"(scaled in {time.perf_counter() - start:.1f}s)\n")
+
+        first = reconcile(conn)
+        print(f"{'First run (checkpoint)':<28}{first['seconds']:>8.2f}s  "
+              f"{first['months_frozen']} months frozen, {first['mismatches']:,} mismatches")
+        timings = [reconcile(conn)["seconds"] for _ in range(repeat)]
+        print(f"{'Incremental run':<28}{statistics.median(timings):>8.2f}s  "
+              f"{first['open_rows']:,} open transactions rescanned")
+        full = reconcile(conn, full=True)
+        print(f"{'Full run':<28}{full['seconds']:>8.2f}s")
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def benchmark_statements(db_path=DEFAULT_DB, scale=1, workers=None, month=None):
+    """
+    Time monthly statement generation with customers replicated `scale`
+    times, single process and with the process pool.
+    """
+    conn, scratch_dir = scratch_copy(db_path)
+    try:
+        drop_change_capture(conn)
+        start = time.perf_counter()
+        scale_accounts(conn, scale)
+        conn.commit()
+        customers = conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+        conn.close()
+        print(f"Statements for {customers:,} customers (scaled in {time.perf_counter() - start:.1f}s)\n")
+
+        scratch_db = os.path.join(scratch_dir, 'banking.db')
+        for label, pool_size in (("Single process", 1), (f"Process pool ({workers or os.cpu_count()})", workers)):
+            out_dir = os.path.join(scratch_dir, 'statements')
+            shutil.rmtree(out_dir, ignore_errors=True)
+            result = generate_statements(scratch_db, month, out_dir, workers=pool_size)
+            print(f"{label:<28}{result['seconds']:>8.1f}s  "
+                  f"{result['statements'] / result['seconds']:>10,.0f} statements/s  "
+                  f"({result['transactions']:,} transactions)")
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def benchmark_interest(db_path=DEFAULT_DB, accounts=10_000_000):
+    """
+    Time daily interest accrual over `accounts` accounts (replicated
+    customers and accounts, no transactions): the first business date
+    (inserts), a repeat of it (skipped) and the next date (upserts).
+    """
+    conn, scratch_dir = scratch_copy(db_path)
+    try:
+        # Per-row roll-up and logging triggers are not part of a bulk reload
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('customers', 'accounts')"
+        ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        start = time.perf_counter()
+        seed = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        scale_accounts(conn, -(-accounts // seed), transactions=False)
+        conn.commit()
+        total = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        print(f"Accruing interest on {total:,} accounts (scaled in {time.perf_counter() - start:.1f}s)\n")
+
+        for label, date in (("First business date", "2026-01-01"), ("Same date again", "2026-01-01"),
+                            ("Next business date", "2026-01-02")):
+            start = time.perf_counter()
+            results = accrue_interest(conn, date)
+            seconds = time.perf_counter() - start
+            rows = sum(result["accrued_rows"] for result in results.values() if result)
+            print(f"{label:<28}{seconds:>8.2f}s  {rows:>12,} balances posted"
+                  + (f"  ({rows / seconds:,.0f}/s)" if rows else ""))
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def compare_estimates(exact, approx):
+    """
+    Largest relative error of each estimated column against the exact
+    answer, and how many estimates fall inside their 95% margin.
+    """
+    key = exact.columns[0]
+    merged = exact.merge(approx, on=key, suffixes=("", "_approx"))
+    errors = []
+    inside = total = 0
+    for column in [col[:-len("_moe")] for col in approx.columns if col.endswith("_moe")]:
+        actual = merged[column].astype(float)
+        estimate = merged[f"{column}_approx"].astype(float)
+        error = (estimate - actual).abs()
+        errors.append(f"{column} {(error / actual.abs().where(actual != 0)).max() * 100:.2f}%")
+        # Printed values are rounded to cents / whole counts
+        inside += int((error <= merged[f"{column}_moe"] + 0.01).sum())
+        total += len(merged)
+    return ", ".join(errors), inside, total
+
+
+def benchmark_approx(db_path=DEFAULT_DB, scale=1):
+    """
+    Time the catalog queries that have approximate forms, exact against
+    approximate, with customers and transactions replicated `scale` times,
+    and check the estimates against the exact answers.
+    """
+    conn, scratch_dir = scratch_copy(db_path)
+    try:
+        drop_change_capture(conn)
+        start = time.perf_counter()
+        scale_accounts(conn, scale)
+        conn.commit()
+        txn_count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        print(f"Approximate queries over {txn_count:,} transactions (scaled in {time.perf_counter() - start:.1f}s)\n")
+
+        built = build_approx(conn, seed=0)
+        print(f"{'Build samples and sketches':<44}{built['seconds']:>8.2f}s\n")
+
+        # All time, and a window starting mid-month (its first month is read exactly)
+        mid_month = pd.Timestamp.now().normalize().replace(day=15) - pd.DateOffset(months=4)
+        queries = get_all_queries()
+        for query_key, query_info in queries.items():
+            if not query_info.get("approximate"):
+                continue
+            for window_start in ((None, mid_month) if touches_transactions(query_info["query"]) else (None,)):
+                start = time.perf_counter()
+                exact, _, _ = execute_query(conn, query_key, start=window_start)
+                exact_seconds = time.perf_counter() - start
+                start = time.perf_counter()
+                approx, _, _ = execute_query(conn, query_key, start=window_start, approximate=True)
+                approx_seconds = time.perf_counter() - start
+                label = f"{query_key[:26]} from {window_start.date()}" if window_start is not None else query_key[:42]
+                print(f"{label:<44}exact {exact_seconds:>7.3f}s  approx {approx_seconds:>7.3f}s  "
+                      f"({exact_seconds / approx_seconds:,.0f}x)")
+                if any(col.endswith("_moe") for col in approx.columns):
+                    errors, inside, total = compare_estimates(exact, approx)
+                    print(f"{'':<44}max error: {errors}; {inside}/{total} inside 95% bounds")
+                else:
+                    same = exact.to_dict("records") == approx.to_dict("records")
+                    print(f"{'':<44}{len(approx)} rows, {'identical to' if same else 'DIFFERENT from'} exact")
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BankSight benchmarks")
+    parser.add_argument("benchmark", choices=["keys", "backends", "arrow", "app", "postings", "reconcile",
+                                              "statements", "interest", "approx"])
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--scale", type=int, default=1,
+                        help="replicate transactions this many times before timing")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--parquet-dir", default=None,
+                        help="existing Parquet snapshot for the DuckDB side")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent sessions for postings")
+    parser.add_argument("--postings", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=None, help="processes for statements")
+    parser.add_argument("--month", default=None, help="statement month (YYYY-MM)")
+    parser.add_argument("--accounts", type=int, default=10_000_000, help="accounts for interest")
+    args = parser.parse_args()
+
+    if args.benchmark == "keys":
+        benchmark_keys(args.db, args.scale, args.repeat)
+    elif args.benchmark == "backends":
+        benchmark_backends(args.db, args.scale, args.repeat, args.parquet_dir)
+    elif args.benchmark == "arrow":
+        benchmark_arrow(args.db, args.scale, args.repeat)
+    elif args.benchmark == "app":
+        benchmark_app(repeat=args.repeat)
+    elif args.benchmark == "postings":
+        benchmark_postings(args.db, args.threads, args.postings)
+    elif args.benchmark == "reconcile":
+        benchmark_reconcile(args.db, args.scale, min(args.repeat, 3))
+    elif args.benchmark == "statements":
+        benchmark_statements(args.db, args.scale, args.workers, args.month)
+    elif args.benchmark == "interest":
+        benchmark_interest(args.db, args.accounts)
+    elif args.benchmark == "approx":
+        benchmark_approx(args.db, args.scale)
+
+
+if __name__ == "__main__":
+    main()
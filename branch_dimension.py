@@ -0,0 +1,294 @@
+"""
+Branch dimension for branch analytics.
+Loans, credit cards, support tickets and customers carry an integer
+branch_id resolved from their city or branch name, and a branch_summary
+table keeps every branch KPI up to date through triggers, so branch
+reports are indexed lookups instead of string joins.
+"""
+import pandas as pd
+
+# Table -> (source column, branches column it matches)
+BRANCH_ID_SOURCES = {
+    "customers": ("city", "City"),
+    "loans": ("Branch", "City"),
+    "credit_cards": ("Branch", "City"),
+    "support_tickets": ("Branch_Name", "Branch_Name"),
+}
+
+BRANCH_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_branches_city ON branches(City)",
+    "CREATE INDEX IF NOT EXISTS idx_branches_name ON branches(Branch_Name)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_branch_id ON customers(branch_id)",
+    "CREATE INDEX IF NOT EXISTS idx_loans_branch_start ON loans(branch_id, start_day)",
+    "CREATE INDEX IF NOT EXISTS idx_credit_cards_branch_id ON credit_cards(branch_id)",
+    "CREATE INDEX IF NOT EXISTS idx_support_tickets_branch_id ON support_tickets(branch_id)",
+]
+
+BRANCH_SUMMARY_TABLE = '''
+CREATE TABLE IF NOT EXISTS branch_summary (
+    branch_id INTEGER PRIMARY KEY,
+    total_customers INTEGER NOT NULL DEFAULT 0,
+    total_balance REAL NOT NULL DEFAULT 0,
+    total_loans INTEGER NOT NULL DEFAULT 0,
+    active_loans INTEGER NOT NULL DEFAULT 0,
+    total_loan_amount REAL NOT NULL DEFAULT 0,
+    total_loan_customers INTEGER NOT NULL DEFAULT 0,
+    total_cards INTEGER NOT NULL DEFAULT 0,
+    total_credit_limit REAL NOT NULL DEFAULT 0,
+    total_tickets INTEGER NOT NULL DEFAULT 0,
+    open_tickets INTEGER NOT NULL DEFAULT 0
+)
+'''
+
+# Distinct loan customers per branch, needed to maintain a COUNT(DISTINCT)
+BRANCH_LOAN_CUSTOMERS_TABLE = '''
+CREATE TABLE IF NOT EXISTS branch_loan_customers (
+    branch_id INTEGER NOT NULL,
+    customer_key INTEGER NOT NULL,
+    loan_count INTEGER NOT NULL,
+    PRIMARY KEY (branch_id, customer_key)
+) WITHOUT ROWID
+'''
+
+# Table -> (branch expression, {summary column: contribution expression}).
+# "X" stands for NEW or OLD inside the generated triggers.
+SUMMARY_CONTRIBUTIONS = {
+    "customers": (
+        "X.branch_id",
+        {
+            "total_customers": "1",
+            "total_balance": "(SELECT COALESCE(SUM(account_balance), 0) FROM accounts "
+                             "WHERE customer_key = X.customer_key)",
+        },
+    ),
+    "accounts": (
+        "(SELECT branch_id FROM customers WHERE customer_key = X.customer_key)",
+        {
+            "total_balance": "COALESCE(X.account_balance, 0)",
+        },
+    ),
+    "loans": (
+        "X.branch_id",
+        {
+            "total_loans": "1",
+            "active_loans": "(X.Loan_Status IN ('Active', 'Approved'))",
+            "total_loan_amount": "COALESCE(X.Loan_Amount, 0)",
+        },
+    ),
+    "credit_cards": (
+        "X.branch_id",
+        {
+            "total_cards": "1",
+            "total_credit_limit": "COALESCE(X.Credit_Limit, 0)",
+        },
+    ),
+    "support_tickets": (
+        "X.branch_id",
+        {
+            "total_tickets": "1",
+            "open_tickets": "(X.Status IN ('Open', 'In Progress'))",
+        },
+    ),
+}
+
+
+def attach_branch_ids(df, table_name, branches_df):
+    """
+    Add a branch_id column to a dataset before it is loaded.
+    """
+    source, branch_column = BRANCH_ID_SOURCES[table_name]
+    lookup = dict(zip(branches_df[branch_column], branches_df["Branch_ID"]))
+    df = df.copy()
+    df["branch_id"] = df[source].map(lookup).astype("Int64")
+    return df
+
+
+def ensure_branch_indexes(conn):
+    """
+    Create the branch_id indexes used by branch analytics.
+    """
+    cursor = conn.cursor()
+    for statement in BRANCH_INDEXES:
+        cursor.execute(statement)
+    conn.commit()
+
+
+def ensure_branch_id_triggers(conn):
+    """
+    Keep branch_id populated for rows written outside the loader.
+    """
+    cursor = conn.cursor()
+    for table_name, (source, branch_column) in BRANCH_ID_SOURCES.items():
+        lookup = f"(SELECT Branch_ID FROM branches WHERE {branch_column} = NEW.{source})"
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_branch_id_insert
+        AFTER INSERT ON {table_name}
+        WHEN NEW.branch_id IS NULL OR NEW.branch_id = ''
+        BEGIN
+            UPDATE {table_name} SET branch_id = {lookup} WHERE rowid = NEW.rowid;
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_branch_id_update
+        AFTER UPDATE OF {source} ON {table_name}
+        BEGIN
+            UPDATE {table_name} SET branch_id = {lookup} WHERE rowid = NEW.rowid;
+        END
+        ''')
+    conn.commit()
+
+
+def rebuild_branch_summary(conn):
+    """
+    Recompute branch_summary from scratch. Used by the loader; afterwards
+    the triggers from ensure_branch_summary_triggers keep it current.
+    """
+    cursor = conn.cursor()
+    cursor.execute(BRANCH_SUMMARY_TABLE)
+    cursor.execute(BRANCH_LOAN_CUSTOMERS_TABLE)
+    cursor.execute("DELETE FROM branch_summary")
+    cursor.execute("DELETE FROM branch_loan_customers")
+
+    cursor.execute('''
+    INSERT INTO branch_loan_customers (branch_id, customer_key, loan_count)
+    SELECT branch_id, customer_key, COUNT(*)
+    FROM loans
+    WHERE branch_id IS NOT NULL AND customer_key IS NOT NULL
+    GROUP BY branch_id, customer_key
+    ''')
+
+    cursor.execute('''
+    INSERT INTO branch_summary
+    SELECT
+        b.Branch_ID,
+        COALESCE(c.total_customers, 0),
+        COALESCE(c.total_balance, 0),
+        COALESCE(l.total_loans, 0),
+        COALESCE(l.active_loans, 0),
+        COALESCE(l.total_loan_amount, 0),
+        (SELECT COUNT(*) FROM branch_loan_customers blc WHERE blc.branch_id = b.Branch_ID),
+        COALESCE(cc.total_cards, 0),
+        COALESCE(cc.total_credit_limit, 0),
+        COALESCE(t.total_tickets, 0),
+        COALESCE(t.open_tickets, 0)
+    FROM branches b
+    LEFT JOIN (
+        SELECT c.branch_id,
+               COUNT(*) as total_customers,
+               SUM(COALESCE(a.account_balance, 0)) as total_balance
+        FROM customers c
+        LEFT JOIN accounts a ON a.customer_key = c.customer_key
+        GROUP BY c.branch_id
+    ) c ON c.branch_id = b.Branch_ID
+    LEFT JOIN (
+        SELECT branch_id,
+               COUNT(*) as total_loans,
+               SUM(Loan_Status IN ('Active', 'Approved')) as active_loans,
+               SUM(COALESCE(Loan_Amount, 0)) as total_loan_amount
+        FROM loans GROUP BY branch_id
+    ) l ON l.branch_id = b.Branch_ID
+    LEFT JOIN (
+        SELECT branch_id,
+               COUNT(*) as total_cards,
+               SUM(COALESCE(Credit_Limit, 0)) as total_credit_limit
+        FROM credit_cards GROUP BY branch_id
+    ) cc ON cc.branch_id = b.Branch_ID
+    LEFT JOIN (
+        SELECT branch_id,
+               COUNT(*) as total_tickets,
+               SUM(Status IN ('Open', 'In Progress')) as open_tickets
+        FROM support_tickets GROUP BY branch_id
+    ) t ON t.branch_id = b.Branch_ID
+    ''')
+    conn.commit()
+
+
+def _apply_sql(table_name, row, sign):
+    """SQL statements that add (sign '+') or remove (sign '-') a row's contribution."""
+    branch_expr, contributions = SUMMARY_CONTRIBUTIONS[table_name]
+    branch_expr = branch_expr.replace("X.", f"{row}.")
+    assignments = ", ".join(
+        f"{col} = {col} {sign} {expr.replace('X.', f'{row}.')}"
+        for col, expr in contributions.items()
+    )
+    statements = [f"UPDATE branch_summary SET {assignments} WHERE branch_id = {branch_expr};"]
+
+    if table_name == "loans":
+        if sign == "+":
+            statements.append(f"""
+            INSERT INTO branch_loan_customers (branch_id, customer_key, loan_count)
+            SELECT {row}.branch_id, {row}.customer_key, 1
+            WHERE {row}.branch_id IS NOT NULL AND {row}.customer_key IS NOT NULL
+            ON CONFLICT (branch_id, customer_key) DO UPDATE SET loan_count = loan_count + 1;""")
+        else:
+            statements.append(f"""
+            UPDATE branch_loan_customers SET loan_count = loan_count - 1
+            WHERE branch_id = {row}.branch_id AND customer_key = {row}.customer_key;""")
+            statements.append(f"""
+            DELETE FROM branch_loan_customers
+            WHERE branch_id = {row}.branch_id AND customer_key = {row}.customer_key
+              AND loan_count <= 0;""")
+        statements.append(f"""
+            UPDATE branch_summary SET total_loan_customers =
+                (SELECT COUNT(*) FROM branch_loan_customers WHERE branch_id = {row}.branch_id)
+            WHERE branch_id = {row}.branch_id;""")
+
+    return "\n            ".join(statements)
+
+
+def ensure_branch_summary_triggers(conn):
+    """
+    Install triggers that keep branch_summary in step with every write.
+    Updates remove the old row's contribution and add the new one.
+    """
+    cursor = conn.cursor()
+    cursor.execute(BRANCH_SUMMARY_TABLE)
+    cursor.execute(BRANCH_LOAN_CUSTOMERS_TABLE)
+
+    for table_name in SUMMARY_CONTRIBUTIONS:
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_branch_summary_insert
+        AFTER INSERT ON {table_name}
+        BEGIN
+            {_apply_sql(table_name, "NEW", "+")}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_branch_summary_delete
+        AFTER DELETE ON {table_name}
+        BEGIN
+            {_apply_sql(table_name, "OLD", "-")}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_branch_summary_update
+        AFTER UPDATE ON {table_name}
+        BEGIN
+            {_apply_sql(table_name, "OLD", "-")}
+            {_apply_sql(table_name, "NEW", "+")}
+        END
+        ''')
+
+    # New branches start with an empty roll-up row
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_branches_branch_summary_insert
+    AFTER INSERT ON branches
+    BEGIN
+        INSERT OR IGNORE INTO branch_summary (branch_id) VALUES (NEW.Branch_ID);
+    END
+    ''')
+    conn.commit()
+
+
+def get_branch_summary(conn, branch_id=None):
+    """
+    Return branch KPIs joined with branch details, for one branch or all.
+    """
+    query = '''
+    SELECT b.Branch_Name, b.City, s.*
+    FROM branch_summary s
+    JOIN branches b ON b.Branch_ID = s.branch_id
+    '''
+    if branch_id is None:
+        return pd.read_sql_query(query, conn)
+    return pd.read_sql_query(query + " WHERE s.branch_id = ?", conn, params=(branch_id,))
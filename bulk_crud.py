@@ -0,0 +1,305 @@
+"""
+Bulk CRUD from uploaded files.
+An uploaded CSV/Parquet is validated column by column against the target
+table's declared types, staged into a temp table and applied with one
+set-based statement per batch of staged rows:
+    upsert  INSERT ... SELECT ... ON CONFLICT (key) DO UPDATE
+    update  UPDATE ... FROM (staged batch)
+    delete  DELETE ... WHERE key IN (SELECT key FROM staged batch)
+The whole change commits as one transaction, so a failing batch (e.g. a
+row in a sealed transaction partition) leaves the table untouched.
+diff_preview() shows what a change would do before it is applied.
+
+Run from the project root, e.g.:
+    python bulk_crud.py support_tickets update fixes.csv --dry-run
+"""
+import argparse
+import io
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from typed_columns import TYPED_DATE_COLUMNS
+
+DB_PATH = 'database/banking.db'
+BULK_OPERATIONS = ("upsert", "update", "delete")
+BATCH_ROWS = 5000
+STAGE_TABLE = "bulk_stage"
+PREVIEW_ROWS = 50
+
+
+def read_upload(file_name, data):
+    """
+    Parse an uploaded CSV or Parquet file. CSV values are read as text so
+    validation sees exactly what was written; blank cells become NULL.
+    """
+    if file_name.lower().endswith(".parquet"):
+        df = pd.read_parquet(io.BytesIO(data))
+    else:
+        df = pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+    df.columns = [str(col).strip() for col in df.columns]
+    return df.astype(object).where(df.notna(), None).replace(r"^\s*$", None, regex=True)
+
+
+def table_schema(conn, table_name):
+    """
+    Writable columns of a table or view as dicts (name, type, notnull, pk).
+    Typed date columns are derived by triggers and left out.
+    """
+    derived = TYPED_DATE_COLUMNS.get(table_name, {})
+    return [
+        {"name": name, "type": (col_type or "").upper(), "notnull": bool(notnull), "pk": bool(pk)}
+        for _, name, col_type, notnull, _, pk in conn.execute(f"PRAGMA table_info({table_name})")
+        if name not in derived
+    ]
+
+
+def key_column(schema):
+    """The primary key, or the first column for views (as on the CRUD forms)."""
+    for col in schema:
+        if col["pk"]:
+            return col["name"]
+    return schema[0]["name"]
+
+
+def _problems(df, mask, column, problem):
+    rows = df.index[mask]
+    return pd.DataFrame({
+        "row": rows + 1,
+        "column": column,
+        "value": df.loc[mask, column].astype(str).to_numpy() if column in df else None,
+        "problem": problem,
+    })
+
+
+def _coerce(values, col_type):
+    """
+    Convert one column to its declared type. Returns (converted, invalid
+    mask); NULLs are never invalid here.
+    """
+    present = values.notna()
+    if "INT" in col_type:
+        numbers = pd.to_numeric(values, errors="coerce")
+        invalid = present & (numbers.isna() | (numbers % 1 != 0))
+        cast = int
+    elif any(kind in col_type for kind in ("REAL", "FLOA", "DOUB", "NUM")):
+        numbers = pd.to_numeric(values, errors="coerce")
+        invalid = present & numbers.isna()
+        cast = float
+    elif "DATE" in col_type or "TIME" in col_type:
+        numbers = values
+        invalid = present & pd.to_datetime(values, errors="coerce", format="ISO8601").isna()
+        cast = lambda v: str(v).strip()
+    else:
+        numbers, invalid, cast = values, present & False, str
+    # Plain Python values: sqlite3 cannot bind numpy scalars
+    keep = (present & ~invalid).to_numpy()
+    converted = [cast(v) if ok else None for v, ok in zip(numbers.to_numpy(), keep)]
+    return pd.Series(converted, index=values.index, dtype=object), invalid
+
+
+def validate_upload(df, schema, operation):
+    """
+    Check an upload against the table schema, all columns at once.
+    Returns (typed frame restricted to known columns, problems frame with
+    row/column/value/problem); apply only when problems is empty.
+    """
+    types = {col["name"]: col["type"] for col in schema}
+    key = key_column(schema)
+    problems = []
+
+    unknown = [col for col in df.columns if col not in types]
+    if unknown:
+        problems.append(pd.DataFrame({"row": None, "column": unknown, "value": None,
+                                      "problem": "not a column of this table"}))
+    if key not in df.columns:
+        problems.append(pd.DataFrame({"row": [None], "column": [key], "value": [None],
+                                      "problem": ["key column is required"]}))
+        return df.iloc[0:0], pd.concat(problems, ignore_index=True)
+
+    columns = [key] if operation == "delete" else [col for col in types if col in df.columns]
+    clean = pd.DataFrame(index=df.index)
+    for column in columns:
+        clean[column], invalid = _coerce(df[column], types[column])
+        if invalid.any():
+            problems.append(_problems(df, invalid, column, f"not a valid {types[column] or 'value'}"))
+
+    problems.append(_problems(df, df[key].isna(), key, "key is empty"))
+    problems.append(_problems(df, df[key].notna() & df[key].duplicated(keep=False), key,
+                              "key appears more than once"))
+    if operation == "upsert":
+        for col in schema:
+            if not col["notnull"] or col["name"] == key:
+                continue
+            if col["name"] not in df.columns:
+                problems.append(pd.DataFrame({"row": [None], "column": [col["name"]], "value": [None],
+                                              "problem": ["required column is missing"]}))
+            else:
+                problems.append(_problems(df, df[col["name"]].isna(), col["name"], "required value is empty"))
+
+    problems = [p for p in problems if len(p)]
+    if not problems:
+        return clean, pd.DataFrame(columns=["row", "column", "value", "problem"])
+    return clean, pd.concat(problems, ignore_index=True)
+
+
+def stage_rows(conn, df, schema):
+    """
+    Load validated rows into temp.bulk_stage (declared types, so values
+    compare with the target's affinity) with a _row sequence for batching.
+    """
+    types = {col["name"]: col["type"] for col in schema}
+    key = key_column(schema)
+    columns = list(df.columns)
+    conn.execute(f"DROP TABLE IF EXISTS temp.{STAGE_TABLE}")
+    conn.execute(
+        f"CREATE TEMP TABLE {STAGE_TABLE} (_row INTEGER PRIMARY KEY, "
+        + ", ".join(f"{col} {types[col]}" for col in columns) + ")"
+    )
+    conn.executemany(
+        f"INSERT INTO temp.{STAGE_TABLE} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})",
+        df.itertuples(index=False, name=None),
+    )
+    conn.execute(f"CREATE INDEX temp.idx_{STAGE_TABLE}_key ON {STAGE_TABLE}({key})")
+    return len(df)
+
+
+def _is_view(conn, table_name):
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table_name,)).fetchone()
+    return bool(row) and row[0] == "view"
+
+
+def diff_preview(conn, table_name, schema, limit=PREVIEW_ROWS):
+    """
+    Compare the staged rows with the table. Returns (summary dict,
+    sample of changes as key/column/old/new rows).
+    """
+    key = key_column(schema)
+    staged = [row[1] for row in conn.execute(f"PRAGMA temp.table_info({STAGE_TABLE})")][1:]
+    values = [col for col in staged if col != key]
+    changed = " OR ".join(f"t.{col} IS NOT s.{col}" for col in values) or "0"
+
+    missing, changed_rows, unchanged = conn.execute(f'''
+    SELECT COALESCE(SUM(t.{key} IS NULL), 0),
+           COALESCE(SUM(t.{key} IS NOT NULL AND ({changed})), 0),
+           COALESCE(SUM(t.{key} IS NOT NULL AND NOT ({changed})), 0)
+    FROM temp.{STAGE_TABLE} s LEFT JOIN {table_name} t ON t.{key} = s.{key}
+    ''').fetchone()
+    summary = {"staged": missing + changed_rows + unchanged, "not_found": missing,
+               "matched": changed_rows + unchanged, "changed": changed_rows, "unchanged": unchanged}
+
+    if values:
+        sample_sql = "\nUNION ALL\n".join(
+            f"SELECT s.{key} AS key, '{col}' AS column, t.{col} AS old, s.{col} AS new "
+            f"FROM temp.{STAGE_TABLE} s JOIN {table_name} t ON t.{key} = s.{key} "
+            f"WHERE t.{col} IS NOT s.{col}"
+            for col in values
+        )
+        sample = pd.read_sql_query(f"SELECT * FROM ({sample_sql}) ORDER BY key LIMIT {limit}", conn)
+    else:
+        sample = pd.read_sql_query(
+            f"SELECT t.* FROM temp.{STAGE_TABLE} s JOIN {table_name} t ON t.{key} = s.{key} "
+            f"ORDER BY s._row LIMIT {limit}", conn
+        )
+    return summary, sample
+
+
+def _batch_statements(conn, table_name, key, columns, operation):
+    """Set-based statements run for each _row range, in order."""
+    batch = f"SELECT * FROM temp.{STAGE_TABLE} WHERE _row BETWEEN :first AND :last"
+    names = ", ".join(columns)
+    values = [col for col in columns if col != key]
+    update = (f"UPDATE {table_name} SET {', '.join(f'{col} = s.{col}' for col in values)} "
+              f"FROM ({batch}) AS s WHERE {table_name}.{key} = s.{key}")
+
+    if operation == "delete":
+        return [f"DELETE FROM {table_name} WHERE {key} IN "
+                f"(SELECT {key} FROM temp.{STAGE_TABLE} WHERE _row BETWEEN :first AND :last)"]
+    if operation == "update":
+        return [update] if values else []
+    # Views (partitioned transactions) cannot take ON CONFLICT: update the
+    # existing keys, then insert the rest through the routing trigger
+    if _is_view(conn, table_name):
+        insert = (f"INSERT INTO {table_name} ({names}) SELECT {names} FROM ({batch}) AS s "
+                  f"WHERE NOT EXISTS (SELECT 1 FROM {table_name} t WHERE t.{key} = s.{key})")
+        return ([update] if values else []) + [insert]
+    conflict = (f"DO UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in values)}"
+                if values else "DO NOTHING")
+    return [f"INSERT INTO {table_name} ({names}) SELECT {names} FROM ({batch}) WHERE true "
+            f"ON CONFLICT ({key}) {conflict}"]
+
+
+def apply_bulk(conn, table_name, schema, operation, batch_rows=BATCH_ROWS, progress=None):
+    """
+    Apply the staged rows in batches inside one transaction.
+    progress(done, total) is called after each batch. Returns timing stats.
+    """
+    key = key_column(schema)
+    columns = [row[1] for row in conn.execute(f"PRAGMA temp.table_info({STAGE_TABLE})")][1:]
+    statements = _batch_statements(conn, table_name, key, columns, operation)
+    total = conn.execute(f"SELECT COUNT(*) FROM temp.{STAGE_TABLE}").fetchone()[0]
+
+    start = time.perf_counter()
+    batches = 0
+    try:
+        for first in range(1, total + 1, batch_rows):
+            params = {"first": first, "last": first + batch_rows - 1}
+            for statement in statements:
+                conn.execute(statement, params)
+            batches += 1
+            if progress:
+                progress(min(first + batch_rows - 1, total), total)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    seconds = time.perf_counter() - start
+    return {"rows": total, "batches": batches, "seconds": seconds,
+            "rows_per_sec": total / seconds if seconds else float(total)}
+
+
+def connect(db_path=DB_PATH):
+    """A private connection for one bulk change; its temp stage is not shared."""
+    return sqlite3.connect(db_path, timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a CSV/Parquet file to a BankSight table")
+    parser.add_argument("table")
+    parser.add_argument("operation", choices=BULK_OPERATIONS)
+    parser.add_argument("file")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--dry-run", action="store_true", help="validate and preview only")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        df = read_upload(os.path.basename(args.file), f.read())
+    conn = connect(args.db)
+    try:
+        schema = table_schema(conn, args.table)
+        clean, problems = validate_upload(df, schema, args.operation)
+        if len(problems):
+            print(f"❌ {len(problems)} problems, nothing applied:")
+            print(problems.head(PREVIEW_ROWS).to_string(index=False))
+            return
+        stage_rows(conn, clean, schema)
+        summary, sample = diff_preview(conn, args.table, schema)
+        print(f"✓ Staged {summary['staged']:,} rows: {summary['changed']:,} changed, "
+              f"{summary['unchanged']:,} unchanged, {summary['not_found']:,} not in {args.table}")
+        if len(sample):
+            print(sample.to_string(index=False))
+        if args.dry_run:
+            return
+        stats = apply_bulk(conn, args.table, schema, args.operation, args.batch_rows)
+        print(f"✅ {args.operation} applied: {stats['rows']:,} rows in {stats['batches']} batches, "
+              f"{stats['seconds'] * 1000:.0f} ms ({stats['rows_per_sec']:,.0f} rows/s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
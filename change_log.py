@@ -0,0 +1,255 @@
+"""
+Change data capture for the core tables.
+Triggers append one compact (table, pk, op, version) row to change_log
+for every insert ('I'), update ('U') or delete ('D') on customers,
+accounts, transactions, branches, loans, credit_cards and
+support_tickets, whichever page, script or API made the write. Trigger
+maintenance of derived columns (customer_key, branch_id, typed dates) is
+not logged. Consumers pull what changed since the version they last saw
+with changes_since() and can record their position, so
+compact_change_log() knows which entries everyone has already read.
+
+Run from the project root, e.g.:
+    python change_log.py --since 0
+    python change_log.py --compact
+"""
+import argparse
+import sqlite3
+
+import pandas as pd
+
+DB_PATH = 'database/banking.db'
+CHANGE_LOG_TABLE = 'change_log'
+
+# Table -> key column written to the log. transactions is a view and is
+# logged by its routing triggers (see txn_partitions)
+CAPTURED_TABLES = {
+    'customers': 'customer_id',
+    'accounts': 'customer_id',
+    'transactions': 'txn_id',
+    'branches': 'Branch_ID',
+    'loans': 'Loan_ID',
+    'credit_cards': 'Card_ID',
+    'support_tickets': 'Ticket_ID',
+}
+
+# Columns kept in step by other triggers; updates to them alone are not changes
+DERIVED_COLUMNS = {'customer_key', 'branch_id'}
+
+# AUTOINCREMENT: versions are never reused after compaction deletes rows
+CHANGE_LOG_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    pk TEXT NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D'))
+)
+'''
+
+CHANGE_LOG_INDEX = (f"CREATE INDEX IF NOT EXISTS idx_{CHANGE_LOG_TABLE}_key "
+                    f"ON {CHANGE_LOG_TABLE}(table_name, pk)")
+
+CONSUMERS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS change_consumers (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+)
+'''
+
+# Highest version removed by trimming; older positions cannot be served
+META_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS change_log_meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+)
+'''
+
+
+def change_capture_enabled(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHANGE_LOG_TABLE,)
+    ).fetchone() is not None
+
+
+def log_statement(table_name, key_expr, op, when=None):
+    """Trigger body statement appending one change row."""
+    where = f" WHERE {when}" if when else ""
+    return (f"INSERT INTO {CHANGE_LOG_TABLE} (table_name, pk, op) "
+            f"SELECT '{table_name}', {key_expr}, '{op}'{where};")
+
+
+def _tracked_columns(conn, table_name):
+    from typed_columns import TYPED_DATE_COLUMNS
+
+    derived = DERIVED_COLUMNS | set(TYPED_DATE_COLUMNS.get(table_name, {}))
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})") if row[1] not in derived]
+
+
+def ensure_change_capture(conn):
+    """
+    Create the change log and its triggers. Run after the initial load so
+    bulk loading is not logged row by row.
+    """
+    from txn_partitions import refresh_partition_view
+
+    cursor = conn.cursor()
+    cursor.execute(CHANGE_LOG_SCHEMA)
+    cursor.execute(CHANGE_LOG_INDEX)
+    cursor.execute(CONSUMERS_SCHEMA)
+    cursor.execute(META_SCHEMA)
+
+    for table_name, key in CAPTURED_TABLES.items():
+        if table_name == 'transactions':
+            continue
+        columns = ", ".join(_tracked_columns(conn, table_name))
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_cdc_insert
+        AFTER INSERT ON {table_name}
+        BEGIN
+            {log_statement(table_name, f"NEW.{key}", "I")}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_cdc_update
+        AFTER UPDATE OF {columns} ON {table_name}
+        BEGIN
+            {log_statement(table_name, f"NEW.{key}", "U", f"NEW.{key} IS OLD.{key}")}
+            {log_statement(table_name, f"OLD.{key}", "D", f"NEW.{key} IS NOT OLD.{key}")}
+            {log_statement(table_name, f"NEW.{key}", "I", f"NEW.{key} IS NOT OLD.{key}")}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_cdc_delete
+        AFTER DELETE ON {table_name}
+        BEGIN
+            {log_statement(table_name, f"OLD.{key}", "D")}
+        END
+        ''')
+
+    # The view's routing triggers pick up logging when they are rebuilt
+    refresh_partition_view(conn)
+    conn.commit()
+
+
+def latest_version(conn):
+    """Highest version ever assigned (0 if nothing was logged)."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (CHANGE_LOG_TABLE,)).fetchone()
+    return row[0] if row else 0
+
+
+def _trimmed_through(conn):
+    row = conn.execute("SELECT value FROM change_log_meta WHERE name = 'trimmed_through'").fetchone()
+    return row[0] if row else 0
+
+
+def changes_since(conn, version, tables=None, limit=None):
+    """
+    Changes after `version`, one row per (table_name, pk) with its latest
+    op, ordered by version. Returns (DataFrame, version to pass next time).
+    Raises ValueError if the log no longer reaches back to `version`
+    (compacted, or rebuilt by a reload); the consumer must then refresh
+    from scratch and continue from latest_version().
+    """
+    if version < _trimmed_through(conn) or version > latest_version(conn):
+        raise ValueError(f"Change log no longer covers version {version}; refresh fully")
+
+    filters = ["version > ?"]
+    params = [version]
+    if tables:
+        filters.append(f"table_name IN ({', '.join('?' for _ in tables)})")
+        params.extend(tables)
+    # Bare columns with MAX() come from the row holding the maximum
+    sql = (f"SELECT table_name, pk, op, MAX(version) AS version FROM {CHANGE_LOG_TABLE} "
+           f"WHERE {' AND '.join(filters)} GROUP BY table_name, pk ORDER BY version")
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    df = pd.read_sql_query(sql, conn, params=params)
+    if limit and len(df) == limit:
+        # Partial page: continue after the last change returned
+        return df, int(df["version"].iloc[-1])
+    return df, max(latest_version(conn), version)
+
+
+def save_position(conn, consumer, version):
+    """Record that a named consumer has processed everything up to version."""
+    conn.execute(
+        "INSERT INTO change_consumers (name, version) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET version = excluded.version, updated_at = datetime('now')",
+        (consumer, version),
+    )
+    conn.commit()
+
+
+def consumer_position(conn, consumer, default=0):
+    row = conn.execute("SELECT version FROM change_consumers WHERE name = ?", (consumer,)).fetchone()
+    return row[0] if row else default
+
+
+def compact_change_log(conn, before=None):
+    """
+    Trim and collapse the log.
+    1. Entries every registered consumer has read (or all entries up to
+       `before`, if given) are deleted.
+    2. Of the rest, only the newest entry per (table, pk) is kept, which
+       is all changes_since() reports anyway.
+    Returns (trimmed, collapsed) row counts.
+    """
+    if before is None:
+        row = conn.execute("SELECT MIN(version) FROM change_consumers").fetchone()
+        before = row[0] or 0
+    cursor = conn.cursor()
+    trimmed = cursor.execute(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE version <= ?", (before,)).rowcount
+    if before > _trimmed_through(conn):
+        cursor.execute(
+            "INSERT INTO change_log_meta (name, value) VALUES ('trimmed_through', ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value", (before,)
+        )
+    collapsed = cursor.execute(f'''
+    DELETE FROM {CHANGE_LOG_TABLE} WHERE version NOT IN (
+        SELECT MAX(version) FROM {CHANGE_LOG_TABLE} GROUP BY table_name, pk
+    )
+    ''').rowcount
+    conn.commit()
+    return trimmed, collapsed
+
+
+def change_log_status(conn):
+    """Entries per table and op, plus registered consumer positions."""
+    counts = pd.read_sql_query(
+        f"SELECT table_name, op, COUNT(*) AS entries, MAX(version) AS latest "
+        f"FROM {CHANGE_LOG_TABLE} GROUP BY table_name, op ORDER BY table_name, op", conn
+    )
+    consumers = pd.read_sql_query("SELECT * FROM change_consumers ORDER BY name", conn)
+    return counts, consumers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and compact the BankSight change log")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--since", type=int, help="print changes after this version")
+    parser.add_argument("--compact", action="store_true", help="trim read entries and collapse the rest")
+    parser.add_argument("--before", type=int, help="with --compact, trim up to this version")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        ensure_change_capture(conn)
+        if args.since is not None:
+            df, version = changes_since(conn, args.since)
+            print(df.to_string(index=False))
+            print(f"\n✓ {len(df)} changed rows; next version {version}")
+        if args.compact:
+            trimmed, collapsed = compact_change_log(conn, args.before)
+            print(f"✓ Trimmed {trimmed} entries, collapsed {collapsed}")
+        counts, consumers = change_log_status(conn)
+        print(f"\nChange log (latest version {latest_version(conn)}):")
+        print(counts.to_string(index=False))
+        if len(consumers):
+            print(consumers.to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
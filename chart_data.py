@@ -0,0 +1,183 @@
+"""
+Chart data pipeline.
+Reduces query results to what a chart can usefully show before they are
+handed to Plotly: categorical charts are aggregated to the top categories
+plus "Other", line charts over many points are downsampled with LTTB, and
+time series over large tables are bucketed in SQL so only the buckets
+leave the database.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 2000
+MAX_CATEGORIES = 20
+OTHER_LABEL = "Other"
+
+# Bucket name -> (integer bucket key, SQLite label, DuckDB label).
+# Keys use integer arithmetic on the typed epoch/month columns ({div} is
+# the dialect's integer division); labels are formatted once per bucket.
+# Weeks start on Monday (1970-01-01 was a Thursday, hence the +3).
+TIME_BUCKETS = {
+    "Day": ("{epoch} {div} 86400",
+            "date(bucket * 86400, 'unixepoch')",
+            "CAST(DATE '1970-01-01' + CAST(bucket AS INTEGER) AS VARCHAR)"),
+    "Week": ("({epoch} {div} 86400 + 3) {div} 7",
+             "date((bucket * 7 - 3) * 86400, 'unixepoch')",
+             "CAST(DATE '1970-01-01' + CAST(bucket * 7 - 3 AS INTEGER) AS VARCHAR)"),
+    "Month": ("{month}",
+              "printf('%d-%02d', bucket / 100, bucket % 100)",
+              "printf('%d-%02d', bucket // 100, bucket % 100)"),
+}
+
+
+def _as_float(series):
+    """Numeric (or datetime) column as a float64 NumPy array."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.astype("int64").to_numpy(dtype=np.float64)
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _as_datetime(values, like):
+    """Inverse of _as_float for a datetime column: integers in its own unit and zone."""
+    dates = pd.Series(np.asarray(values).astype("int64")).astype(f"datetime64[{like.dt.unit}]")
+    if like.dt.tz is not None:
+        dates = dates.dt.tz_localize("UTC").dt.tz_convert(like.dt.tz)
+    return dates.array
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    x must be sorted ascending. Returns the indices of the kept points,
+    always including the first and last point.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+def aggregate_categories(df, x, y, max_categories=MAX_CATEGORIES, agg="sum"):
+    """
+    Group by a categorical column and keep the largest categories,
+    folding the rest into a single "Other" row.
+    """
+    grouped = df.groupby(x, sort=False, observed=True)[y].agg(agg).sort_values(ascending=False)
+    if len(grouped) > max_categories:
+        top = grouped.iloc[:max_categories - 1]
+        rest = grouped.iloc[max_categories - 1:]
+        other = rest.sum() if agg in ("sum", "count") else rest.agg(agg)
+        grouped = pd.concat([top, pd.Series({OTHER_LABEL: other})])
+    return grouped.rename_axis(x).reset_index(name=y)
+
+
+def bin_numeric(df, x, y, bins=MAX_POINTS, agg="mean"):
+    """
+    Bin a numeric or datetime x axis into equal-width buckets with NumPy.
+    Returns one row per non-empty bucket at the bucket centre.
+    """
+    xs = _as_float(df[x])
+    ys = _as_float(df[y])
+    mask = ~(np.isnan(xs) | np.isnan(ys))
+    xs, ys = xs[mask], ys[mask]
+    if len(xs) == 0:
+        return df.iloc[0:0][[x, y]]
+
+    edges = np.linspace(xs.min(), xs.max(), bins + 1)
+    idx = np.clip(np.searchsorted(edges, xs, side="right") - 1, 0, bins - 1)
+    counts = np.bincount(idx, minlength=bins)
+    sums = np.bincount(idx, weights=ys, minlength=bins)
+    values = sums if agg == "sum" else counts if agg == "count" else sums / np.maximum(counts, 1)
+    centres = (edges[:-1] + edges[1:]) / 2
+
+    keep = counts > 0
+    centres = centres[keep]
+    if pd.api.types.is_datetime64_any_dtype(df[x]):
+        centres = _as_datetime(centres, df[x])
+    return pd.DataFrame({x: centres, y: values[keep]})
+
+
+def prepare_chart_data(df, x, y, chart_type, max_points=MAX_POINTS, max_categories=MAX_CATEGORIES):
+    """
+    Return (chart_df, note) sized for the browser.
+    note describes any reduction applied, or is None if the data was
+    already small enough to plot as is.
+    """
+    total = len(df)
+    numeric_x = pd.api.types.is_numeric_dtype(df[x]) or pd.api.types.is_datetime64_any_dtype(df[x])
+
+    if chart_type in ("Bar Chart", "Pie Chart"):
+        limit = max_categories if chart_type == "Bar Chart" else min(max_categories, 10)
+        if total <= limit and not df[x].duplicated().any():
+            return df[[x, y]], None
+        chart_df = aggregate_categories(df[[x, y]], x, y, limit)
+        return chart_df, f"Aggregated {total:,} rows into {len(chart_df)} categories"
+
+    # Line chart
+    if not numeric_x:
+        if df[x].duplicated().any() or total > max_points:
+            chart_df = aggregate_categories(df[[x, y]], x, y, max_points)
+            return chart_df, f"Aggregated {total:,} rows into {len(chart_df)} points"
+        return df[[x, y]], None
+
+    if total <= max_points:
+        return df[[x, y]].sort_values(x), None
+
+    ordered = df[[x, y]].dropna().sort_values(x)
+    if total > max_points * 50:
+        # Bin first so LTTB runs over a bounded number of points
+        ordered = bin_numeric(ordered, x, y, bins=max_points * 10)
+    kept = lttb(_as_float(ordered[x]), _as_float(ordered[y]), max_points)
+    chart_df = ordered.iloc[kept]
+    return chart_df, f"Downsampled {total:,} points to {len(chart_df):,} (LTTB)"
+
+
+def time_bucket_sql(table_name, time_col, value_col, bucket="Day", dialect="sqlite", where=None,
+                    month_col=None):
+    """
+    SQL that buckets a time column and aggregates a value per bucket,
+    so time-series charts only ship one row per bucket. time_col holds
+    epoch seconds and month_col a YYYYMM key (see typed_columns).
+    """
+    key_expr, sqlite_label, duckdb_label = TIME_BUCKETS[bucket]
+    key = key_expr.format(epoch=time_col, month=month_col, div="//" if dialect == "duckdb" else "/")
+    label = duckdb_label if dialect == "duckdb" else sqlite_label
+    where_clause = f"WHERE {where}" if where else ""
+    return f"""
+        SELECT
+            {label} as period,
+            txn_count,
+            total_amount
+        FROM (
+            SELECT
+                {key} as bucket,
+                COUNT(*) as txn_count,
+                ROUND(SUM({value_col}), 2) as total_amount
+            FROM {table_name}
+            {where_clause}
+            GROUP BY bucket
+        ) AS buckets
+        ORDER BY bucket
+    """
@@ -0,0 +1,240 @@
+"""
+Customer 360 service.
+Fetches everything known about one customer with indexed point lookups
+and keeps recently viewed profiles in an LRU cache. Cached profiles are
+dropped when the change log shows a write to that customer's rows.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from change_log import CAPTURED_TABLES, change_capture_enabled, changes_since, latest_version
+from customer_keys import (
+    CUSTOMER_KEY_SOURCES,
+    ensure_customer_key_indexes,
+    normalize_customer_id,
+)
+
+
+def customer_id_for_record(table_name, record):
+    """
+    Return the normalized text customer ID referenced by a row, if any.
+    """
+    if table_name not in CUSTOMER_KEY_SOURCES:
+        return None
+    column = CUSTOMER_KEY_SOURCES[table_name]
+    for key, value in record.items():
+        if key.lower() == column.lower():
+            return normalize_customer_id(value)[0]
+    return None
+
+
+def ensure_profile_indexes(conn):
+    """
+    Create the customer_key indexes used by the profile lookups.
+    """
+    ensure_customer_key_indexes(conn)
+
+
+def _json_object_sql(conn, table_name, alias):
+    """Build a json_object(...) expression over every column of a table."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+    pairs = ", ".join(f"'{col}', {alias}.{col}" for col in columns)
+    return f"json_object({pairs})"
+
+
+def build_profile_query(conn, recent_transactions=50):
+    """
+    Build the single statement that returns a whole customer profile.
+    The customer_key is resolved once from the mapping table and each section
+    is an indexed point lookup aggregated into JSON, so the profile comes
+    back as one row from one round trip.
+    """
+    customer_key = "(SELECT customer_key FROM customer_keys WHERE customer_id = :cust_text)"
+
+    sections = []
+    for table_name in ["customers", "accounts", "loans", "credit_cards", "support_tickets"]:
+        sections.append(f"""
+            (SELECT json_group_array({_json_object_sql(conn, table_name, 't')})
+             FROM {table_name} t WHERE t.customer_key = {customer_key}) as {table_name}""")
+
+    sections.append(f"""
+            (SELECT json_group_array({_json_object_sql(conn, 'transactions', 't')})
+             FROM (SELECT * FROM transactions
+                   WHERE customer_key = {customer_key}
+                   ORDER BY txn_time DESC
+                   LIMIT {int(recent_transactions)}) t) as transactions""")
+
+    sections.append(f"""
+            (SELECT json_object(
+                        'total_transactions', COUNT(*),
+                        'successful', COUNT(CASE WHEN status = 'success' THEN 1 END),
+                        'failed', COUNT(CASE WHEN status = 'failed' THEN 1 END),
+                        'total_volume', ROUND(COALESCE(SUM(amount), 0), 2),
+                        'first_txn', MIN(txn_time),
+                        'last_txn', MAX(txn_time))
+             FROM transactions WHERE customer_key = {customer_key}) as transaction_summary""")
+
+    return "SELECT" + ",".join(sections)
+
+
+class Customer360Service:
+    """
+    Serves customer profiles from an LRU cache backed by one-shot lookups.
+    Call invalidate() after any write that touches a customer; writes from
+    other connections are picked up from the change log on the next lookup.
+    """
+
+    def __init__(self, conn, max_profiles=256, recent_transactions=50):
+        self.conn = conn
+        self.max_profiles = max_profiles
+        self.recent_transactions = recent_transactions
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._query = None
+        self.hits = 0
+        self.misses = 0
+        self._change_version = None
+
+    def _customers_changed(self, table_name, pk):
+        """
+        Customer IDs affected by one logged change, or None if it cannot
+        be told (the row is gone).
+        """
+        column = CUSTOMER_KEY_SOURCES[table_name]
+        key = CAPTURED_TABLES[table_name]
+        if column.lower() == key.lower():
+            return [pk]
+        row = self.conn.execute(f"SELECT {column} FROM {table_name} WHERE {key} = ?", (pk,)).fetchone()
+        return [row[0]] if row else None
+
+    def sync_changes(self):
+        """
+        Drop cached profiles touched by writes since the last sync.
+        Call with the lock held. Returns the number of changes seen.
+        """
+        if self._change_version is None:
+            if not change_capture_enabled(self.conn):
+                return 0
+            self._change_version = latest_version(self.conn)
+            return 0
+        if latest_version(self.conn) == self._change_version:
+            return 0
+        try:
+            changes, self._change_version = changes_since(
+                self.conn, self._change_version, tables=list(CUSTOMER_KEY_SOURCES)
+            )
+        except ValueError:
+            # The log was compacted past us or rebuilt: start over
+            self._cache.clear()
+            self._change_version = latest_version(self.conn)
+            return 0
+        for table_name, pk in zip(changes["table_name"], changes["pk"]):
+            if not self._cache:
+                break
+            customer_ids = self._customers_changed(table_name, pk)
+            if customer_ids is None:
+                self._cache.clear()
+                break
+            for customer_id in customer_ids:
+                self._cache.pop(normalize_customer_id(customer_id)[0], None)
+        return len(changes)
+
+    def _profile_query(self):
+        if self._query is None:
+            self._query = build_profile_query(self.conn, self.recent_transactions)
+        return self._query
+
+    def _fetch(self, cust_text, cust_num):
+        row = self.conn.execute(self._profile_query(), {"cust_text": cust_text}).fetchone()
+        customers, accounts, loans, cards, tickets, transactions, summary = row
+
+        customer_rows = json.loads(customers)
+        if not customer_rows:
+            return None
+
+        return {
+            "customer_id": cust_text,
+            "customer_number": cust_num,
+            "customer": customer_rows[0],
+            "accounts": pd.DataFrame(json.loads(accounts)),
+            "transactions": pd.DataFrame(json.loads(transactions)),
+            "transaction_summary": json.loads(summary),
+            "loans": pd.DataFrame(json.loads(loans)),
+            "credit_cards": pd.DataFrame(json.loads(cards)),
+            "support_tickets": pd.DataFrame(json.loads(tickets)),
+        }
+
+    def get_profile(self, customer_id):
+        """
+        Return (profile, elapsed_ms, from_cache) for any form of customer ID.
+        Profile is None if the customer does not exist.
+        """
+        start = time.perf_counter()
+        cust_text, cust_num = normalize_customer_id(customer_id)
+        if cust_text is None:
+            return None, (time.perf_counter() - start) * 1000, False
+
+        with self._lock:
+            self.sync_changes()
+            profile = self._cache.get(cust_text)
+            if profile is not None:
+                self._cache.move_to_end(cust_text)
+                self.hits += 1
+                return profile, (time.perf_counter() - start) * 1000, True
+
+            profile = self._fetch(cust_text, cust_num)
+            self.misses += 1
+            if profile is not None:
+                self._cache[cust_text] = profile
+                while len(self._cache) > self.max_profiles:
+                    self._cache.popitem(last=False)
+
+        return profile, (time.perf_counter() - start) * 1000, False
+
+    def invalidate(self, customer_id):
+        """Drop a customer's cached profile after a write."""
+        cust_text, _ = normalize_customer_id(customer_id)
+        if cust_text is None:
+            return
+        with self._lock:
+            self._cache.pop(cust_text, None)
+
+    def invalidate_record(self, table_name, record):
+        """Drop the cached profile of the customer a written row belongs to."""
+        self.invalidate(customer_id_for_record(table_name, record))
+
+    def clear(self):
+        """Drop every cached profile, e.g. after a schema change or reload."""
+        with self._lock:
+            self._cache.clear()
+            self._query = None
+
+    def stats(self):
+        """Cache size and hit counters for display."""
+        with self._lock:
+            return {
+                "cached_profiles": len(self._cache),
+                "max_profiles": self.max_profiles,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+if __name__ == "__main__":
+    import sqlite3
+
+    conn = sqlite3.connect('database/banking.db')
+    ensure_profile_indexes(conn)
+    service = Customer360Service(conn)
+
+    for customer_id in ["CUST00001", "1", "CUST00001", 9999999]:
+        profile, elapsed_ms, from_cache = service.get_profile(customer_id)
+        status = "cache" if from_cache else "db"
+        found = "found" if profile else "not found"
+        print(f"{customer_id!s:>10}: {found} in {elapsed_ms:.2f} ms ({status})")
+
+    conn.close()
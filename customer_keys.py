@@ -0,0 +1,153 @@
+"""
+Integer surrogate keys for customers.
+Every table that references a customer carries a compact customer_key,
+resolved through the customer_keys mapping table, so cross-domain joins
+compare integers instead of formatting 'CUST00001' strings per row.
+"""
+import re
+
+import pandas as pd
+
+# Customers, accounts, transactions and support tickets use 'CUST00001' style
+# text IDs, while loans and credit cards store the bare integer (1).
+_CUSTOMER_ID_PATTERN = re.compile(r"^\s*(?:CUST)?0*(\d+)\s*$", re.IGNORECASE)
+
+# Table -> natural customer ID column used to resolve customer_key
+CUSTOMER_KEY_SOURCES = {
+    "customers": "customer_id",
+    "accounts": "customer_id",
+    "transactions": "customer_id",
+    "support_tickets": "Customer_ID",
+    "loans": "Customer_ID",
+    "credit_cards": "Customer_ID",
+}
+
+CUSTOMER_KEYS_TABLE = '''
+CREATE TABLE IF NOT EXISTS customer_keys (
+    customer_key INTEGER PRIMARY KEY,
+    customer_id TEXT NOT NULL UNIQUE,
+    customer_number INTEGER NOT NULL UNIQUE
+)
+'''
+
+CUSTOMER_KEY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_customers_customer_key ON customers(customer_key)",
+    "CREATE INDEX IF NOT EXISTS idx_accounts_customer_key ON accounts(customer_key)",
+    "CREATE INDEX IF NOT EXISTS idx_loans_customer_key ON loans(customer_key)",
+    "CREATE INDEX IF NOT EXISTS idx_credit_cards_customer_key ON credit_cards(customer_key)",
+    "CREATE INDEX IF NOT EXISTS idx_support_tickets_customer_key ON support_tickets(customer_key)",
+]
+
+
+def normalize_customer_id(value):
+    """
+    Map any customer identifier to both natural ID spaces.
+    Accepts 'CUST00001', 'cust1', '1' or 1 and returns ('CUST00001', 1),
+    or (None, None) if the value is not a customer ID.
+    """
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None, None
+    match = _CUSTOMER_ID_PATTERN.match(str(value))
+    if not match:
+        return None, None
+    number = int(match.group(1))
+    return f"CUST{str(number).zfill(5)}", number
+
+
+def build_customer_keys(customers_df):
+    """
+    Assign a surrogate key to every customer.
+    Returns the mapping as a DataFrame matching the customer_keys table.
+    """
+    mapping = pd.DataFrame({"customer_id": sorted(customers_df["customer_id"].unique())})
+    mapping["customer_number"] = [normalize_customer_id(cid)[1] for cid in mapping["customer_id"]]
+    mapping.insert(0, "customer_key", range(1, len(mapping) + 1))
+    return mapping
+
+
+def attach_customer_keys(df, table_name, mapping):
+    """
+    Add a customer_key column to a dataset before it is loaded.
+    Text IDs map through customer_id, integer IDs through customer_number.
+    """
+    source = CUSTOMER_KEY_SOURCES[table_name]
+    normalized = df[source].map(lambda value: normalize_customer_id(value)[0])
+    lookup = dict(zip(mapping["customer_id"], mapping["customer_key"]))
+    df = df.copy()
+    df["customer_key"] = normalized.map(lookup).astype("Int64")
+    return df
+
+
+def _key_lookup_sql(table_name):
+    source = CUSTOMER_KEY_SOURCES[table_name]
+    if table_name in ("loans", "credit_cards"):
+        return f"(SELECT customer_key FROM customer_keys WHERE customer_number = NEW.{source})"
+    return f"(SELECT customer_key FROM customer_keys WHERE customer_id = NEW.{source})"
+
+
+def ensure_customer_key_triggers(conn):
+    """
+    Keep customer_key populated for rows written outside the loader,
+    e.g. by the CRUD page, which only knows the natural IDs.
+    """
+    cursor = conn.cursor()
+
+    for table_name, source in CUSTOMER_KEY_SOURCES.items():
+        # Partitioned transactions resolve keys in their routing triggers
+        if table_name == "transactions":
+            continue
+        lookup = _key_lookup_sql(table_name)
+
+        # New customers get the next key in the mapping table first. Only
+        # canonical IDs (what normalize_customer_id returns) are accepted:
+        # anything else would map to a clashing customer_number and be
+        # silently left without a key.
+        register = ""
+        if table_name == "customers":
+            number = f"CAST(SUBSTR(NEW.{source}, 5) AS INTEGER)"
+            register = f"""
+            SELECT RAISE(ABORT, 'customer_id must look like CUST00001')
+            WHERE NEW.{source} IS NULL OR NEW.{source} <> printf('CUST%05d', {number});
+            INSERT OR IGNORE INTO customer_keys (customer_id, customer_number)
+            VALUES (NEW.{source}, {number});"""
+
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_customer_key_insert
+        AFTER INSERT ON {table_name}
+        WHEN NEW.customer_key IS NULL OR NEW.customer_key = ''
+        BEGIN{register}
+            UPDATE {table_name} SET customer_key = {lookup} WHERE rowid = NEW.rowid;
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_customer_key_update
+        AFTER UPDATE OF {source} ON {table_name}
+        BEGIN{register}
+            UPDATE {table_name} SET customer_key = {lookup} WHERE rowid = NEW.rowid;
+        END
+        ''')
+
+    conn.commit()
+
+
+def ensure_customer_key_indexes(conn):
+    """
+    Create the customer_key indexes used by joins and point lookups.
+    """
+    cursor = conn.cursor()
+    for statement in CUSTOMER_KEY_INDEXES:
+        cursor.execute(statement)
+    conn.commit()
+
+
+def resolve_customer_key(conn, customer_id):
+    """
+    Return the surrogate key for any form of customer ID, or None.
+    """
+    cust_text, _ = normalize_customer_id(customer_id)
+    if cust_text is None:
+        return None
+    row = conn.execute(
+        "SELECT customer_key FROM customer_keys WHERE customer_id = ?", (cust_text,)
+    ).fetchone()
+    return row[0] if row else None
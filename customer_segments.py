@@ -0,0 +1,296 @@
+"""
+RFM customer segments.
+refresh_segments() keeps one row per customer in customer_segments:
+recency (last successful transaction), frequency and monetary value,
+scored 1-5 by quintile, next to the customer's account type and active
+loan and credit card holdings, with a segment label derived from the
+scores. Metrics come from one pandas groupby over transactions.
+
+Refreshes are incremental through the change log: only customers with
+transactions inserted since the last refresh are re-aggregated;
+holdings (small tables) and the quintile scores are recomputed for
+everyone, and only rows that changed are written. An updated or deleted
+transaction, a trimmed change log or full=True rebuilds from scratch.
+
+Run from the project root, e.g.:
+    python customer_segments.py
+    python customer_segments.py --full
+"""
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from backends import SQLiteBackend
+from change_log import change_capture_enabled, changes_since, consumer_position, latest_version, save_position
+from txn_archive import read_with_archive
+
+DB_PATH = 'database/banking.db'
+SEGMENT_TABLE = 'customer_segments'
+CONSUMER = 'customer_segments'
+SCORE_BINS = 5
+# Keys per IN (...) list when re-aggregating changed customers
+KEY_BATCH = 500
+
+SEGMENT_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS {SEGMENT_TABLE} (
+    customer_key INTEGER PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    account_type TEXT,
+    last_txn_epoch INTEGER,
+    frequency INTEGER NOT NULL,
+    monetary REAL NOT NULL,
+    active_loans INTEGER NOT NULL,
+    loan_amount REAL NOT NULL,
+    active_cards INTEGER NOT NULL,
+    recency_days INTEGER,
+    r_score INTEGER NOT NULL,
+    f_score INTEGER NOT NULL,
+    m_score INTEGER NOT NULL,
+    rfm_score TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    refreshed_at TEXT NOT NULL
+)
+'''
+
+SEGMENT_INDEXES = [
+    f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{SEGMENT_TABLE}_customer_id ON {SEGMENT_TABLE}(customer_id)",
+    f"CREATE INDEX IF NOT EXISTS idx_{SEGMENT_TABLE}_segment ON {SEGMENT_TABLE}(segment)",
+    f"CREATE INDEX IF NOT EXISTS idx_{SEGMENT_TABLE}_rfm ON {SEGMENT_TABLE}(rfm_score)",
+    f"CREATE INDEX IF NOT EXISTS idx_{SEGMENT_TABLE}_type_segment ON {SEGMENT_TABLE}(account_type, segment)",
+]
+
+SEGMENT_COLUMNS = ['customer_key', 'customer_id', 'account_type', 'last_txn_epoch', 'frequency',
+                   'monetary', 'active_loans', 'loan_amount', 'active_cards', 'recency_days',
+                   'r_score', 'f_score', 'm_score', 'rfm_score', 'segment', 'refreshed_at']
+METRIC_COLUMNS = ['last_txn_epoch', 'frequency', 'monetary']
+
+# First matching rule wins; customers without transactions are "Inactive"
+SEGMENT_RULES = [
+    ("Champions", lambda r, f, m: (r >= 4) & (f >= 4) & (m >= 4)),
+    ("Loyal", lambda r, f, m: (r >= 3) & (f >= 3)),
+    ("New / Promising", lambda r, f, m: (r >= 4) & (f <= 2)),
+    ("At Risk", lambda r, f, m: (r <= 2) & (f >= 3)),
+    ("Hibernating", lambda r, f, m: (r <= 2) & (f <= 2)),
+]
+DEFAULT_SEGMENT = "Needs Attention"
+INACTIVE_SEGMENT = "Inactive"
+SEGMENTS = [name for name, _ in SEGMENT_RULES] + [DEFAULT_SEGMENT, INACTIVE_SEGMENT]
+
+
+def ensure_segment_table(conn):
+    conn.execute(SEGMENT_SCHEMA)
+    for statement in SEGMENT_INDEXES:
+        conn.execute(statement)
+    conn.commit()
+
+
+def segments_available(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEGMENT_TABLE,)
+    ).fetchone() is not None
+
+
+def transaction_metrics(conn, customer_keys=None):
+    """
+    Recency/frequency/monetary inputs per customer_key from successful
+    transactions (archived months included), for all customers or only
+    the given keys.
+    """
+    sql = "SELECT customer_key, txn_epoch, amount FROM transactions WHERE status = 'success'"
+    if customer_keys is None:
+        frames = [read_with_archive(conn, SQLiteBackend(conn), sql).to_pandas()]
+    else:
+        keys = sorted(customer_keys)
+        frames = [
+            read_with_archive(conn, SQLiteBackend(conn), sql + " AND customer_key IN ("
+                              + ", ".join(str(int(key)) for key in keys[i:i + KEY_BATCH]) + ")").to_pandas()
+            for i in range(0, len(keys), KEY_BATCH)
+        ]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=["customer_key", "txn_epoch", "amount"])
+    return df.groupby("customer_key").agg(
+        last_txn_epoch=("txn_epoch", "max"),
+        frequency=("amount", "size"),
+        monetary=("amount", "sum"),
+    )
+
+
+def holdings(conn):
+    """Account type and active loan/card holdings for every customer."""
+    customers = pd.read_sql_query(
+        "SELECT customer_key, customer_id, account_type FROM customers WHERE customer_key IS NOT NULL",
+        conn, index_col="customer_key",
+    )
+    loans = pd.read_sql_query(
+        "SELECT customer_key, Loan_Amount FROM loans WHERE Loan_Status = 'Active'", conn
+    ).groupby("customer_key")["Loan_Amount"].agg(["size", "sum"])
+    cards = pd.read_sql_query(
+        "SELECT customer_key FROM credit_cards WHERE Status = 'Active'", conn
+    ).groupby("customer_key").size()
+    customers["active_loans"] = loans["size"].reindex(customers.index, fill_value=0).astype(int)
+    customers["loan_amount"] = loans["sum"].reindex(customers.index, fill_value=0.0).astype(float)
+    customers["active_cards"] = cards.reindex(customers.index, fill_value=0).astype(int)
+    return customers
+
+
+def _quintile(values):
+    """Scores 1..SCORE_BINS by percentile rank; ties share a score."""
+    return np.ceil(values.rank(method="average", pct=True) * SCORE_BINS).clip(1, SCORE_BINS).astype(int)
+
+
+def score_segments(frame, as_of=None):
+    """
+    Add recency_days, r/f/m scores, rfm_score and segment to a frame with
+    METRIC_COLUMNS. Quintiles are taken over customers with activity.
+    """
+    as_of = int((as_of or datetime.now()).timestamp())
+    frame = frame.copy()
+    active = frame["frequency"] > 0
+    frame["recency_days"] = ((as_of - frame["last_txn_epoch"]) // 86400).where(active).astype("Int64")
+    for column, source in (("r_score", "last_txn_epoch"), ("f_score", "frequency"), ("m_score", "monetary")):
+        frame[column] = 0
+        frame.loc[active, column] = _quintile(frame.loc[active, source])
+    r, f, m = frame["r_score"], frame["f_score"], frame["m_score"]
+    frame["rfm_score"] = r.astype(str) + f.astype(str) + m.astype(str)
+    frame["segment"] = np.select([rule(r, f, m) for _, rule in SEGMENT_RULES],
+                                 [name for name, _ in SEGMENT_RULES], DEFAULT_SEGMENT)
+    frame.loc[~active, "segment"] = INACTIVE_SEGMENT
+    return frame
+
+
+def _changed_customers(conn):
+    """
+    Customer keys whose transactions changed since the last refresh, and
+    the change log version to record. Keys are None when a full rebuild
+    is needed.
+    """
+    if not change_capture_enabled(conn):
+        return None, None
+    position = consumer_position(conn, CONSUMER, default=None)
+    if position is None:
+        return None, latest_version(conn)
+    try:
+        changes, version = changes_since(conn, position, tables=["transactions"])
+    except ValueError:
+        return None, latest_version(conn)
+    # The log only keeps the txn_id, so the customer a deleted transaction
+    # (or an updated one, which may have moved customer) belonged to is unknown
+    if changes["op"].isin(["U", "D"]).any():
+        return None, version
+    txn_ids = changes["pk"].tolist()
+    keys = set()
+    for i in range(0, len(txn_ids), KEY_BATCH):
+        batch = txn_ids[i:i + KEY_BATCH]
+        keys.update(key for (key,) in conn.execute(
+            f"SELECT DISTINCT customer_key FROM transactions WHERE txn_id IN ({', '.join('?' for _ in batch)})",
+            batch,
+        ) if key is not None)
+    return keys, version
+
+
+def _plain(frame):
+    """Python values with None for missing, as sqlite3 binds and compares them."""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None)
+
+
+def _write_changed(conn, new, existing):
+    """Write rows of new that differ from existing; delete rows gone from new."""
+    compare = [column for column in SEGMENT_COLUMNS[1:] if column != 'refreshed_at']
+    old, fresh = _plain(existing.reindex(new.index)[compare]), _plain(new[compare])
+    same = (old == fresh) | (old.isna() & fresh.isna())
+    changed = new[~same.all(axis=1)]
+
+    removed = existing.index.difference(new.index)
+    conn.executemany(f"DELETE FROM {SEGMENT_TABLE} WHERE customer_key = ?",
+                     [(int(key),) for key in removed])
+    rows = _plain(changed.reset_index()[SEGMENT_COLUMNS])
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {SEGMENT_TABLE} ({', '.join(SEGMENT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in SEGMENT_COLUMNS)})",
+        rows.itertuples(index=False, name=None),
+    )
+    return len(changed), len(removed)
+
+
+def refresh_segments(conn, full=False, as_of=None):
+    """
+    Bring customer_segments up to date. Returns a summary dict: mode,
+    customers, reaggregated (customers whose metrics were recomputed),
+    written, removed, seconds.
+    """
+    start = time.perf_counter()
+    ensure_segment_table(conn)
+    keys, version = _changed_customers(conn)
+    existing = pd.read_sql_query(f"SELECT * FROM {SEGMENT_TABLE}", conn, index_col="customer_key")
+    if full or keys is None or existing.empty:
+        mode = "full"
+        metrics = transaction_metrics(conn)
+        reaggregated = len(metrics)
+    else:
+        mode = "incremental"
+        metrics = existing[METRIC_COLUMNS].copy()
+        if keys:
+            fresh = transaction_metrics(conn, keys)
+            # Customers left with no successful transactions drop to empty metrics
+            metrics = metrics.drop(index=list(keys), errors="ignore")
+            metrics = pd.concat([metrics, fresh])
+        reaggregated = len(keys)
+
+    frame = holdings(conn)
+    frame = frame.join(metrics.reindex(frame.index))
+    frame["frequency"] = frame["frequency"].fillna(0).astype(int)
+    frame["monetary"] = frame["monetary"].fillna(0.0).astype(float)
+    frame = score_segments(frame, as_of)
+    frame["refreshed_at"] = datetime.now().isoformat(timespec='seconds')
+
+    try:
+        written, removed = _write_changed(conn, frame, existing)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if version is not None:
+        save_position(conn, CONSUMER, version)
+    return {"mode": mode, "customers": len(frame), "reaggregated": reaggregated,
+            "written": written, "removed": removed, "seconds": time.perf_counter() - start}
+
+
+def segment_summary(conn):
+    """Customers, average RFM inputs and holdings per segment."""
+    return pd.read_sql_query(f'''
+    SELECT segment, COUNT(*) AS customers,
+           ROUND(AVG(recency_days), 1) AS avg_recency_days,
+           ROUND(AVG(frequency), 1) AS avg_transactions,
+           ROUND(AVG(monetary), 2) AS avg_monetary,
+           SUM(active_loans > 0) AS with_active_loans,
+           SUM(active_cards > 0) AS with_active_cards
+    FROM {SEGMENT_TABLE}
+    GROUP BY segment
+    ORDER BY customers DESC
+    ''', conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh RFM customer segments")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--full", action="store_true", help="rebuild from every transaction")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        result = refresh_segments(conn, full=args.full)
+        print(f"✓ {result['mode'].capitalize()} refresh of {result['customers']:,} customers in "
+              f"{result['seconds'] * 1000:,.0f} ms ({result['reaggregated']:,} re-aggregated, "
+              f"{result['written']:,} rows written, {result['removed']:,} removed)")
+        print(segment_summary(conn).to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+"""
+Index advisor driven by the observed query workload.
+While capture is on (the dashboard turns it on), every statement the app
+runs is fingerprinted (literals replaced by ?) and counted in
+query_workload.db next to the database: reads through SQLiteBackend,
+catalog queries through execute_query() and anything else on the app's
+connection. advise() then works on a scratch copy of the database:
+1. EXPLAIN QUERY PLAN each captured read, update and delete, keeping the
+   ones that scan a table or build a temp B-tree;
+2. derive candidate indexes from their filter, join, GROUP BY and
+   ORDER BY columns (indexes on the transactions view go on every
+   partition);
+3. create each candidate, check the plan uses it, time the statement
+   before and after and measure the index's size;
+4. keep the candidates that pay off and write their DDL to
+   index_advice.sql.
+
+Run from the project root, e.g.:
+    python index_advisor.py
+    python index_advisor.py --min-speedup 2 --out database/index_advice.sql
+"""
+import argparse
+import atexit
+import json
+import os
+import re
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+DB_PATH = 'database/banking.db'
+WORKLOAD_FILE = 'query_workload.db'
+ADVICE_FILE = 'index_advice.sql'
+# Pending fingerprints are written out at most this often
+FLUSH_SECONDS = 5
+REPEAT = 3
+MIN_SPEEDUP = 1.2
+# Below this per call, timings are noise
+MIN_SAVED_MS = 0.5
+MAX_INDEX_COLUMNS = 3
+INDEX_PREFIX = 'idx_advisor_'
+
+WORKLOAD_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS query_workload (
+    fingerprint TEXT PRIMARY KEY,
+    example_sql TEXT NOT NULL,
+    example_params TEXT,
+    source TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+)
+'''
+
+RECORD_SQL = '''
+INSERT INTO query_workload VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(fingerprint) DO UPDATE SET
+    calls = calls + excluded.calls,
+    example_sql = excluded.example_sql,
+    example_params = excluded.example_params,
+    last_seen = excluded.last_seen
+'''
+
+# Statements an index can speed up
+_ADVISABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+# Bookkeeping the app does on its own tables
+_IGNORED = re.compile(r"\b(sqlite_master|sqlite_schema|pragma_\w+|change_log|change_consumers|query_workload)\b",
+                      re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+
+SQL_KEYWORDS = {
+    'where', 'on', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'group', 'order', 'limit', 'using',
+    'as', 'union', 'select', 'having', 'natural', 'full', 'set', 'values', 'and', 'or', 'not',
+}
+
+
+def workload_path(db_path=DB_PATH):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), WORKLOAD_FILE)
+
+
+def fingerprint(sql):
+    """Statement text with literals replaced by ?, so repeats of one query group together."""
+    text = _STRING.sub("?", sql)
+    text = _NUMBER.sub("?", text)
+    text = " ".join(text.split())
+    return _IN_LIST.sub("IN (?...)", text)
+
+
+class WorkloadRecorder:
+    """
+    Counts statements by fingerprint and writes them to the workload
+    database every FLUSH_SECONDS (and at exit). Thread-safe; reads done
+    inside statement() are not recorded a second time by the connection
+    trace.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_flush = time.monotonic()
+        conn = sqlite3.connect(path)
+        conn.execute(WORKLOAD_SCHEMA)
+        conn.close()
+        atexit.register(self.flush)
+
+    def record(self, sql, params=None, source="app"):
+        if not sql or not _ADVISABLE.match(sql) or _IGNORED.search(sql):
+            return
+        key = fingerprint(sql)
+        now = datetime.now().isoformat(timespec='seconds')
+        example_params = json.dumps(list(params), default=str) if params else None
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [sql, example_params, source, 1, now, now]
+            else:
+                entry[0], entry[1], entry[3], entry[5] = sql, example_params, entry[3] + 1, now
+            due = time.monotonic() - self._last_flush >= FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def trace(self, sql):
+        """sqlite3 trace callback; skips trigger re-reports and reads already recorded."""
+        if getattr(self._local, "depth", 0) or sql == getattr(self._local, "last", None):
+            return
+        self._local.last = sql
+        self.record(sql, source="connection")
+
+    @contextmanager
+    def statement(self, sql, params=None, source="app"):
+        """Record sql once, then run the block with nested recording off."""
+        self.record(sql, params, source)
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.executemany(RECORD_SQL, [(key, *entry) for key, entry in pending.items()])
+            conn.commit()
+        finally:
+            conn.close()
+
+
+_recorder = None
+
+
+def start_capture(db_path=DB_PATH):
+    """Turn on workload capture for this process; returns the recorder."""
+    global _recorder
+    if _recorder is None:
+        _recorder = WorkloadRecorder(workload_path(db_path))
+    return _recorder
+
+
+def trace_connection(conn):
+    """Record every statement run on conn while capture is on."""
+    if _recorder is not None:
+        conn.set_trace_callback(_recorder.trace)
+
+
+@contextmanager
+def captured(sql, params=None, source="app"):
+    """Record sql if capture is on; statements run inside are not recorded again."""
+    if _recorder is None:
+        yield
+        return
+    with _recorder.statement(sql, params, source):
+        yield
+
+
+def load_workload(path):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["fingerprint", "example_sql", "example_params", "source", "calls"])
+    conn = sqlite3.connect(path)
+    try:
+        return pd.read_sql_query("SELECT * FROM query_workload ORDER BY calls DESC", conn)
+    finally:
+        conn.close()
+
+
+def scratch_database(db_path):
+    """Copy of db_path in a temp directory, via the backup API so it is consistent."""
+    scratch_dir = tempfile.mkdtemp(prefix="index_advisor_")
+    scratch_path = os.path.join(scratch_dir, os.path.basename(db_path))
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(scratch_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+    return target, scratch_dir
+
+
+def query_plan(conn, sql, params=()):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def plan_problems(plan):
+    """Full table scans and temp B-trees in a plan."""
+    return [detail for detail in plan
+            if (detail.startswith("SCAN ") and " USING " not in detail) or "TEMP B-TREE" in detail]
+
+
+def time_statement(conn, sql, params=(), repeat=REPEAT):
+    """Median seconds to run sql to completion; writes are rolled back."""
+    writes = not re.match(r"^\s*(SELECT|WITH)\b", sql, re.IGNORECASE)
+    timings = []
+    for _ in range(repeat):
+        if writes:
+            conn.execute("SAVEPOINT advisor_timing")
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append(time.perf_counter() - start)
+        if writes:
+            conn.execute("ROLLBACK TO advisor_timing")
+            conn.execute("RELEASE advisor_timing")
+    return statistics.median(timings)
+
+
+def physical_tables(conn, table_name):
+    """Tables an index for table_name goes on: every partition for the transactions view."""
+    if table_name == 'transactions':
+        return [name for (name,) in conn.execute(
+            "SELECT table_name FROM transaction_partitions ORDER BY month")]
+    return [table_name]
+
+
+def table_columns(conn, table_name):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+
+def existing_indexes(conn, table_name):
+    """Column lists of the indexes already on table_name (its first partition for the view)."""
+    tables = physical_tables(conn, table_name)
+    if not tables:
+        return []
+    indexes = []
+    for _, index_name, *_ in conn.execute(f"PRAGMA index_list({tables[0]})"):
+        indexes.append([row[2] for row in conn.execute(f"PRAGMA index_info({index_name})")])
+    return indexes
+
+
+def _sql_tables(conn, sql):
+    """{alias or name: table} for the tables and views a statement reads."""
+    known = {name.lower(): name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    tables = {}
+    for name, alias in re.findall(r"\b(?:FROM|JOIN|UPDATE)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?",
+                                  sql, re.IGNORECASE):
+        table_name = known.get(name.lower())
+        if table_name is None:
+            continue
+        tables[name.lower()] = table_name
+        if alias and alias.lower() not in SQL_KEYWORDS:
+            tables[alias.lower()] = table_name
+    return tables
+
+
+def _column_list(sql, keyword):
+    """Plain column references of a GROUP BY / ORDER BY clause."""
+    match = re.search(rf"\b{keyword}\s+BY\s+(.+?)(?:\bHAVING\b|\bORDER\b|\bLIMIT\b|\)|$)", sql,
+                      re.IGNORECASE | re.DOTALL)
+    if not match:
+        return []
+    columns = []
+    for term in match.group(1).split(","):
+        term = re.sub(r"\s+(ASC|DESC)\s*$", "", term.strip(), flags=re.IGNORECASE)
+        if re.fullmatch(r"(?:[A-Za-z_]\w*\.)?[A-Za-z_]\w*", term):
+            columns.append(term)
+    return columns
+
+
+def candidate_indexes(conn, sql):
+    """
+    {table: [column tuples]} worth trying for a statement: equality
+    columns followed by one range column, single filter columns, and the
+    GROUP BY / ORDER BY columns after the equality columns.
+    """
+    tables = _sql_tables(conn, sql)
+    columns = {table_name: {column.lower(): column for column in table_columns(conn, table_name)}
+               for table_name in set(tables.values())}
+
+    def resolve(reference):
+        """(table, column) for a column reference, or None."""
+        if "." in reference:
+            alias, column = reference.split(".", 1)
+            table_name = tables.get(alias.lower())
+            if table_name and column.lower() in columns[table_name]:
+                return table_name, columns[table_name][column.lower()]
+            return None
+        owners = [table_name for table_name, cols in columns.items() if reference.lower() in cols]
+        return (owners[0], columns[owners[0]][reference.lower()]) if len(owners) == 1 else None
+
+    equality, ranges = {}, {}
+    reference = r"((?:[A-Za-z_]\w*\.)?[A-Za-z_]\w*)"
+    for ref, op in re.findall(reference + r"\s*(=|==|<=|>=|<|>|\bIN\b|\bBETWEEN\b|\bLIKE\b|\bIS\b)", sql,
+                              re.IGNORECASE):
+        found = resolve(ref)
+        if found:
+            target = equality if op.upper() in ("=", "==", "IN", "IS") else ranges
+            target.setdefault(found[0], [])
+            if found[1] not in target[found[0]]:
+                target[found[0]].append(found[1])
+    # Right-hand side of join conditions
+    for ref in re.findall(r"=\s*" + reference, sql):
+        found = resolve(ref)
+        if found and found[1] not in equality.setdefault(found[0], []):
+            equality[found[0]].append(found[1])
+
+    ordered = {}
+    for keyword in ("GROUP", "ORDER"):
+        for ref in _column_list(sql, keyword):
+            found = resolve(ref)
+            if found:
+                ordered.setdefault((found[0], keyword), []).append(found[1])
+
+    candidates = {}
+    for table_name in columns:
+        eq = equality.get(table_name, [])[:MAX_INDEX_COLUMNS]
+        rng = [column for column in ranges.get(table_name, []) if column not in eq]
+        options = []
+        if eq or rng:
+            options.append(tuple((eq + rng[:1])[:MAX_INDEX_COLUMNS]))
+        options.extend((column,) for column in eq + rng)
+        for keyword in ("GROUP", "ORDER"):
+            sort_columns = [column for column in ordered.get((table_name, keyword), []) if column not in eq]
+            if sort_columns:
+                options.append(tuple((eq + sort_columns)[:MAX_INDEX_COLUMNS]))
+        existing = existing_indexes(conn, table_name)
+        kept = []
+        for option in options:
+            # An existing index starting with these columns already serves them
+            if option and option not in kept and not any(index[:len(option)] == list(option) for index in existing):
+                kept.append(option)
+        if kept:
+            candidates[table_name] = kept
+    return candidates
+
+
+def index_name(table_name, columns):
+    return f"{INDEX_PREFIX}{table_name}_{'_'.join(column.lower() for column in columns)}"
+
+
+def index_ddl(conn, table_name, columns):
+    """CREATE INDEX statements for one candidate (one per partition for the view)."""
+    column_list = ", ".join(columns)
+    return [f"CREATE INDEX IF NOT EXISTS {index_name(table, columns)} ON {table}({column_list})"
+            for table in physical_tables(conn, table_name)]
+
+
+def _database_bytes(conn):
+    """Bytes in use; pages freed by earlier candidates are reused, so page_count alone misses them."""
+    pages = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return pages * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def try_index(conn, table_name, columns, statements):
+    """
+    Create a candidate in the scratch database, re-plan and re-time the
+    statements it was proposed for, then drop it. Returns (size in
+    bytes, {fingerprint: (seconds after, plan uses it)}).
+    """
+    ddl = index_ddl(conn, table_name, columns)
+    before = _database_bytes(conn)
+    for statement in ddl:
+        conn.execute(statement)
+    conn.commit()
+    size = _database_bytes(conn) - before
+    names = [index_name(table, columns) for table in physical_tables(conn, table_name)]
+    results = {}
+    try:
+        for key, sql, params in statements:
+            plan = query_plan(conn, sql, params)
+            uses = any(f"INDEX {name} " in f"{detail} " for name in names for detail in plan)
+            results[key] = (time_statement(conn, sql, params) if uses else None, uses)
+    finally:
+        for name in names:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.commit()
+    return size, results
+
+
+def advise(db_path=DB_PATH, workload=None, min_speedup=MIN_SPEEDUP, top=None, progress=print):
+    """
+    Evaluate the captured workload against candidate indexes. Returns a
+    DataFrame of recommended indexes (best total saving first) with their
+    DDL, and the analysed statements.
+    """
+    if workload is None:
+        workload = load_workload(workload_path(db_path))
+    if top:
+        workload = workload.head(top)
+    conn, scratch_dir = scratch_database(db_path)
+    try:
+        # 1. Plans and baseline timings of the statements that scan
+        statements = []
+        for row in workload.itertuples(index=False):
+            params = json.loads(row.example_params) if isinstance(row.example_params, str) else ()
+            try:
+                plan = query_plan(conn, row.example_sql, params)
+            except sqlite3.Error as e:
+                progress(f"⚠️ Skipped (no longer valid: {e}): {row.fingerprint[:80]}")
+                continue
+            problems = plan_problems(plan)
+            if not problems:
+                continue
+            statements.append({
+                "fingerprint": row.fingerprint, "sql": row.example_sql, "params": params, "calls": row.calls,
+                "problems": "; ".join(problems), "seconds": time_statement(conn, row.example_sql, params),
+            })
+
+        # 2. Candidates per statement, each tried once for all statements proposing it
+        proposals = {}
+        for statement in statements:
+            for table_name, options in candidate_indexes(conn, statement["sql"]).items():
+                for columns in options:
+                    proposals.setdefault((table_name, columns), []).append(statement)
+        progress(f"✓ {len(statements)} of {len(workload)} statements scan or sort; "
+                 f"trying {len(proposals)} candidate indexes")
+
+        rows = []
+        for (table_name, columns), proposed_for in proposals.items():
+            size, results = try_index(conn, table_name, columns, [
+                (statement["fingerprint"], statement["sql"], statement["params"]) for statement in proposed_for
+            ])
+            helped = []
+            for statement in proposed_for:
+                after, uses = results[statement["fingerprint"]]
+                if (uses and after and statement["seconds"] / after >= min_speedup
+                        and (statement["seconds"] - after) * 1000 >= MIN_SAVED_MS):
+                    helped.append((statement, after))
+            if not helped:
+                continue
+            before_ms = sum(statement["seconds"] for statement, _ in helped) * 1000
+            after_ms = sum(after for _, after in helped) * 1000
+            rows.append({
+                "table": table_name,
+                "columns": ", ".join(columns),
+                "statements": len(helped),
+                "calls": int(sum(statement["calls"] for statement, _ in helped)),
+                "before_ms": round(before_ms, 2),
+                "after_ms": round(after_ms, 2),
+                "speedup": round(before_ms / after_ms, 1) if after_ms else None,
+                "saved_ms_total": round(sum((statement["seconds"] - after) * statement["calls"]
+                                            for statement, after in helped) * 1000, 1),
+                "size_kb": round(size / 1024, 1),
+                "ddl": ";\n".join(index_ddl(conn, table_name, columns)) + ";",
+            })
+        advice = pd.DataFrame(rows, columns=["table", "columns", "statements", "calls", "before_ms", "after_ms",
+                                             "speedup", "saved_ms_total", "size_kb", "ddl"])
+        advice = _drop_redundant(advice.sort_values("saved_ms_total", ascending=False, ignore_index=True))
+        return advice, pd.DataFrame(statements)
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def _drop_redundant(advice):
+    """Drop a recommendation whose columns lead a better one on the same table."""
+    kept = []
+    for row in advice.itertuples(index=False):
+        columns = row.columns.split(", ")
+        if any(other.table == row.table and other.columns.split(", ")[:len(columns)] == columns for other in kept):
+            continue
+        kept.append(row)
+    return pd.DataFrame(kept, columns=advice.columns)
+
+
+def write_advice(advice, path):
+    """Ready-to-apply DDL, one commented block per recommendation."""
+    lines = [f"-- Index advice generated {datetime.now().isoformat(timespec='seconds')}",
+             "-- Apply with: sqlite3 database/banking.db < " + os.path.basename(path), ""]
+    for row in advice.itertuples(index=False):
+        lines.append(f"-- {row.table}({row.columns}): {row.speedup}x on {row.statements} statement(s), "
+                     f"{row.calls} calls, {row.size_kb} KB")
+        if row.table == 'transactions':
+            lines.append("-- New partitions need it too: add it to txn_partitions.PARTITION_INDEXES")
+        lines.append(row.ddl)
+        lines.append("")
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend indexes from the captured query workload")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--workload", default=None, help="workload database (default: next to --db)")
+    parser.add_argument("--min-speedup", type=float, default=MIN_SPEEDUP)
+    parser.add_argument("--top", type=int, default=None, help="only the N most frequent statements")
+    parser.add_argument("--out", default=None, help="DDL file (default: index_advice.sql next to --db)")
+    args = parser.parse_args()
+
+    workload = load_workload(args.workload or workload_path(args.db))
+    if workload.empty:
+        print("⚠️ No captured workload yet; use the dashboard first")
+        return
+    print(f"Analysing {len(workload)} statements ({int(workload['calls'].sum()):,} calls)")
+    advice, _ = advise(args.db, workload, args.min_speedup, args.top)
+    if advice.empty:
+        print("✅ No index would pay off for this workload")
+        return
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(args.db)), ADVICE_FILE)
+    write_advice(advice, out)
+    print(advice.drop(columns=["ddl"]).to_string(index=False))
+    print(f"\n🎉 Wrote {len(advice)} recommendations to {out}")
+
+
+if __name__ == "__main__":
+    main()
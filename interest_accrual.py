@@ -0,0 +1,259 @@
+"""
+Daily interest accrual.
+accrue_interest() accrues one business date of interest for every
+account (annual rate by account type, on the stored balance) and every
+active loan (its Interest_Rate, on Loan_Amount, within its start/end
+dates), actual/365. Rows are read in customer_key / Loan_ID order in
+batches, the interest is computed for the whole batch as NumPy arrays,
+and each batch is posted with one executemany upsert into
+interest_balances (running accrued total per account or loan).
+
+Runs are idempotent per business date: accrual_runs records each
+(date, entity) run and a date already run is skipped; each balance row
+also remembers the day it is accrued through, so a crashed or repeated
+run never accrues a day twice. A date several days after an entity's
+last accrual accrues every missed day at today's principal.
+Accruals are not posted to account_balance (capitalisation is a
+separate step), so reconciliation is unaffected.
+
+Run from the project root, e.g.:
+    python interest_accrual.py
+    python interest_accrual.py --date 2026-10-19
+"""
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from typed_columns import EPOCH
+
+DB_PATH = 'database/banking.db'
+DAY_COUNT = 365
+BATCH_ROWS = 200000
+ENTITIES = ('account', 'loan')
+
+# Annual interest paid on balances, percent
+ACCOUNT_RATES = {
+    'Savings': 3.5,
+    'Salary': 3.0,
+    'Fixed Deposit': 7.0,
+    'Current': 0.0,
+}
+
+INTEREST_SCHEMAS = [
+    '''
+CREATE TABLE IF NOT EXISTS interest_balances (
+    entity TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    accrued REAL NOT NULL,
+    accrued_through_day INTEGER NOT NULL,
+    PRIMARY KEY (entity, entity_id)
+)
+''',
+    '''
+CREATE TABLE IF NOT EXISTS accrual_runs (
+    business_date TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    accrued_rows INTEGER NOT NULL,
+    total_interest REAL NOT NULL,
+    seconds REAL NOT NULL,
+    run_at TEXT NOT NULL,
+    PRIMARY KEY (business_date, entity)
+)
+''',
+]
+
+# The guard makes a repeated post for the same day a no-op
+POST_SQL = '''
+INSERT INTO interest_balances (entity, entity_id, accrued, accrued_through_day)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(entity, entity_id) DO UPDATE SET
+    accrued = accrued + excluded.accrued,
+    accrued_through_day = excluded.accrued_through_day
+WHERE accrued_through_day < excluded.accrued_through_day
+'''
+
+
+LOAN_BATCH_SQL = '''
+SELECT Loan_ID, Loan_Amount, Interest_Rate, start_day, end_day
+FROM loans
+WHERE Loan_Status = 'Active' AND Loan_ID > ?
+ORDER BY Loan_ID
+LIMIT ?
+'''
+
+
+def ensure_interest_tables(conn):
+    for statement in INTEREST_SCHEMAS:
+        conn.execute(statement)
+    conn.commit()
+
+
+def business_day(value=None):
+    """(ISO date, days since the Unix epoch) of a business date; default today."""
+    date = pd.Timestamp(value or datetime.now()).normalize()
+    return date.date().isoformat(), (date - EPOCH).days
+
+
+def daily_interest(principal, annual_rate, through_day, day, start_day=None, end_day=None):
+    """
+    Interest for the days after through_day up to and including day, as
+    arrays. Missing through_day means nothing accrued yet (one day).
+    Loans only accrue between start_day and end_day.
+    """
+    first = np.where(np.isnan(through_day), day, through_day + 1)
+    last = np.full_like(first, day)
+    if start_day is not None:
+        first = np.fmax(first, start_day)
+        last = np.fmin(last, end_day)
+    days = np.clip(last - first + 1, 0, None)
+    principal = np.nan_to_num(principal)
+    interest = np.where(principal > 0, principal, 0.0) * np.nan_to_num(annual_rate) / 100 / DAY_COUNT * days
+    return interest, days
+
+
+def _align(ids, keys, values):
+    """values (ordered by keys) lined up with ids; NaN where a key is missing."""
+    keys = np.asarray(keys, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(ids), np.nan)
+    if len(keys):
+        pos = np.clip(np.searchsorted(keys, ids), 0, len(keys) - 1)
+        found = keys[pos] == ids
+        out[found] = values[pos[found]]
+    return out
+
+
+def _range_column(conn, sql, first, last):
+    """(keys, values) of a two-column key range read, ordered by key."""
+    rows = conn.execute(sql, (first, last)).fetchall()
+    return ([row[0] for row in rows], [row[1] for row in rows]) if rows else ([], [])
+
+
+def _read_batch(conn, entity, after, batch_rows):
+    """
+    Next batch as arrays (ids, principal, annual_rate, through_day,
+    start_day, end_day), or None when done. Each table is read as one
+    key-range scan and lined up in NumPy rather than joined row by row.
+    """
+    if entity == 'account':
+        rows = conn.execute(
+            "SELECT customer_key, account_balance FROM accounts WHERE customer_key > ? "
+            "ORDER BY customer_key LIMIT ?", (after, batch_rows)
+        ).fetchall()
+    else:
+        rows = conn.execute(LOAN_BATCH_SQL, (after, batch_rows)).fetchall()
+    if not rows:
+        return None
+    columns = list(zip(*rows))
+    ids = np.array(columns[0], dtype=np.int64)
+    principal = np.array(columns[1], dtype=float)
+    first, last = int(ids[0]), int(ids[-1])
+
+    if entity == 'account':
+        keys, account_types = _range_column(
+            conn, "SELECT customer_key, account_type FROM customers "
+                  "WHERE customer_key BETWEEN ? AND ? ORDER BY customer_key", first, last)
+        rates = pd.Series(account_types, dtype=object).map(ACCOUNT_RATES).fillna(0.0)
+        rate = _align(ids, keys, rates)
+        start_day = end_day = None
+    else:
+        rate = np.array(columns[2], dtype=float)
+        start_day = np.array(columns[3], dtype=float)
+        end_day = np.array(columns[4], dtype=float)
+
+    keys, through = _range_column(
+        conn, f"SELECT entity_id, accrued_through_day FROM interest_balances "
+              f"WHERE entity = '{entity}' AND entity_id BETWEEN ? AND ? ORDER BY entity_id", first, last)
+    return ids, principal, rate, _align(ids, keys, through), start_day, end_day
+
+
+def accrue_entity(conn, entity, business_date=None, batch_rows=BATCH_ROWS):
+    """
+    Accrue one business date for all accounts or all active loans in one
+    transaction. Returns the run summary, or None if the date already ran.
+    """
+    date, day = business_day(business_date)
+    if conn.execute("SELECT 1 FROM accrual_runs WHERE business_date = ? AND entity = ?",
+                    (date, entity)).fetchone():
+        return None
+
+    start = time.perf_counter()
+    after = -1
+    accrued_rows = 0
+    total = 0.0
+    try:
+        while True:
+            batch = _read_batch(conn, entity, after, batch_rows)
+            if batch is None:
+                break
+            ids, principal, rate, through, start_day, end_day = batch
+            interest, days = daily_interest(principal, rate, through, day, start_day, end_day)
+            post = (days > 0) & (interest > 0)
+            conn.executemany(POST_SQL, zip(
+                repeat(entity), ids[post].tolist(), interest[post].tolist(), repeat(day),
+            ))
+            accrued_rows += int(post.sum())
+            total += float(interest[post].sum())
+            after = int(ids[-1])
+
+        seconds = time.perf_counter() - start
+        conn.execute("INSERT INTO accrual_runs VALUES (?, ?, ?, ?, ?, ?)",
+                     (date, entity, accrued_rows, total, seconds, datetime.now().isoformat(timespec='seconds')))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {"business_date": date, "entity": entity, "accrued_rows": accrued_rows,
+            "total_interest": total, "seconds": seconds}
+
+
+def accrue_interest(conn, business_date=None, batch_rows=BATCH_ROWS):
+    """
+    Accrue accounts and loans for a business date. Returns {entity:
+    summary or None if that entity had already run for the date}.
+    """
+    ensure_interest_tables(conn)
+    return {entity: accrue_entity(conn, entity, business_date, batch_rows) for entity in ENTITIES}
+
+
+def accrual_status(conn, limit=10):
+    """Latest runs and the accrued totals per entity."""
+    runs = pd.read_sql_query(
+        "SELECT * FROM accrual_runs ORDER BY business_date DESC, entity LIMIT ?", conn, params=(limit,)
+    )
+    totals = pd.read_sql_query(
+        "SELECT entity, COUNT(*) AS accruing, ROUND(SUM(accrued), 2) AS accrued, "
+        "MAX(accrued_through_day) AS through_day FROM interest_balances GROUP BY entity", conn
+    )
+    return runs, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accrue a business day of interest on accounts and loans")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--date", help="business date (default: today)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        results = accrue_interest(conn, args.date)
+        date, _ = business_day(args.date)
+        for entity, result in results.items():
+            if result is None:
+                print(f"♻️ {entity.capitalize()} interest for {date} already accrued")
+            else:
+                print(f"✓ Accrued ₹{result['total_interest']:,.2f} on {result['accrued_rows']:,} "
+                      f"{entity}s for {date} in {result['seconds'] * 1000:,.0f} ms")
+        runs, totals = accrual_status(conn)
+        print(totals.to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
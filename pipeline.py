@@ -0,0 +1,224 @@
+"""
+Small DAG pipeline runner with a content-addressed stage cache.
+A stage runs once its dependencies are done, on a process pool (CPU-bound
+Python such as data generation) or a thread pool (I/O and SQLite work).
+Each stage gets a key hashed from its parameters, its code files and the
+content of what its dependencies produced; if the key matches the last
+successful run, the stage is skipped (or its output files restored from
+the cache) instead of re-run.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+CACHE_DIR = '.pipeline_cache'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Stage:
+    """
+    One unit of work in the pipeline.
+    func(*args) does the work and may return a short summary string.
+    outputs are files the stage writes; stages without outputs (e.g.
+    database loads) record their key in state instead.
+    """
+
+    def __init__(self, name, func, args=(), deps=(), params=None, code=(),
+                 outputs=(), state=None, pool='thread'):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.deps = list(deps)
+        self.params = params or {}
+        self.code = list(code)
+        self.outputs = list(outputs)
+        self.state = state
+        self.pool = pool
+
+
+class StageCache:
+    """
+    Content-addressed store for stage outputs.
+    objects/<sha256> holds file contents, stages/<key>.json maps a stage
+    key to the digests of the files it produced.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.stages_dir = os.path.join(cache_dir, 'stages')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.stages_dir, exist_ok=True)
+
+    def lookup(self, key):
+        path = os.path.join(self.stages_dir, f"{key}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def store(self, key, outputs):
+        """Copy output files into the object store and record them under key."""
+        digests = {}
+        for path in outputs:
+            digest = file_digest(path)
+            obj = os.path.join(self.objects_dir, digest)
+            if not os.path.exists(obj):
+                shutil.copyfile(path, obj + '.tmp')
+                os.replace(obj + '.tmp', obj)
+            digests[path] = digest
+        with open(os.path.join(self.stages_dir, f"{key}.json"), 'w') as f:
+            json.dump(digests, f, indent=2)
+        return digests
+
+    def restore(self, digests):
+        """
+        Bring output files back to the recorded content. Returns 'cached'
+        if they were already current, 'restored' if any were copied, or
+        None if an object is missing.
+        """
+        status = 'cached'
+        for path, digest in digests.items():
+            if os.path.exists(path) and file_digest(path) == digest:
+                continue
+            obj = os.path.join(self.objects_dir, digest)
+            if not os.path.exists(obj):
+                return None
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            shutil.copyfile(obj, path)
+            status = 'restored'
+        return status
+
+
+class Pipeline:
+    """
+    Runs a set of stages in dependency order, in parallel where possible.
+    """
+
+    def __init__(self, stages, cache=None, workers=None, force=False):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache = cache or StageCache()
+        self.workers = workers
+        self.force = force
+        # name -> digest of what the stage produced, used by dependants' keys
+        self.digests = {}
+        self.results = {}
+
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+
+    def stage_key(self, stage):
+        payload = {
+            'stage': stage.name,
+            'params': stage.params,
+            'code': {path: file_digest(path) for path in stage.code},
+            'deps': {dep: self.digests[dep] for dep in stage.deps},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def try_cache(self, stage, key):
+        """Return 'cached'/'restored' if the stage can be skipped, else None."""
+        if self.force:
+            return None
+        if stage.outputs:
+            digests = self.cache.lookup(key)
+            return self.cache.restore(digests) if digests else None
+        if stage.state is not None and stage.state.get(stage.name) == key:
+            return 'cached'
+        return None
+
+    def complete(self, stage, key):
+        """Record a finished stage and its content digest."""
+        if stage.outputs:
+            digests = self.cache.store(key, stage.outputs)
+            self.digests[stage.name] = hashlib.sha256(
+                json.dumps(digests, sort_keys=True).encode()
+            ).hexdigest()
+        else:
+            if stage.state is not None:
+                stage.state.set(stage.name, key)
+            self.digests[stage.name] = key
+
+    def run(self):
+        """
+        Execute every stage. Returns {name: result dict}; raises on failure
+        after letting running stages finish.
+        """
+        pending = dict(self.stages)
+        running = {}
+        started = time.perf_counter()
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as processes, \
+                    ThreadPoolExecutor(max_workers=self.workers) as threads:
+                while pending or running:
+                    # Start (or skip) every stage whose dependencies are done
+                    for name, stage in list(pending.items()):
+                        if any(dep not in self.digests for dep in stage.deps):
+                            continue
+                        del pending[name]
+                        key = self.stage_key(stage)
+                        status = self.try_cache(stage, key)
+                        if status is not None:
+                            if stage.outputs:
+                                self.complete(stage, key)
+                            else:
+                                self.digests[name] = key
+                            self.results[name] = {'status': status, 'seconds': 0.0, 'summary': ''}
+                            print(f"♻️ {name}: {status}")
+                            continue
+                        pool = processes if stage.pool == 'process' else threads
+                        running[pool.submit(_timed, stage.func, stage.args)] = (stage, key, time.perf_counter())
+
+                    if not running:
+                        if pending:
+                            raise RuntimeError(f"Unresolvable stages: {sorted(pending)}")
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, key, submitted = running.pop(future)
+                        try:
+                            summary, seconds = future.result()
+                        except Exception as e:
+                            self.results[stage.name] = {'status': 'failed', 'summary': str(e),
+                                                        'seconds': time.perf_counter() - submitted}
+                            print(f"❌ {stage.name} failed: {e}")
+                            wait(running)
+                            raise
+                        self.complete(stage, key)
+                        self.results[stage.name] = {'status': 'ran', 'seconds': seconds,
+                                                    'summary': summary or ''}
+                        print(f"✓ {stage.name} ({seconds:.2f}s) {summary or ''}")
+        finally:
+            # Set even when a stage fails, so the timing table still prints
+            self.wall_seconds = time.perf_counter() - started
+        return self.results
+
+    def print_timings(self):
+        """Per-stage timing breakdown and total wall time."""
+        print(f"\n{'Stage':<28}{'Status':>10}{'Seconds':>10}")
+        for name in self.stages:
+            result = self.results.get(name, {'status': 'skipped', 'seconds': 0.0})
+            print(f"{name:<28}{result['status']:>10}{result['seconds']:>10.2f}")
+        serial = sum(result['seconds'] for result in self.results.values())
+        print(f"\nWall time: {self.wall_seconds:.2f}s (sum of stage times: {serial:.2f}s)")
+
+
+def _timed(func, args):
+    """Run a stage function and time it (in the worker)."""
+    start = time.perf_counter()
+    summary = func(*args)
+    return summary, time.perf_counter() - start
@@ -0,0 +1,186 @@
+"""
+Group-commit write queue for balance postings.
+Sessions submit deposits and withdrawals to one PostingQueue; a single
+writer thread drains whatever is waiting into a batch, applies each
+posting in arrival order (so postings to one account keep their order
+and the minimum-balance rule sees every earlier posting) and commits the
+batch once. Each caller gets a future that resolves after that commit,
+so N concurrent postings cost one fsync instead of N, and sessions never
+fight each other for SQLite's write lock. Every accepted posting is also
+written to transactions in the same commit, so the ledger explains the
+balance (see reconciliation).
+"""
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+
+DB_PATH = 'database/banking.db'
+MIN_BALANCE = 1000.0
+MAX_BATCH = 256
+# How long the writer waits for more postings once it has one
+MAX_WAIT_MS = 2.0
+POSTING_TYPES = ("deposit", "withdrawal")
+
+
+def apply_posting(balance, txn_type, amount, min_balance=MIN_BALANCE):
+    """
+    New balance after a posting, or None if a withdrawal would leave less
+    than the minimum balance.
+    """
+    if txn_type == "deposit":
+        return balance + amount
+    if balance - amount >= min_balance:
+        return balance - amount
+    return None
+
+
+class _Posting:
+    __slots__ = ("customer_id", "txn_type", "amount", "future")
+
+    def __init__(self, customer_id, txn_type, amount):
+        self.customer_id = customer_id
+        self.txn_type = txn_type
+        self.amount = amount
+        self.future = Future()
+
+
+class PostingQueue:
+    """
+    Serializes balance postings through one writer thread with group
+    commits. Results are dicts: ok, balance (after the posting, or the
+    unchanged balance if rejected), message.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS,
+                 min_balance=MIN_BALANCE):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.min_balance = min_balance
+        self._queue = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.postings = 0
+        self._writer = threading.Thread(target=self._run, name="posting-writer", daemon=True)
+        self._writer.start()
+
+    def submit(self, customer_id, txn_type, amount):
+        """Queue a posting and return a Future for its result."""
+        if txn_type not in POSTING_TYPES:
+            raise ValueError(f"Unknown posting type: {txn_type}")
+        if not amount > 0:
+            raise ValueError("Posting amount must be positive")
+        if self._closed:
+            raise RuntimeError("Posting queue is closed")
+        posting = _Posting(customer_id, txn_type, float(amount))
+        self._queue.put(posting)
+        return posting.future
+
+    def post(self, customer_id, txn_type, amount, timeout=30):
+        """Submit a posting and wait until it is committed (or rejected)."""
+        return self.submit(customer_id, txn_type, amount).result(timeout)
+
+    def close(self):
+        """Finish queued postings and stop the writer."""
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def stats(self):
+        return {"batches": self.batches, "postings": self.postings,
+                "avg_batch": self.postings / self.batches if self.batches else 0.0}
+
+    def _next_batch(self):
+        """Block for one posting, then collect more for up to max_wait."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                posting = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if posting is None:
+                self._queue.put(None)
+                break
+            batch.append(posting)
+        return batch
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                try:
+                    results = self._commit_batch(conn, batch)
+                except Exception as e:
+                    for posting in batch:
+                        posting.future.set_exception(e)
+                    continue
+                self.batches += 1
+                self.postings += len(batch)
+                for posting, result in zip(batch, results):
+                    posting.future.set_result(result)
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn, batch):
+        """
+        Apply a batch in arrival order inside one transaction. Running
+        balances are kept per account, so later postings in the batch see
+        earlier ones.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            customer_ids = list(dict.fromkeys(posting.customer_id for posting in batch))
+            placeholders = ", ".join("?" for _ in customer_ids)
+            balances = dict(conn.execute(
+                f"SELECT customer_id, account_balance FROM accounts WHERE customer_id IN ({placeholders})",
+                customer_ids,
+            ))
+
+            results = []
+            touched = set()
+            ledger_rows = []
+            now = str(datetime.now().replace(microsecond=0))
+            for posting in batch:
+                balance = balances.get(posting.customer_id)
+                if balance is None:
+                    results.append({"ok": False, "balance": None, "message": "Customer ID not found"})
+                    continue
+                new_balance = apply_posting(balance, posting.txn_type, posting.amount, self.min_balance)
+                if new_balance is None:
+                    results.append({
+                        "ok": False, "balance": balance,
+                        "message": f"Insufficient balance! Minimum balance of ₹{self.min_balance:,.0f} "
+                                   f"must be maintained.",
+                    })
+                    continue
+                balances[posting.customer_id] = new_balance
+                touched.add(posting.customer_id)
+                txn_id = f"SIM{uuid.uuid4().hex[:12].upper()}"
+                ledger_rows.append((txn_id, posting.customer_id, posting.txn_type, posting.amount, now))
+                results.append({"ok": True, "balance": new_balance, "message": "", "txn_id": txn_id})
+
+            conn.executemany(
+                "UPDATE accounts SET account_balance = ?, last_updated = ? WHERE customer_id = ?",
+                [(balances[customer_id], now, customer_id) for customer_id in touched],
+            )
+            conn.executemany(
+                "INSERT INTO transactions (txn_id, customer_id, txn_type, amount, txn_time, status) "
+                "VALUES (?, ?, ?, ?, ?, 'success')", ledger_rows,
+            )
+            conn.execute("COMMIT")
+            return results
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
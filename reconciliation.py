@@ -0,0 +1,295 @@
+"""
+Ledger reconciliation.
+Every account's stored balance should equal its opening balance plus its
+signed successful transactions (deposits in, everything else out).
+reconcile() recomputes that for the whole book in a few set-based SQL
+statements and writes the accounts that disagree to ledger_mismatches.
+
+Runs are incremental from a checkpoint: sealed partitions and archived
+months cannot change, so their per-customer nets are computed once,
+added to ledger_frozen_nets and recorded in ledger_checkpoint. Each run
+then only scans the open partitions. A month is re-frozen if its row
+count no longer matches the checkpoint; run with full=True after
+maintenance done under txn_partitions.unsealed().
+
+The seed data has no opening balances, so the first run takes each
+account's balance at that moment as the baseline (opening = balance -
+net so far); the same happens for accounts created later.
+
+Run from the project root, e.g.:
+    python reconciliation.py
+    python reconciliation.py --full
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from txn_archive import archive_dir_for, ensure_archive_catalog
+from txn_partitions import list_partitions
+
+DB_PATH = 'database/banking.db'
+# Differences below half a paisa are rounding, not mismatches
+TOLERANCE = 0.005
+SIGNED_AMOUNT = "CASE WHEN txn_type = 'deposit' THEN amount ELSE -amount END"
+
+LEDGER_SCHEMAS = [
+    '''
+CREATE TABLE IF NOT EXISTS ledger_openings (
+    customer_id TEXT PRIMARY KEY,
+    opening_balance REAL NOT NULL,
+    established_at TEXT NOT NULL
+)
+''',
+    # Per-customer net of one frozen month, kept so a month can be re-frozen
+    '''
+CREATE TABLE IF NOT EXISTS ledger_month_nets (
+    month INTEGER NOT NULL,
+    customer_id TEXT NOT NULL,
+    net REAL NOT NULL,
+    PRIMARY KEY (month, customer_id)
+)
+''',
+    '''
+CREATE TABLE IF NOT EXISTS ledger_frozen_nets (
+    customer_id TEXT PRIMARY KEY,
+    net REAL NOT NULL
+)
+''',
+    '''
+CREATE TABLE IF NOT EXISTS ledger_checkpoint (
+    month INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    frozen_at TEXT NOT NULL
+)
+''',
+    '''
+CREATE TABLE IF NOT EXISTS ledger_mismatches (
+    customer_id TEXT PRIMARY KEY,
+    stored_balance REAL,
+    expected_balance REAL,
+    difference REAL,
+    run_id INTEGER NOT NULL
+)
+''',
+    '''
+CREATE TABLE IF NOT EXISTS ledger_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    months_frozen INTEGER NOT NULL,
+    open_rows INTEGER NOT NULL,
+    accounts INTEGER NOT NULL,
+    mismatches INTEGER NOT NULL,
+    seconds REAL NOT NULL
+)
+''',
+]
+
+
+def ensure_ledger_tables(conn):
+    for statement in LEDGER_SCHEMAS:
+        conn.execute(statement)
+    ensure_archive_catalog(conn)
+    conn.commit()
+
+
+def _frozen_sources(conn):
+    """Months that can no longer change: {month: (source, row_count)}."""
+    sources = {month: ("archive", row_count) for month, row_count in conn.execute(
+        "SELECT month, row_count FROM transaction_archive"
+    )}
+    for month, table_name, sealed in list_partitions(conn):
+        if month and sealed:
+            row_count = conn.execute(
+                "SELECT row_count FROM transaction_partitions WHERE month = ?", (month,)
+            ).fetchone()[0]
+            sources[month] = (table_name, row_count)
+    return sources
+
+
+def _month_nets(conn, month, source):
+    """Per-customer signed net of one frozen month as a DataFrame."""
+    if source != "archive":
+        return pd.read_sql_query(
+            f"SELECT customer_id, SUM({SIGNED_AMOUNT}) AS net FROM {source} "
+            "WHERE status = 'success' GROUP BY customer_id", conn
+        )
+    import pyarrow.parquet as pq
+
+    file_name = conn.execute("SELECT file_name FROM transaction_archive WHERE month = ?",
+                             (month,)).fetchone()[0]
+    df = pq.read_table(os.path.join(archive_dir_for(conn), file_name),
+                       columns=["customer_id", "txn_type", "amount", "status"]).to_pandas()
+    df = df[df["status"] == "success"]
+    signed = df["amount"].where(df["txn_type"] == "deposit", -df["amount"])
+    return signed.groupby(df["customer_id"]).sum().rename("net").reset_index()
+
+
+def _adjust_frozen(conn, month, sign):
+    """Add (sign=1) or remove (sign=-1) one month's nets from the frozen totals."""
+    conn.execute(f'''
+    INSERT INTO ledger_frozen_nets (customer_id, net)
+    SELECT customer_id, {sign} * net FROM ledger_month_nets WHERE month = ? AND true
+    ON CONFLICT(customer_id) DO UPDATE SET net = net + excluded.net
+    ''', (month,))
+
+
+def advance_checkpoint(conn, full=False):
+    """
+    Freeze every sealed or archived month not yet in the checkpoint (or
+    whose row count changed). Returns the number of months (re)frozen.
+    """
+    if full:
+        for statement in ("DELETE FROM ledger_month_nets", "DELETE FROM ledger_frozen_nets",
+                          "DELETE FROM ledger_checkpoint"):
+            conn.execute(statement)
+    checkpoint = {month: row_count for month, row_count in conn.execute(
+        "SELECT month, row_count FROM ledger_checkpoint"
+    )}
+    sources = _frozen_sources(conn)
+    frozen = 0
+    now = datetime.now().isoformat(timespec='seconds')
+
+    for month in sorted(set(checkpoint) - set(sources)):
+        # Neither sealed nor archived any more (e.g. reloaded): back to open
+        _adjust_frozen(conn, month, -1)
+        conn.execute("DELETE FROM ledger_month_nets WHERE month = ?", (month,))
+        conn.execute("DELETE FROM ledger_checkpoint WHERE month = ?", (month,))
+
+    for month, (source, row_count) in sorted(sources.items()):
+        if checkpoint.get(month) == row_count:
+            # Archiving a sealed month moves it without changing it
+            conn.execute("UPDATE ledger_checkpoint SET source = ? WHERE month = ?", (source, month))
+            continue
+        if month in checkpoint:
+            _adjust_frozen(conn, month, -1)
+            conn.execute("DELETE FROM ledger_month_nets WHERE month = ?", (month,))
+        nets = _month_nets(conn, month, source)
+        conn.executemany(
+            "INSERT INTO ledger_month_nets (month, customer_id, net) VALUES (?, ?, ?)",
+            [(month, customer_id, float(net)) for customer_id, net in zip(nets["customer_id"], nets["net"])],
+        )
+        _adjust_frozen(conn, month, 1)
+        conn.execute("INSERT OR REPLACE INTO ledger_checkpoint VALUES (?, ?, ?, ?)",
+                      (month, source, row_count, now))
+        frozen += 1
+    return frozen
+
+
+def _open_nets(conn):
+    """
+    Per-customer nets of the partitions that can still change, into
+    temp.open_nets. Returns the number of transactions scanned.
+    """
+    tables = [table_name for _, table_name, sealed in list_partitions(conn) if not sealed]
+    conn.execute("DROP TABLE IF EXISTS temp.open_nets")
+    conn.execute("CREATE TEMP TABLE open_nets (customer_id TEXT PRIMARY KEY, net REAL NOT NULL)")
+    if not tables:
+        return 0
+    union = "\nUNION ALL\n".join(
+        f"SELECT customer_id, txn_type, amount FROM {table_name} WHERE status = 'success'"
+        for table_name in tables
+    )
+    conn.execute(f"INSERT INTO temp.open_nets SELECT customer_id, SUM({SIGNED_AMOUNT}) "
+                 f"FROM ({union}) GROUP BY customer_id")
+    return conn.execute(f"SELECT COUNT(*) FROM ({union})").fetchone()[0]
+
+
+def reconcile(conn, full=False, tolerance=TOLERANCE):
+    """
+    Reconcile every account against the ledger and refresh
+    ledger_mismatches. Returns the run's summary as a dict.
+    """
+    start = time.perf_counter()
+    ensure_ledger_tables(conn)
+    try:
+        # 1. Freeze months that became read-only since the last run
+        frozen = advance_checkpoint(conn, full)
+
+        # 2. Nets of the months that can still change
+        open_rows = _open_nets(conn)
+
+        # 3. Baseline accounts that have no opening balance yet
+        nets_join = '''
+        LEFT JOIN ledger_frozen_nets f ON f.customer_id = a.customer_id
+        LEFT JOIN temp.open_nets o ON o.customer_id = a.customer_id
+        '''
+        net_sql = "COALESCE(f.net, 0) + COALESCE(o.net, 0)"
+        conn.execute(f'''
+        INSERT INTO ledger_openings (customer_id, opening_balance, established_at)
+        SELECT a.customer_id, a.account_balance - ({net_sql}), ?
+        FROM accounts a {nets_join}
+        WHERE a.account_balance IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM ledger_openings l WHERE l.customer_id = a.customer_id)
+        ''', (datetime.now().isoformat(timespec='seconds'),))
+
+        # 4. Compare stored and expected balances for the whole book
+        run_id = conn.execute(
+            "INSERT INTO ledger_runs (run_at, mode, months_frozen, open_rows, accounts, mismatches, seconds) "
+            "VALUES (?, ?, ?, ?, 0, 0, 0)",
+            (datetime.now().isoformat(timespec='seconds'), "full" if full else "incremental", frozen, open_rows),
+        ).lastrowid
+        conn.execute("DELETE FROM ledger_mismatches")
+        conn.execute(f'''
+        INSERT INTO ledger_mismatches (customer_id, stored_balance, expected_balance, difference, run_id)
+        SELECT customer_id, stored, ROUND(expected, 2), ROUND(stored - expected, 2), ?
+        FROM (
+            SELECT a.customer_id, a.account_balance AS stored,
+                   l.opening_balance + {net_sql} AS expected
+            FROM accounts a JOIN ledger_openings l ON l.customer_id = a.customer_id {nets_join}
+        )
+        WHERE stored IS NULL OR ABS(stored - expected) > ?
+        ''', (run_id, tolerance))
+
+        accounts = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        mismatches = conn.execute("SELECT COUNT(*) FROM ledger_mismatches").fetchone()[0]
+        seconds = time.perf_counter() - start
+        conn.execute("UPDATE ledger_runs SET accounts = ?, mismatches = ?, seconds = ? WHERE run_id = ?",
+                     (accounts, mismatches, seconds, run_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.open_nets")
+
+    return {"run_id": run_id, "months_frozen": frozen, "open_rows": open_rows,
+            "accounts": accounts, "mismatches": mismatches, "seconds": seconds}
+
+
+def mismatch_report(conn, limit=None):
+    """Current mismatches, largest differences first."""
+    sql = "SELECT * FROM ledger_mismatches ORDER BY ABS(difference) DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return pd.read_sql_query(sql, conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile account balances against the transaction ledger")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--full", action="store_true", help="recompute every month, ignoring the checkpoint")
+    parser.add_argument("--top", type=int, default=20, help="mismatches to print")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        result = reconcile(conn, full=args.full)
+        print(f"✓ Reconciled {result['accounts']:,} accounts in {result['seconds'] * 1000:,.0f} ms "
+              f"({result['months_frozen']} months frozen, {result['open_rows']:,} open transactions scanned)")
+        if result["mismatches"]:
+            print(f"⚠️ {result['mismatches']:,} mismatches:")
+            print(mismatch_report(conn, args.top).to_string(index=False))
+        else:
+            print("✅ Every balance matches the ledger")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
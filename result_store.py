@@ -0,0 +1,151 @@
+"""
+Per-session result store.
+Keeps query results across Streamlit reruns so widget interactions
+(chart type, pagination, filters) re-render from memory instead of
+re-running the query. Entries are keyed by query and parameters, tagged
+with the data version they were read at, and evicted least recently used
+once the session's memory budget is exceeded.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_KEY = "result_store"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 32
+
+
+def frame_nbytes(df):
+    """Approximate memory held by a frame."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def data_version(conn):
+    """
+    Cheap token that changes whenever the database changes.
+    PRAGMA data_version moves on commits from other connections and
+    total_changes on writes through this (shared) connection.
+    """
+    return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+
+def database_fingerprint(db_path):
+    """
+    Version token for a database file that is comparable across processes
+    and connections: the header's file change counter plus the size and
+    mtime of the database and its WAL (commits in WAL mode only touch
+    the WAL until a checkpoint).
+    """
+    with open(db_path, "rb") as f:
+        header = f.read(28)
+    change_counter = int.from_bytes(header[24:28], "big") if len(header) == 28 else 0
+
+    parts = [str(change_counter)]
+    for path in (db_path, db_path + "-wal"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return "-".join(parts)
+
+
+class ResultStore:
+    """
+    LRU store of DataFrames with an entry-count and byte budget.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(namespace, *parts, **params):
+        """Build a hashable key from a namespace, positional parts and params."""
+        return (namespace, parts, tuple(sorted((k, repr(v)) for k, v in params.items())))
+
+    def get(self, key, version=None):
+        """
+        Return the cached entry dict (df, meta, version, stored_at) or None.
+        Entries read at a different data version count as a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (version is not None and entry["version"] != version):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, df, version=None, **meta):
+        """
+        Store a result. Frames larger than a quarter of the budget are not
+        cached so one huge result cannot flush the whole session.
+        """
+        nbytes = frame_nbytes(df)
+        if nbytes > self.max_bytes // 4:
+            return False
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = {
+                "df": df,
+                "meta": meta,
+                "version": version,
+                "nbytes": nbytes,
+                "stored_at": time.time(),
+            }
+            self.total_bytes += nbytes
+            while self._entries and (
+                self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+        return True
+
+    def get_or_compute(self, key, compute, version=None, **meta):
+        """
+        Return (df, from_cache), running compute() only on a miss.
+        """
+        entry = self.get(key, version)
+        if entry is not None:
+            return entry["df"], True
+        df = compute()
+        self.put(key, df, version, **meta)
+        return df, False
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry["nbytes"]
+
+    def invalidate(self, namespace=None):
+        """Drop every entry, or only those in one namespace."""
+        with self._lock:
+            for key in list(self._entries):
+                if namespace is None or key[0] == namespace:
+                    self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def get_result_store(session_state, **kwargs):
+    """
+    Return the ResultStore for a Streamlit session, creating it on first use.
+    """
+    if SESSION_KEY not in session_state:
+        session_state[SESSION_KEY] = ResultStore(**kwargs)
+    return session_state[SESSION_KEY]
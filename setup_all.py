@@ -1,50 +1,192 @@
 """
-Complete setup script - runs all setup steps
+Complete setup script - runs all setup steps as a pipeline.
+Each of the seven datasets is a generate -> load pair: generation runs in
+parallel processes, loads prepare their frames in parallel threads and
+take turns writing to SQLite, and a final stage builds the indexes,
+triggers and branch roll-ups. Stages whose inputs (seed, scale, as-of
+date, code and input file contents) are unchanged are skipped, or their
+files restored from .pipeline_cache.
+
+Usage:
+    python setup_all.py [--seed 42] [--scale 1] [--workers 4] [--force]
 """
+import argparse
+import importlib
 import os
-import subprocess
+import sqlite3
 import sys
+import threading
+from datetime import date, datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+from customer_keys import build_customer_keys
+from pipeline import CACHE_DIR, Pipeline, Stage, StageCache
+
+data_preparation = importlib.import_module('1_data_preparation')
+database_setup = importlib.import_module('2_database_setup')
+
+GENERATE_CODE = [os.path.join(SCRIPT_DIR, '1_data_preparation.py')]
+LOAD_CODE = [os.path.join(SCRIPT_DIR, name) for name in
+             ('2_database_setup.py', 'customer_keys.py', 'branch_dimension.py',
+              'typed_columns.py', 'txn_partitions.py', 'change_log.py',
+              'customer_segments.py', 'ticket_sla.py', 'approx_analytics.py', 'txn_archive.py')]
+
+# Loads prepare in parallel but SQLite takes one writer at a time
+_write_lock = threading.Lock()
+
+
+class DatabaseState:
+    """
+    Stage keys of the loads applied to a database, kept inside the
+    database itself so a deleted or replaced file forces a reload.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def get(self, stage_name):
+        if not os.path.exists(self.db_path):
+            return None
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT stage_key FROM pipeline_state WHERE stage = ?", (stage_name,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def set(self, stage_name, key):
+        with _write_lock:
+            conn = sqlite3.connect(self.db_path, timeout=60)
+            try:
+                conn.execute("CREATE TABLE IF NOT EXISTS pipeline_state "
+                             "(stage TEXT PRIMARY KEY, stage_key TEXT)")
+                conn.execute("INSERT OR REPLACE INTO pipeline_state VALUES (?, ?)", (stage_name, key))
+                conn.commit()
+            finally:
+                conn.close()
+
+
+def generate_stage(dataset, data_dir, seed, scale, as_of):
+    """Generate one dataset file."""
+    os.makedirs(data_dir, exist_ok=True)
+    generate, _ = data_preparation.DATASETS[dataset]
+    generate(data_dir, seed, scale, datetime.combine(as_of, datetime.min.time()))
+
+
+def load_stage(table_name, db_path, data_dir):
+    """Rebuild one table from its dataset."""
+    customer_keys_df = build_customer_keys(database_setup.read_dataset('customers', data_dir))
+    branches_df = database_setup.read_dataset('branches', data_dir)
+    df = database_setup.prepare_table(table_name, customer_keys_df, branches_df, data_dir)
+
+    with _write_lock:
+        conn = sqlite3.connect(db_path, timeout=60)
+        try:
+            database_setup.create_table(conn.cursor(), table_name)
+            database_setup.load_table(conn, table_name, df)
+            conn.commit()
+        finally:
+            conn.close()
+    return f"{len(df):,} rows"
+
 
-def run_script(script_path, description):
-    """Run a Python script and report results"""
-    print(f"\n{'='*60}")
-    print(f"Running: {description}")
-    print(f"{'='*60}\n")
-    
+def finalize_stage(db_path):
+    """Indexes, triggers and roll-ups over the loaded tables."""
+    with _write_lock:
+        conn = sqlite3.connect(db_path, timeout=60)
+        try:
+            database_setup.finalize_database(conn)
+        finally:
+            conn.close()
+
+
+def snapshot_stage(db_path, parquet_dir):
+    """Refresh the Parquet snapshot read by the DuckDB analytics backend."""
+    from backends import export_parquet_snapshot
+
+    conn = sqlite3.connect(db_path)
     try:
-        result = subprocess.run([sys.executable, script_path], 
-                              capture_output=False, 
-                              text=True)
-        if result.returncode == 0:
-            print(f"\n✅ {description} completed successfully!")
-            return True
-        else:
-            print(f"\n❌ {description} failed!")
-            return False
-    except Exception as e:
-        print(f"\n❌ Error running {description}: {e}")
-        return False
+        export_parquet_snapshot(conn, parquet_dir)
+    finally:
+        conn.close()
+
+
+def build_stages(data_dir, db_path, seed, scale, as_of, parquet_dir=None):
+    """
+    generate:<dataset> -> load:<table> for every dataset, then finalize.
+    Every load also reads customers (customer keys) and branches (branch ids).
+    """
+    state = DatabaseState(db_path)
+    stages = []
+
+    for dataset, (_, file_name) in data_preparation.DATASETS.items():
+        stages.append(Stage(
+            f"generate:{dataset}", generate_stage,
+            args=(dataset, data_dir, seed, scale, as_of),
+            params={'seed': seed, 'scale': scale, 'as_of': as_of.isoformat()},
+            code=GENERATE_CODE,
+            outputs=[os.path.join(data_dir, file_name)],
+            pool='process',
+        ))
+
+    shared = ['generate:customers', 'generate:branches']
+    for table_name in ['customer_keys'] + list(database_setup.DATA_FILES):
+        deps = list(dict.fromkeys(shared + ([f"generate:{table_name}"] if table_name != 'customer_keys' else [])))
+        stages.append(Stage(
+            f"load:{table_name}", load_stage,
+            args=(table_name, db_path, data_dir),
+            deps=deps, code=LOAD_CODE, state=state,
+        ))
+
+    load_names = [stage.name for stage in stages if stage.name.startswith('load:')]
+    stages.append(Stage("finalize", finalize_stage, args=(db_path,),
+                        deps=load_names, code=LOAD_CODE, state=state))
+
+    if parquet_dir:
+        stages.append(Stage("snapshot", snapshot_stage, args=(db_path, parquet_dir),
+                            deps=["finalize"], params={'parquet_dir': parquet_dir}, state=state))
+    return stages
+
 
 def main():
+    parser = argparse.ArgumentParser(description="BankSight complete setup")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the generated data")
+    parser.add_argument("--scale", type=int, default=1, help="multiply every dataset's size")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(),
+                        help="date the generated history ends at (YYYY-MM-DD)")
+    parser.add_argument("--data-dir", default=data_preparation.DATA_DIR)
+    parser.add_argument("--db", default=database_setup.DB_PATH)
+    parser.add_argument("--snapshot", action="store_true",
+                        help="also refresh the Parquet snapshot (default: only if one exists)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="ignore the stage cache")
+    args = parser.parse_args()
+
     print("🏦 BankSight Complete Setup")
     print("="*60)
-    
-    # Check if scripts directory exists
-    if not os.path.exists('scripts'):
-        print("❌ 'scripts' folder not found!")
-        print("Please make sure you're in the correct directory.")
-        return
-    
-    # Step 1: Data Preparation
-    if not run_script('scripts/1_data_preparation.py', 'Data Generation'):
-        print("\n⚠️ Setup stopped due to error in data generation")
-        return
-    
-    # Step 2: Database Setup
-    if not run_script('scripts/2_database_setup.py', 'Database Setup'):
-        print("\n⚠️ Setup stopped due to error in database setup")
-        return
-    
+    print(f"seed={args.seed} scale={args.scale} as_of={args.as_of}\n")
+
+    from backends import PARQUET_DIR
+    parquet_dir = PARQUET_DIR if args.snapshot or os.path.isdir(PARQUET_DIR) else None
+
+    os.makedirs(os.path.dirname(args.db) or '.', exist_ok=True)
+    stages = build_stages(args.data_dir, args.db, args.seed, args.scale, args.as_of, parquet_dir)
+    pipeline = Pipeline(stages, StageCache(CACHE_DIR), workers=args.workers, force=args.force)
+
+    try:
+        pipeline.run()
+    except Exception:
+        print("\n⚠️ Setup stopped due to a failed stage")
+        pipeline.print_timings()
+        sys.exit(1)
+
+    pipeline.print_timings()
+
     print("\n" + "="*60)
     print("🎉 SETUP COMPLETE!")
     print("="*60)
@@ -4,24 +4,34 @@ Each query is a function that returns the SQL string and description.
 """
 import pandas as pd
 import sqlite3
+from arrow_results import arrow_to_frame
+from approx_analytics import run_approximate
+from backends import SQLiteBackend, query_for_backend
+from index_advisor import captured
+from txn_archive import read_with_archive
 
 def get_all_queries():
     """
     Returns a dictionary of all analytical queries.
+    Queries tagged with workload "olap" scan transactions and are routed to
+    the analytics backend when one is configured; "<dialect>_query" holds
+    the SQL for backends whose dialect differs from SQLite.
+    "approximate" names an approx_analytics estimator for the same question.
     """
     
     queries = {
         "Q1: Customers per City with Avg Balance": {
             "description": "How many customers exist per city, and what is their average account balance?",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     c.city,
-                    COUNT(c.customer_id) as total_customers,
+                    COUNT(c.customer_key) as total_customers,
                     ROUND(AVG(a.account_balance), 2) as avg_balance,
                     ROUND(MIN(a.account_balance), 2) as min_balance,
                     ROUND(MAX(a.account_balance), 2) as max_balance
                 FROM customers c
-                JOIN accounts a ON c.customer_id = a.customer_id
+                JOIN accounts a ON c.customer_key = a.customer_key
                 GROUP BY c.city
                 ORDER BY total_customers DESC
             """
@@ -29,14 +39,15 @@ def get_all_queries():
         
         "Q2: Account Type with Highest Total Balance": {
             "description": "Which account type holds the highest total balance?",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     c.account_type,
-                    COUNT(c.customer_id) as total_accounts,
+                    COUNT(c.customer_key) as total_accounts,
                     ROUND(SUM(a.account_balance), 2) as total_balance,
                     ROUND(AVG(a.account_balance), 2) as avg_balance
                 FROM customers c
-                JOIN accounts a ON c.customer_id = a.customer_id
+                JOIN accounts a ON c.customer_key = a.customer_key
                 GROUP BY c.account_type
                 ORDER BY total_balance DESC
             """
@@ -44,6 +55,7 @@ def get_all_queries():
         
         "Q3: Top 10 Customers by Balance": {
             "description": "Who are the top 10 customers by total account balance?",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     c.customer_id,
@@ -52,7 +64,7 @@ def get_all_queries():
                     c.account_type,
                     ROUND(a.account_balance, 2) as balance
                 FROM customers c
-                JOIN accounts a ON c.customer_id = a.customer_id
+                JOIN accounts a ON c.customer_key = a.customer_key
                 ORDER BY a.account_balance DESC
                 LIMIT 10
             """
@@ -60,6 +72,7 @@ def get_all_queries():
         
         "Q4: 2023 Customers with Balance > 100K": {
             "description": "Which customers opened accounts in 2023 with balance above ₹1,00,000?",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     c.customer_id,
@@ -68,8 +81,23 @@ def get_all_queries():
                     c.join_date,
                     ROUND(a.account_balance, 2) as balance
                 FROM customers c
-                JOIN accounts a ON c.customer_id = a.customer_id
-                WHERE strftime('%Y', c.join_date) = '2023'
+                JOIN accounts a ON c.customer_key = a.customer_key
+                WHERE c.join_day >= CAST(julianday('2023-01-01') - 2440587.5 AS INTEGER)
+                AND c.join_day < CAST(julianday('2024-01-01') - 2440587.5 AS INTEGER)
+                AND a.account_balance > 100000
+                ORDER BY a.account_balance DESC
+            """,
+            "duckdb_query": """
+                SELECT 
+                    c.customer_id,
+                    c.name,
+                    c.city,
+                    c.join_date,
+                    ROUND(a.account_balance, 2) as balance
+                FROM customers c
+                JOIN accounts a ON c.customer_key = a.customer_key
+                WHERE c.join_day >= DATE '2023-01-01' - DATE '1970-01-01'
+                AND c.join_day < DATE '2024-01-01' - DATE '1970-01-01'
                 AND a.account_balance > 100000
                 ORDER BY a.account_balance DESC
             """
@@ -77,6 +105,8 @@ def get_all_queries():
         
         "Q5: Transaction Volume by Type": {
             "description": "What is the total transaction volume by transaction type?",
+            "workload": "olap",
+            "approximate": "transaction_volume",
             "query": """
                 SELECT 
                     txn_type,
@@ -93,17 +123,32 @@ def get_all_queries():
         
         "Q6: Accounts with 3+ Failed Transactions": {
             "description": "Which accounts have more than 3 failed transactions in a single month?",
+            "workload": "olap",
             "query": """
                 SELECT 
                     t.customer_id,
                     c.name,
-                    strftime('%Y-%m', t.txn_time) as month,
+                    printf('%d-%02d', t.txn_month / 100, t.txn_month % 100) as month,
+                    COUNT(*) as failed_count,
+                    ROUND(SUM(t.amount), 2) as total_failed_amount
+                FROM transactions t
+                JOIN customers c ON t.customer_key = c.customer_key
+                WHERE t.status = 'failed'
+                GROUP BY t.customer_key, t.customer_id, c.name, t.txn_month
+                HAVING COUNT(*) > 3
+                ORDER BY failed_count DESC
+            """,
+            "duckdb_query": """
+                SELECT 
+                    t.customer_id,
+                    c.name,
+                    printf('%d-%02d', t.txn_month // 100, t.txn_month % 100) as month,
                     COUNT(*) as failed_count,
                     ROUND(SUM(t.amount), 2) as total_failed_amount
                 FROM transactions t
-                JOIN customers c ON t.customer_id = c.customer_id
+                JOIN customers c ON t.customer_key = c.customer_key
                 WHERE t.status = 'failed'
-                GROUP BY t.customer_id, strftime('%Y-%m', t.txn_time)
+                GROUP BY t.customer_key, t.customer_id, c.name, t.txn_month
                 HAVING COUNT(*) > 3
                 ORDER BY failed_count DESC
             """
@@ -111,6 +156,8 @@ def get_all_queries():
         
         "Q7: Top 5 Branches by Transaction Volume (6 months)": {
             "description": "Top 5 branches by total transaction volume in the last 6 months",
+            "workload": "lookup",
+            "approximate": "branch_loans",
             "query": """
                 SELECT 
                     b.Branch_Name,
@@ -119,9 +166,23 @@ def get_all_queries():
                     COUNT(l.Loan_ID) as total_loans,
                     ROUND(SUM(l.Loan_Amount), 2) as total_loan_volume
                 FROM branches b
-                LEFT JOIN loans l ON b.City = l.Branch
-                WHERE l.Start_Date >= date('now', '-6 months')
-                GROUP BY b.Branch_Name, b.City
+                JOIN loans l ON l.branch_id = b.Branch_ID
+                WHERE l.start_day >= CAST(julianday('now', '-6 months', 'start of day') - 2440587.5 AS INTEGER)
+                GROUP BY b.Branch_ID, b.Branch_Name, b.City
+                ORDER BY total_loan_volume DESC
+                LIMIT 5
+            """,
+            "duckdb_query": """
+                SELECT 
+                    b.Branch_Name,
+                    b.City,
+                    COUNT(DISTINCT l.Customer_ID) as total_customers,
+                    COUNT(l.Loan_ID) as total_loans,
+                    ROUND(SUM(l.Loan_Amount), 2) as total_loan_volume
+                FROM branches b
+                JOIN loans l ON l.branch_id = b.Branch_ID
+                WHERE l.start_day >= CAST(current_date - INTERVAL 6 MONTH AS DATE) - DATE '1970-01-01'
+                GROUP BY b.Branch_ID, b.Branch_Name, b.City
                 ORDER BY total_loan_volume DESC
                 LIMIT 5
             """
@@ -129,6 +190,8 @@ def get_all_queries():
         
         "Q8: Accounts with 5+ High-Value Transactions": {
             "description": "Which accounts have 5 or more transactions above ₹2,00,000?",
+            "workload": "olap",
+            "approximate": "high_value_accounts",
             "query": """
                 SELECT 
                     t.customer_id,
@@ -138,9 +201,9 @@ def get_all_queries():
                     ROUND(SUM(t.amount), 2) as total_high_value_amount,
                     ROUND(AVG(t.amount), 2) as avg_high_value_amount
                 FROM transactions t
-                JOIN customers c ON t.customer_id = c.customer_id
+                JOIN customers c ON t.customer_key = c.customer_key
                 WHERE t.amount > 200000
-                GROUP BY t.customer_id
+                GROUP BY t.customer_key, t.customer_id, c.name, c.city
                 HAVING COUNT(*) >= 5
                 ORDER BY high_value_txn_count DESC
             """
@@ -148,6 +211,7 @@ def get_all_queries():
         
         "Q9: Loan Analysis by Type": {
             "description": "Average loan amount and interest rate by loan type",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     Loan_Type,
@@ -164,15 +228,18 @@ def get_all_queries():
         
         "Q10: Customers with Multiple Active Loans": {
             "description": "Customers with more than one active or approved loan",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     l.Customer_ID,
+                    c.name,
                     COUNT(*) as total_active_loans,
                     ROUND(SUM(l.Loan_Amount), 2) as total_loan_amount,
                     GROUP_CONCAT(l.Loan_Type, ', ') as loan_types
                 FROM loans l
+                LEFT JOIN customers c ON l.customer_key = c.customer_key
                 WHERE l.Loan_Status IN ('Active', 'Approved')
-                GROUP BY l.Customer_ID
+                GROUP BY l.customer_key, l.Customer_ID, c.name
                 HAVING COUNT(*) > 1
                 ORDER BY total_active_loans DESC
             """
@@ -180,67 +247,75 @@ def get_all_queries():
         
         "Q11: Top 5 Outstanding Loan Amounts": {
             "description": "Top 5 customers with highest outstanding (non-closed) loan amounts",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     l.Customer_ID,
+                    c.name,
                     COUNT(*) as total_loans,
                     ROUND(SUM(l.Loan_Amount), 2) as total_outstanding,
-                    GROUP_CONCAT(DISTINCT l.Loan_Type, ', ') as loan_types,
-                    GROUP_CONCAT(DISTINCT l.Loan_Status, ', ') as statuses
+                    GROUP_CONCAT(DISTINCT l.Loan_Type) as loan_types,
+                    GROUP_CONCAT(DISTINCT l.Loan_Status) as statuses
                 FROM loans l
+                LEFT JOIN customers c ON l.customer_key = c.customer_key
                 WHERE l.Loan_Status != 'Closed'
-                GROUP BY l.Customer_ID
+                GROUP BY l.customer_key, l.Customer_ID, c.name
                 ORDER BY total_outstanding DESC
                 LIMIT 5
             """
         },
         
         "Q12: Branch with Highest Account Balance": {
-            "description": "Which branch city holds the highest total account balance?",
+            "description": "Which branch holds the highest total account balance of its home customers?",
+            "workload": "lookup",
             "query": """
                 SELECT 
-                    c.city as branch_city,
-                    COUNT(DISTINCT c.customer_id) as total_customers,
-                    ROUND(SUM(a.account_balance), 2) as total_balance,
-                    ROUND(AVG(a.account_balance), 2) as avg_balance
-                FROM customers c
-                JOIN accounts a ON c.customer_id = a.customer_id
-                GROUP BY c.city
-                ORDER BY total_balance DESC
+                    b.Branch_Name,
+                    b.City,
+                    s.total_customers,
+                    ROUND(s.total_balance, 2) as total_balance,
+                    ROUND(s.total_balance / NULLIF(s.total_customers, 0), 2) as avg_balance
+                FROM branch_summary s
+                JOIN branches b ON b.Branch_ID = s.branch_id
+                ORDER BY s.total_balance DESC
             """
         },
         
         "Q13: Branch Performance Summary": {
             "description": "Branch performance showing customers, loans, and revenue",
+            "workload": "lookup",
+            "approximate": "branch_performance",
             "query": """
                 SELECT 
                     b.Branch_Name,
                     b.City,
                     b.Manager_Name,
                     b.Total_Employees,
-                    COUNT(DISTINCT l.Customer_ID) as total_loan_customers,
-                    COUNT(l.Loan_ID) as total_loans,
-                    ROUND(SUM(l.Loan_Amount), 2) as total_loan_amount,
+                    s.total_loan_customers,
+                    s.total_loans,
+                    ROUND(s.total_loan_amount, 2) as total_loan_amount,
+                    s.total_cards,
+                    s.open_tickets,
                     ROUND(b.Branch_Revenue, 2) as branch_revenue,
                     b.Performance_Rating
                 FROM branches b
-                LEFT JOIN loans l ON b.City = l.Branch
-                GROUP BY b.Branch_Name
+                JOIN branch_summary s ON s.branch_id = b.Branch_ID
                 ORDER BY b.Performance_Rating DESC, branch_revenue DESC
             """
         },
         
         "Q14: Support Tickets Resolution Time": {
             "description": "Issue categories with longest average resolution time",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     Issue_Category,
                     COUNT(*) as total_tickets,
                     COUNT(CASE WHEN Status IN ('Resolved', 'Closed') THEN 1 END) as resolved_tickets,
-                    ROUND(AVG(JULIANDAY(Date_Closed) - JULIANDAY(Date_Opened)), 2) as avg_resolution_days,
-                    ROUND(AVG(CAST(Customer_Rating AS REAL)), 2) as avg_customer_rating
+                    ROUND(AVG(closed_day - opened_day), 2) as avg_resolution_days,
+                    ROUND(AVG(Customer_Rating), 2) as avg_customer_rating
                 FROM support_tickets
-                WHERE Date_Closed IS NOT NULL AND Date_Closed != ''
+                WHERE closed_day IS NOT NULL
                 GROUP BY Issue_Category
                 ORDER BY avg_resolution_days DESC
             """
@@ -248,15 +323,16 @@ def get_all_queries():
         
         "Q15: Top Support Agents by Critical Tickets": {
             "description": "Support agents with most critical tickets resolved and high ratings",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     Support_Agent,
                     COUNT(*) as total_tickets_handled,
                     COUNT(CASE WHEN Priority = 'Critical' THEN 1 END) as critical_tickets,
                     COUNT(CASE WHEN Status IN ('Resolved', 'Closed') THEN 1 END) as resolved_tickets,
-                    ROUND(AVG(CAST(Customer_Rating AS REAL)), 2) as avg_rating
+                    ROUND(AVG(Customer_Rating), 2) as avg_rating
                 FROM support_tickets
-                WHERE Customer_Rating != '' AND CAST(Customer_Rating AS INTEGER) >= 4
+                WHERE Customer_Rating >= 4
                 GROUP BY Support_Agent
                 HAVING critical_tickets > 0
                 ORDER BY critical_tickets DESC, avg_rating DESC
@@ -266,6 +342,7 @@ def get_all_queries():
         
         "Q16: Potential Fraud Detection": {
             "description": "Transactions flagged as potential fraud or unusual patterns",
+            "workload": "olap",
             "query": """
                 SELECT 
                     t.txn_id,
@@ -282,7 +359,7 @@ def get_all_queries():
                         ELSE 'Normal'
                     END as risk_flag
                 FROM transactions t
-                JOIN customers c ON t.customer_id = c.customer_id
+                JOIN customers c ON t.customer_key = c.customer_key
                 WHERE t.txn_type = 'online fraud' 
                    OR t.amount > 200000 
                    OR (t.status = 'failed' AND t.amount > 100000)
@@ -292,6 +369,7 @@ def get_all_queries():
         
         "Q17: Credit Card Utilization Analysis": {
             "description": "Credit card utilization rates and potential over-limit cards",
+            "workload": "lookup",
             "query": """
                 SELECT 
                     cc.Card_ID,
@@ -313,23 +391,89 @@ def get_all_queries():
                 ORDER BY utilization_percentage DESC
                 LIMIT 20
             """
+        },
+        
+        "Q18: Customer Segments (RFM)": {
+            "description": "How are customers spread over RFM segments, and what do they hold?",
+            "workload": "lookup",
+            "query": """
+                SELECT 
+                    s.segment,
+                    COUNT(*) as total_customers,
+                    ROUND(AVG(s.recency_days), 1) as avg_recency_days,
+                    ROUND(AVG(s.frequency), 1) as avg_transactions,
+                    ROUND(AVG(s.monetary), 2) as avg_monetary,
+                    ROUND(AVG(a.account_balance), 2) as avg_balance,
+                    SUM(s.active_loans > 0) as with_active_loans,
+                    SUM(s.active_cards > 0) as with_active_cards,
+                    MAX(s.refreshed_at) as refreshed_at
+                FROM customer_segments s
+                JOIN accounts a ON s.customer_key = a.customer_key
+                GROUP BY s.segment
+                ORDER BY total_customers DESC
+            """
+        },
+        
+        "Q19: Open Ticket Backlog by Priority": {
+            "description": "Open tickets, SLA breaches and oldest open ticket per priority",
+            "workload": "lookup",
+            "query": """
+                SELECT 
+                    c.value as Priority,
+                    c.open_tickets,
+                    COUNT(q.Ticket_ID) as sla_breached,
+                    date(MIN(q.opened_day) * 86400, 'unixepoch') as oldest_breached_opened
+                FROM ticket_open_counts c
+                LEFT JOIN ticket_sla_queue q
+                    ON q.Priority = c.value
+                    AND q.due_day < CAST(julianday('now') - 2440587.5 AS INTEGER)
+                WHERE c.dimension = 'priority' AND c.open_tickets > 0
+                GROUP BY c.value, c.open_tickets
+                ORDER BY sla_breached DESC
+            """,
+            "duckdb_query": """
+                SELECT 
+                    c.value as Priority,
+                    c.open_tickets,
+                    COUNT(q.Ticket_ID) as sla_breached,
+                    CAST(DATE '1970-01-01' + CAST(MIN(q.opened_day) AS INTEGER) AS VARCHAR) as oldest_breached_opened
+                FROM ticket_open_counts c
+                LEFT JOIN ticket_sla_queue q
+                    ON q.Priority = c.value
+                    AND q.due_day < CAST(current_date - DATE '1970-01-01' AS INTEGER)
+                WHERE c.dimension = 'priority' AND c.open_tickets > 0
+                GROUP BY c.value, c.open_tickets
+                ORDER BY sla_breached DESC
+            """
         }
     }
     
     return queries
 
-def execute_query(conn, query_key):
+def execute_query(conn, query_key, router=None, start=None, end=None, approximate=False):
     """
     Execute a specific query and return results as DataFrame.
+    With a QueryRouter, OLAP queries run on its analytics backend (DuckDB)
+    and the rest on SQLite; without one everything runs on conn.
+    start/end limit transactions to that txn_time range; archived months
+    are only read when the range reaches them.
+    approximate=True answers queries with an "approximate" estimator from
+    the samples and sketches in conn (see approx_analytics); columns
+    ending in _moe are 95% margins of error.
     """
-    import pandas as pd
-    
     queries = get_all_queries()
     
     if query_key in queries:
         query_info = queries[query_key]
-        df = pd.read_sql_query(query_info["query"], conn)
-        return df, query_info["description"], query_info["query"]
+        if approximate and query_info.get("approximate"):
+            df, note = run_approximate(conn, query_info["approximate"], start, end)
+            return df, f"{query_info['description']} (approximate: {note})", query_info["query"]
+        backend = router.backend_for(query_info) if router else SQLiteBackend(conn)
+        query = query_for_backend(query_info, backend)
+        # Captured as the SQLite statement, whichever engine runs it
+        with captured(query_info["query"], source="execute_query"):
+            df = arrow_to_frame(read_with_archive(conn, backend, query, start, end))
+        return df, query_info["description"], query
     else:
         return None, None, None
 
@@ -0,0 +1,298 @@
+"""
+Monthly account statements.
+generate_statements() writes one statement per customer for a calendar
+month: opening balance, every transaction of the month in time order
+with a running balance, and the closing balance. Customers are split
+into customer_key ranges handed to a process pool; each task opens its
+own read-only connection and makes one ordered pass over the month's
+partition through its (customer_key, txn_time) index, merged with the
+customers of the range, so nothing is queried per customer.
+
+Balances are anchored on today's stored balance: closing = balance minus
+the net of every later successful transaction, opening = closing minus
+the month's net. Failed transactions are listed but move nothing.
+Archived months are read from their Parquet file.
+
+Run from the project root, e.g.:
+    python statements.py --month 2026-09
+    python statements.py --month 202609 --format csv --workers 8
+"""
+import argparse
+import csv
+import heapq
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from batch_report import open_read_connection
+from reconciliation import SIGNED_AMOUNT
+from txn_archive import archive_dir_for, archived_months
+from txn_partitions import DEFAULT_PARTITION, add_months, epoch_bounds, month_key, partition_tables
+
+DB_PATH = 'database/banking.db'
+STATEMENT_DIR = 'statements'
+FORMATS = ('txt', 'csv')
+# Customers per pool task; many more tasks than workers keeps them all busy
+CHUNK_CUSTOMERS = 10000
+SUMMARY_FILE = 'summary.csv'
+
+STATEMENT_COLUMNS = ['customer_key', 'txn_time', 'txn_id', 'txn_type', 'amount', 'status']
+
+CUSTOMERS_SQL = '''
+SELECT c.customer_key, c.customer_id, c.name, c.account_type, a.account_balance
+FROM customers c JOIN accounts a ON a.customer_id = c.customer_id
+WHERE c.customer_key BETWEEN ? AND ? AND a.account_balance IS NOT NULL
+ORDER BY c.customer_key
+'''
+
+
+def parse_month(value=None):
+    """
+    YYYYMM key for 202609, '202609', '2026-09' or a date; defaults to the
+    last complete month.
+    """
+    if value is None:
+        return add_months(month_key(pd.Timestamp.now()), -1)
+    text = str(value).strip()
+    if text.isdigit() and len(text) == 6:
+        return int(text)
+    return month_key(text)
+
+
+def month_bounds(month):
+    """[start, end) timestamps of a YYYYMM month."""
+    start = pd.Timestamp(year=month // 100, month=month % 100, day=1)
+    return start, start + pd.DateOffset(months=1)
+
+
+def customer_ranges(conn, chunk_size=CHUNK_CUSTOMERS):
+    """Inclusive (first_key, last_key) ranges of chunk_size customers each."""
+    keys = [key for (key,) in conn.execute(
+        "SELECT customer_key FROM customers WHERE customer_key IS NOT NULL ORDER BY customer_key"
+    )]
+    return [(keys[i], keys[min(i + chunk_size, len(keys)) - 1]) for i in range(0, len(keys), chunk_size)]
+
+
+def _archive_rows(conn, month, first_key, last_key, columns):
+    """One archived month's rows for a key range, as a pyarrow Table."""
+    import pyarrow.parquet as pq
+
+    file_name = dict(archived_months(conn))[month]
+    return pq.read_table(
+        os.path.join(archive_dir_for(conn), file_name), columns=columns,
+        filters=[("customer_key", ">=", first_key), ("customer_key", "<=", last_key)],
+    )
+
+
+def _live_scan(table_name, columns, start=None, end=None):
+    """
+    SELECT over one partition for a customer_key range. Month partitions
+    only hold their month; the default partition needs the time bounds.
+    """
+    where = ["customer_key BETWEEN ? AND ?"]
+    if table_name == DEFAULT_PARTITION:
+        where.extend(epoch_bounds(start, end))
+    return f"SELECT {', '.join(columns)} FROM {table_name} WHERE {' AND '.join(where)}"
+
+
+def _later_nets(conn, end, first_key, last_key):
+    """{customer_key: net of successful transactions at or after end}."""
+    nets = {}
+    for table_name in partition_tables(conn, start=end):
+        sql = (f"SELECT customer_key, SUM({SIGNED_AMOUNT}) FROM "
+               f"({_live_scan(table_name, ['customer_key', 'txn_type', 'amount', 'status'], start=end)}) "
+               f"WHERE status = 'success' GROUP BY customer_key")
+        for key, net in conn.execute(sql, (first_key, last_key)):
+            nets[key] = nets.get(key, 0.0) + net
+    for month, _ in archived_months(conn, start=end):
+        df = _archive_rows(conn, month, first_key, last_key,
+                           ["customer_key", "txn_type", "amount", "status"]).to_pandas()
+        df = df[df["status"] == "success"]
+        signed = df["amount"].where(df["txn_type"] == "deposit", -df["amount"])
+        for key, net in signed.groupby(df["customer_key"]).sum().items():
+            nets[key] = nets.get(key, 0.0) + net
+    return nets
+
+
+def _period_rows(conn, month, first_key, last_key):
+    """
+    The month's transactions for a key range as one stream of tuples
+    ordered by (customer_key, txn_time).
+    """
+    start, end = month_bounds(month)
+    if month in dict(archived_months(conn, start, end)):
+        table = _archive_rows(conn, month, first_key, last_key, STATEMENT_COLUMNS)
+        table = table.sort_by([("customer_key", "ascending"), ("txn_time", "ascending")])
+        return zip(*(table.column(name).to_pylist() for name in STATEMENT_COLUMNS))
+
+    # Each partition is read in index order; a late row parked in the
+    # default partition is merged in rather than re-sorting everything
+    streams = [
+        conn.execute(f"{_live_scan(table_name, STATEMENT_COLUMNS, start, end)} "
+                     f"ORDER BY customer_key, txn_time", (first_key, last_key))
+        for table_name in partition_tables(conn, start, end)
+    ]
+    if len(streams) == 1:
+        return streams[0]
+    return heapq.merge(*streams, key=lambda row: (row[0], row[1]))
+
+
+def _write_text(path, customer, month, opening, lines, closing):
+    _, customer_id, name, account_type, _ = customer
+    start, end = month_bounds(month)
+    last_day = (end - pd.Timedelta(days=1)).date()
+    credits = sum(signed for *_, signed, _ in lines if signed > 0)
+    debits = -sum(signed for *_, signed, _ in lines if signed < 0)
+    out = [
+        "BankSight - Account Statement",
+        f"Customer: {name} ({customer_id})    Account type: {account_type}",
+        f"Period:   {start.date()} to {last_day}",
+        "",
+        f"{'Opening balance':<69}{opening:>15,.2f}",
+        "",
+        f"{'Date':<21}{'Transaction':<16}{'Type':<18}{'Amount':>14}{'Balance':>15}",
+    ]
+    for txn_time, txn_id, txn_type, status, signed, balance in lines:
+        label = txn_type if status == 'success' else f"{txn_type} ({status})"
+        out.append(f"{txn_time:<21}{txn_id:<16}{label[:17]:<18}{signed:>+14,.2f}{balance:>15,.2f}")
+    if not lines:
+        out.append("No transactions this month.")
+    out += [
+        "",
+        f"{'Closing balance':<69}{closing:>15,.2f}",
+        f"Credits: {credits:,.2f}    Debits: {debits:,.2f}    Transactions: {len(lines)}",
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+
+
+def _write_csv(path, customer, month, opening, lines, closing):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["txn_time", "txn_id", "txn_type", "status", "amount", "balance"])
+        writer.writerow(["", "", "opening balance", "", "", f"{opening:.2f}"])
+        for txn_time, txn_id, txn_type, status, signed, balance in lines:
+            writer.writerow([txn_time, txn_id, txn_type, status, f"{signed:.2f}", f"{balance:.2f}"])
+        writer.writerow(["", "", "closing balance", "", "", f"{closing:.2f}"])
+
+
+WRITERS = {'txt': _write_text, 'csv': _write_csv}
+
+
+def render_range(db_path, month, first_key, last_key, out_dir, fmt='txt'):
+    """
+    Write the statements of every customer with first_key <= customer_key
+    <= last_key. Returns one summary row per statement.
+    """
+    conn = open_read_connection(db_path)
+    try:
+        _, end = month_bounds(month)
+        later = _later_nets(conn, end, first_key, last_key)
+        rows = iter(_period_rows(conn, month, first_key, last_key))
+        chunk_dir = os.path.join(out_dir, f"{first_key:07d}-{last_key:07d}")
+        os.makedirs(chunk_dir, exist_ok=True)
+        write = WRITERS[fmt]
+
+        summary = []
+        row = next(rows, None)
+        for customer in conn.execute(CUSTOMERS_SQL, (first_key, last_key)).fetchall():
+            key, customer_id, name, _, balance = customer
+            # Rows for keys without an account are skipped
+            while row is not None and row[0] < key:
+                row = next(rows, None)
+            txns = []
+            while row is not None and row[0] == key:
+                txns.append(row)
+                row = next(rows, None)
+
+            closing = balance - later.get(key, 0.0)
+            signed = [(amount if txn_type == 'deposit' else -amount) if status == 'success' else 0.0
+                      for _, _, _, txn_type, amount, status in txns]
+            opening = closing - sum(signed)
+            lines = []
+            running = opening
+            for (_, txn_time, txn_id, txn_type, _, status), change in zip(txns, signed):
+                running += change
+                lines.append((str(txn_time), txn_id, txn_type, status, change, running))
+
+            file_name = os.path.join(os.path.basename(chunk_dir), f"{customer_id}.{fmt}")
+            write(os.path.join(out_dir, file_name), customer, month, opening, lines, closing)
+            summary.append((customer_id, name, round(opening, 2), round(closing, 2), len(txns), file_name))
+        return summary
+    finally:
+        conn.close()
+
+
+def generate_statements(db_path=DB_PATH, month=None, out_dir=STATEMENT_DIR, fmt='txt',
+                        workers=None, chunk_size=CHUNK_CUSTOMERS, progress=None):
+    """
+    Write every customer's statement for `month` under out_dir/<YYYYMM>/
+    plus a summary.csv. workers=1 runs in this process. Returns a dict
+    with the month, statement and transaction counts, directory and time.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown statement format: {fmt}")
+    start = time.perf_counter()
+    month = parse_month(month)
+    conn = sqlite3.connect(db_path)
+    try:
+        ranges = customer_ranges(conn, chunk_size)
+    finally:
+        conn.close()
+    month_dir = os.path.join(out_dir, str(month))
+    os.makedirs(month_dir, exist_ok=True)
+
+    results = {}
+    if workers == 1:
+        for i, (first_key, last_key) in enumerate(ranges):
+            results[i] = render_range(db_path, month, first_key, last_key, month_dir, fmt)
+            if progress:
+                progress(len(results), len(ranges))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_range, db_path, month, first_key, last_key, month_dir, fmt): i
+                       for i, (first_key, last_key) in enumerate(ranges)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(len(results), len(ranges))
+
+    summary_path = os.path.join(month_dir, SUMMARY_FILE)
+    statements = transactions = 0
+    with open(summary_path + ".tmp", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["customer_id", "name", "opening_balance", "closing_balance", "transactions", "file"])
+        for i in range(len(ranges)):
+            writer.writerows(results[i])
+            statements += len(results[i])
+            transactions += sum(row[4] for row in results[i])
+    os.replace(summary_path + ".tmp", summary_path)
+
+    return {"month": month, "statements": statements, "transactions": transactions,
+            "directory": month_dir, "seconds": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate monthly customer statements")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--month", help="YYYY-MM or YYYYMM (default: last complete month)")
+    parser.add_argument("--out", default=STATEMENT_DIR)
+    parser.add_argument("--format", choices=FORMATS, default='txt')
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_CUSTOMERS, help="customers per task")
+    args = parser.parse_args()
+
+    def progress(done, total):
+        print(f"  {done}/{total} customer ranges done", end="\r")
+
+    result = generate_statements(args.db, args.month, args.out, args.format,
+                                 args.workers, args.chunk, progress)
+    print(f"\n✓ Wrote {result['statements']:,} statements ({result['transactions']:,} transactions) "
+          f"for {result['month']} in {result['seconds']:.1f}s → {result['directory']}")
+
+
+if __name__ == "__main__":
+    main()
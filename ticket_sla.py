@@ -0,0 +1,318 @@
+"""
+Support ticket backlog and SLA tracking.
+Triggers on support_tickets keep three small tables current on every
+write, so the backlog dashboard never scans the tickets:
+- ticket_open_counts: open tickets per priority, agent and branch;
+- ticket_open_aging: open tickets per priority and agent by the day they
+  were opened, which ticket_backlog() buckets by age at read time;
+- ticket_sla_queue: every open ticket with its SLA due day, indexed by
+  due day, so breaches are an index range read.
+A ticket is open while its Status is 'Open' or 'In Progress'; its SLA is
+SLA_DAYS[Priority] days after Date_Opened.
+
+Run from the project root, e.g.:
+    python ticket_sla.py
+    python ticket_sla.py --rebuild --check
+"""
+import argparse
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from typed_columns import EPOCH
+
+DB_PATH = 'database/banking.db'
+OPEN_STATUSES = ('Open', 'In Progress')
+# Days from opening to the SLA deadline
+SLA_DAYS = {'Critical': 1, 'High': 3, 'Medium': 5, 'Low': 10}
+DEFAULT_SLA_DAYS = 10
+# (label, min age in days, max age in days or None)
+AGING_BUCKETS = [
+    ("0-1 days", 0, 1),
+    ("2-3 days", 2, 3),
+    ("4-7 days", 4, 7),
+    ("8-14 days", 8, 14),
+    ("15-30 days", 15, 30),
+    ("31+ days", 31, None),
+]
+UNKNOWN = '(none)'
+
+# Dimension -> value expression over a ticket row ("X" is NEW or OLD)
+COUNT_DIMENSIONS = {
+    'priority': "COALESCE(X.Priority, '(none)')",
+    'agent': "COALESCE(X.Support_Agent, '(none)')",
+    'branch': "COALESCE(CAST(X.branch_id AS TEXT), '(none)')",
+}
+AGING_DIMENSIONS = ('priority', 'agent')
+
+BACKLOG_SCHEMAS = [
+    '''
+CREATE TABLE IF NOT EXISTS ticket_open_counts (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    open_tickets INTEGER NOT NULL,
+    PRIMARY KEY (dimension, value)
+) WITHOUT ROWID
+''',
+    '''
+CREATE TABLE IF NOT EXISTS ticket_open_aging (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    opened_day INTEGER NOT NULL,
+    open_tickets INTEGER NOT NULL,
+    PRIMARY KEY (dimension, value, opened_day)
+) WITHOUT ROWID
+''',
+    '''
+CREATE TABLE IF NOT EXISTS ticket_sla_queue (
+    Ticket_ID TEXT PRIMARY KEY,
+    due_day INTEGER NOT NULL,
+    opened_day INTEGER NOT NULL,
+    Priority TEXT,
+    Support_Agent TEXT,
+    branch_id INTEGER
+)
+''',
+    "CREATE INDEX IF NOT EXISTS idx_ticket_sla_queue_due ON ticket_sla_queue(due_day)",
+]
+
+BACKLOG_TABLES = ['ticket_open_counts', 'ticket_open_aging', 'ticket_sla_queue']
+
+
+def _open_sql(row):
+    return f"{row}.Status IN ({', '.join(repr(status) for status in OPEN_STATUSES)})"
+
+
+def _sla_days_sql(row):
+    cases = " ".join(f"WHEN '{priority}' THEN {days}" for priority, days in SLA_DAYS.items())
+    return f"CASE {row}.Priority {cases} ELSE {DEFAULT_SLA_DAYS} END"
+
+
+def _opened_day_sql(row):
+    # Tickets without an opening date age from the day they were logged
+    return f"COALESCE({row}.opened_day, CAST(julianday('now') - 2440587.5 AS INTEGER))"
+
+
+def _apply_sql(row, sign, keep_queued="false"):
+    """
+    Trigger statements adding (sign '+') or removing (sign '-') an open
+    ticket. keep_queued leaves its queue row for the matching add to
+    replace, whichever of the two update triggers fires first.
+    """
+    statements = []
+    for dimension, expr in COUNT_DIMENSIONS.items():
+        value = expr.replace("X.", f"{row}.")
+        if sign == "+":
+            statements.append(
+                f"INSERT INTO ticket_open_counts VALUES ('{dimension}', {value}, 1) "
+                f"ON CONFLICT DO UPDATE SET open_tickets = open_tickets + 1;")
+        else:
+            statements.append(
+                f"UPDATE ticket_open_counts SET open_tickets = open_tickets - 1 "
+                f"WHERE dimension = '{dimension}' AND value = {value};")
+        if dimension in AGING_DIMENSIONS:
+            key = f"dimension = '{dimension}' AND value = {value} AND opened_day = {_opened_day_sql(row)}"
+            if sign == "+":
+                statements.append(
+                    f"INSERT INTO ticket_open_aging VALUES ('{dimension}', {value}, {_opened_day_sql(row)}, 1) "
+                    f"ON CONFLICT DO UPDATE SET open_tickets = open_tickets + 1;")
+            else:
+                statements.append(f"UPDATE ticket_open_aging SET open_tickets = open_tickets - 1 WHERE {key};")
+                statements.append(f"DELETE FROM ticket_open_aging WHERE {key} AND open_tickets <= 0;")
+    if sign == "+":
+        statements.append(
+            f"INSERT OR REPLACE INTO ticket_sla_queue VALUES ({row}.Ticket_ID, "
+            f"{_opened_day_sql(row)} + {_sla_days_sql(row)}, {_opened_day_sql(row)}, "
+            f"{row}.Priority, {row}.Support_Agent, {row}.branch_id);")
+    else:
+        statements.append(f"DELETE FROM ticket_sla_queue WHERE Ticket_ID = {row}.Ticket_ID AND NOT ({keep_queued});")
+    return "\n            ".join(statements)
+
+
+def rebuild_ticket_backlog(conn):
+    """
+    Recompute the backlog tables from support_tickets. Used by the loader;
+    afterwards the triggers keep them current.
+    """
+    cursor = conn.cursor()
+    for statement in BACKLOG_SCHEMAS:
+        cursor.execute(statement)
+    for table_name in BACKLOG_TABLES:
+        cursor.execute(f"DELETE FROM {table_name}")
+
+    open_filter = _open_sql("t")
+    for dimension, expr in COUNT_DIMENSIONS.items():
+        value = expr.replace("X.", "t.")
+        cursor.execute(f'''
+        INSERT INTO ticket_open_counts
+        SELECT '{dimension}', {value}, COUNT(*) FROM support_tickets t
+        WHERE {open_filter} GROUP BY 2
+        ''')
+        if dimension in AGING_DIMENSIONS:
+            cursor.execute(f'''
+            INSERT INTO ticket_open_aging
+            SELECT '{dimension}', {value}, {_opened_day_sql("t")}, COUNT(*) FROM support_tickets t
+            WHERE {open_filter} GROUP BY 2, 3
+            ''')
+    cursor.execute(f'''
+    INSERT INTO ticket_sla_queue
+    SELECT Ticket_ID, {_opened_day_sql("t")} + {_sla_days_sql("t")}, {_opened_day_sql("t")},
+           Priority, Support_Agent, branch_id
+    FROM support_tickets t WHERE {open_filter}
+    ''')
+    conn.commit()
+
+
+def ensure_ticket_backlog_triggers(conn):
+    """
+    Install triggers that keep the backlog tables in step with every write.
+    Updates remove the old row's contribution and add the new one.
+    """
+    cursor = conn.cursor()
+    for statement in BACKLOG_SCHEMAS:
+        cursor.execute(statement)
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_support_tickets_backlog_insert
+    AFTER INSERT ON support_tickets
+    WHEN {_open_sql("NEW")}
+    BEGIN
+            {_apply_sql("NEW", "+")}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_support_tickets_backlog_delete
+    AFTER DELETE ON support_tickets
+    WHEN {_open_sql("OLD")}
+    BEGIN
+            {_apply_sql("OLD", "-")}
+    END
+    ''')
+    # Also fires when the typed-date and branch triggers fill in
+    # opened_day / branch_id after an insert
+    still_queued = f"{_open_sql('NEW')} AND NEW.Ticket_ID = OLD.Ticket_ID"
+    for row, sign in (("OLD", "-"), ("NEW", "+")):
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_support_tickets_backlog_update_{'remove' if sign == '-' else 'add'}
+        AFTER UPDATE OF Ticket_ID, Status, Priority, Support_Agent, branch_id, opened_day ON support_tickets
+        WHEN {_open_sql(row)}
+        BEGIN
+            {_apply_sql(row, sign, still_queued)}
+        END
+        ''')
+    conn.commit()
+
+
+def ensure_ticket_backlog(conn):
+    rebuild_ticket_backlog(conn)
+    ensure_ticket_backlog_triggers(conn)
+
+
+def today_day(as_of=None):
+    """Days since the Unix epoch for as_of (default today)."""
+    return (pd.Timestamp(as_of or datetime.now()).normalize() - EPOCH).days
+
+
+def aging_bucket_sql(age_expr):
+    cases = " ".join(
+        f"WHEN {age_expr} <= {high} THEN '{label}'" for label, _, high in AGING_BUCKETS if high is not None
+    )
+    return f"CASE {cases} ELSE '{AGING_BUCKETS[-1][0]}' END"
+
+
+def ticket_backlog(conn, as_of=None, breach_limit=50):
+    """
+    Live backlog from the maintained tables. Returns a dict of DataFrames:
+    totals (one row), by_priority, by_agent, by_branch, aging (dimension,
+    value, bucket, open_tickets) and breaches (overdue open tickets, most
+    overdue first, with days_overdue).
+    """
+    today = today_day(as_of)
+    counts = pd.read_sql_query("SELECT dimension, value, open_tickets FROM ticket_open_counts "
+                               "WHERE open_tickets > 0", conn)
+    overdue = conn.execute("SELECT COUNT(*) FROM ticket_sla_queue WHERE due_day < ?", (today,)).fetchone()[0]
+    due_today = conn.execute("SELECT COUNT(*) FROM ticket_sla_queue WHERE due_day = ?", (today,)).fetchone()[0]
+
+    def by(dimension, column):
+        df = counts[counts["dimension"] == dimension][["value", "open_tickets"]]
+        return df.rename(columns={"value": column}).sort_values("open_tickets", ascending=False,
+                                                                 ignore_index=True)
+
+    by_branch = by("branch", "branch_id")
+    names = dict(conn.execute("SELECT CAST(Branch_ID AS TEXT), Branch_Name FROM branches"))
+    by_branch.insert(1, "Branch_Name", by_branch["branch_id"].map(names).fillna(UNKNOWN))
+
+    aging = pd.read_sql_query(f'''
+    SELECT dimension, value, {aging_bucket_sql(f"{today} - opened_day")} AS bucket,
+           SUM(open_tickets) AS open_tickets
+    FROM ticket_open_aging WHERE open_tickets > 0
+    GROUP BY dimension, value, bucket
+    ''', conn)
+    breaches = pd.read_sql_query('''
+    SELECT q.Ticket_ID, q.Priority, q.Support_Agent, b.Branch_Name,
+           date(q.opened_day * 86400, 'unixepoch') AS opened, date(q.due_day * 86400, 'unixepoch') AS due,
+           ? - q.due_day AS days_overdue
+    FROM ticket_sla_queue q LEFT JOIN branches b ON b.Branch_ID = q.branch_id
+    WHERE q.due_day < ?
+    ORDER BY q.due_day
+    LIMIT ?
+    ''', conn, params=(today, today, breach_limit))
+
+    totals = pd.DataFrame([{
+        "open_tickets": int(by("priority", "Priority")["open_tickets"].sum()),
+        "overdue": overdue,
+        "due_today": due_today,
+    }])
+    return {"totals": totals, "by_priority": by("priority", "Priority"), "by_agent": by("agent", "Support_Agent"),
+            "by_branch": by_branch, "aging": aging, "breaches": breaches}
+
+
+def check_ticket_backlog(conn):
+    """
+    Compare the maintained counters with a fresh scan of support_tickets.
+    Returns the mismatching (dimension, value) rows; empty means in step.
+    """
+    fresh = []
+    for dimension, expr in COUNT_DIMENSIONS.items():
+        fresh.append(pd.read_sql_query(f'''
+        SELECT '{dimension}' AS dimension, {expr.replace("X.", "t.")} AS value, COUNT(*) AS expected
+        FROM support_tickets t WHERE {_open_sql("t")} GROUP BY 2
+        ''', conn))
+    fresh = pd.concat(fresh, ignore_index=True)
+    kept = pd.read_sql_query("SELECT dimension, value, open_tickets FROM ticket_open_counts", conn)
+    merged = fresh.merge(kept, on=["dimension", "value"], how="outer").fillna(0)
+    return merged[merged["expected"] != merged["open_tickets"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Support ticket backlog and SLA breaches")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="recompute the backlog tables and triggers")
+    parser.add_argument("--check", action="store_true", help="verify counters against a full scan")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.rebuild:
+            ensure_ticket_backlog(conn)
+            print("✓ Rebuilt ticket backlog tables and triggers")
+        backlog = ticket_backlog(conn)
+        totals = backlog["totals"].iloc[0]
+        print(f"Open tickets: {totals['open_tickets']}  overdue: {totals['overdue']}  "
+              f"due today: {totals['due_today']}\n")
+        print(backlog["by_priority"].to_string(index=False))
+        print()
+        print(backlog["breaches"].head(10).to_string(index=False))
+        if args.check:
+            mismatches = check_ticket_backlog(conn)
+            if len(mismatches):
+                print(f"\n⚠️ {len(mismatches)} counters out of step:")
+                print(mismatches.to_string(index=False))
+            else:
+                print("\n✅ Counters match a full scan")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
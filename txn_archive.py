@@ -0,0 +1,297 @@
+"""
+Cold-history archive for transactions.
+Month partitions older than a cutoff are written to zstd-compressed
+Parquet files next to the database (database/archive/), recorded in the
+transaction_archive catalog table and dropped from banking.db, so the
+hot database only holds recent months. read_with_archive() runs a query
+with the archived months unioned into "transactions" only when the
+query reads transactions and its time range reaches back past the live
+data; otherwise the query runs on the live tables alone.
+
+Run from the project root, e.g.:
+    python txn_archive.py --older-than 6
+    python txn_archive.py --status
+"""
+import argparse
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from backends import database_file
+from pipeline import file_digest
+from txn_partitions import (
+    DEFAULT_PARTITION,
+    TRANSACTION_COLUMNS,
+    add_months,
+    epoch_bounds,
+    list_partitions,
+    month_key,
+    refresh_partition_view,
+    transactions_sql,
+    with_transactions,
+)
+
+DB_PATH = 'database/banking.db'
+ARCHIVE_SUBDIR = 'archive'
+# Months kept live by default when archiving
+KEEP_MONTHS = 6
+
+ARCHIVE_CATALOG = '''
+CREATE TABLE IF NOT EXISTS transaction_archive (
+    month INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    total_amount REAL,
+    min_epoch INTEGER,
+    max_epoch INTEGER,
+    size_bytes INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    archived_at TEXT NOT NULL
+)
+'''
+
+# Archived history is read-only: the router would otherwise park new
+# rows for those months in the default partition
+ARCHIVE_GUARD = f'''
+CREATE TRIGGER IF NOT EXISTS trg_{DEFAULT_PARTITION}_archived_months
+BEFORE INSERT ON {DEFAULT_PARTITION}
+WHEN NEW.txn_month IN (SELECT month FROM transaction_archive)
+BEGIN
+    SELECT RAISE(ABORT, 'transactions for this month are archived (read-only)');
+END
+'''
+
+_TRANSACTIONS_PATTERN = re.compile(r"\btransactions\b", re.IGNORECASE)
+
+
+def archive_dir_for(conn):
+    """Archive directory next to the connection's database file."""
+    path = database_file(conn) or DB_PATH
+    return os.path.join(os.path.dirname(os.path.abspath(path)), ARCHIVE_SUBDIR)
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    types = {'amount': pa.float64(), 'customer_key': pa.int64(),
+             'txn_epoch': pa.int64(), 'txn_month': pa.int64()}
+    return pa.schema([(column, types.get(column, pa.string())) for column in TRANSACTION_COLUMNS])
+
+
+def ensure_archive_catalog(conn):
+    conn.execute(ARCHIVE_CATALOG)
+    conn.execute(ARCHIVE_GUARD)
+    conn.commit()
+
+
+def clear_archive(conn):
+    """
+    Forget every archived month: delete the Parquet files and drop the
+    catalog. Used when transactions are reloaded, since the load puts
+    every month back into live partitions.
+    """
+    archive_dir = archive_dir_for(conn)
+    if os.path.isdir(archive_dir):
+        for file_name in os.listdir(archive_dir):
+            if file_name.startswith("transactions_p") and file_name.endswith((".parquet", ".parquet.tmp")):
+                os.remove(os.path.join(archive_dir, file_name))
+    conn.execute("DROP TABLE IF EXISTS transaction_archive")
+
+
+def archived_months(conn, start=None, end=None):
+    """
+    Catalog rows (month, file_name) for archived months overlapping
+    [start, end), oldest first.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transaction_archive'"
+    ).fetchone()
+    if not exists:
+        return []
+    rows = conn.execute("SELECT month, file_name FROM transaction_archive ORDER BY month").fetchall()
+    start_month = month_key(start) if start is not None else None
+    end_month = month_key(pd.Timestamp(end) - pd.Timedelta(seconds=1)) if end is not None else None
+    return [(month, file_name) for month, file_name in rows
+            if (start_month is None or month >= start_month)
+            and (end_month is None or month <= end_month)]
+
+
+def archive_month(conn, month, table_name, archive_dir):
+    """
+    Write one partition to Parquet, verify it, record it and drop the
+    partition. Returns the catalog row as a dict.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    df = pd.read_sql_query(f"SELECT {columns} FROM {table_name} ORDER BY txn_epoch, txn_id", conn)
+    table = pa.Table.from_pandas(df, schema=_arrow_schema(), preserve_index=False)
+
+    file_name = f"{table_name}.parquet"
+    path = os.path.join(archive_dir, file_name)
+    pq.write_table(table, path + ".tmp", compression="zstd")
+    if pq.read_metadata(path + ".tmp").num_rows != len(df):
+        os.remove(path + ".tmp")
+        raise RuntimeError(f"Archive of {table_name} is incomplete")
+    os.replace(path + ".tmp", path)
+
+    entry = {
+        "month": month,
+        "file_name": file_name,
+        "row_count": len(df),
+        "total_amount": float(df["amount"].sum()),
+        "min_epoch": int(df["txn_epoch"].min()) if len(df) else None,
+        "max_epoch": int(df["txn_epoch"].max()) if len(df) else None,
+        "size_bytes": os.path.getsize(path),
+        "sha256": file_digest(path),
+        "archived_at": datetime.now().isoformat(timespec='seconds'),
+    }
+    # Catalog entry and drop commit together; a crash before this leaves
+    # the partition live and the file is simply rewritten next run
+    conn.execute(
+        "INSERT OR REPLACE INTO transaction_archive VALUES "
+        "(:month, :file_name, :row_count, :total_amount, :min_epoch, :max_epoch, "
+        ":size_bytes, :sha256, :archived_at)", entry,
+    )
+    conn.execute(f"DROP TABLE {table_name}")
+    conn.execute("DELETE FROM transaction_partitions WHERE month = ?", (month,))
+    conn.commit()
+    return entry
+
+
+def archive_transactions(conn, before=None, keep_months=KEEP_MONTHS, archive_dir=None):
+    """
+    Archive every month partition older than `before` (default: keep the
+    last keep_months months live), then rebuild the view and VACUUM so
+    the database file shrinks. Returns the archived catalog rows.
+    """
+    archive_dir = archive_dir or archive_dir_for(conn)
+    os.makedirs(archive_dir, exist_ok=True)
+    ensure_archive_catalog(conn)
+
+    cutoff = month_key(before) if before is not None else add_months(month_key(datetime.now()), -(keep_months - 1))
+    candidates = [(month, table_name) for month, table_name, _ in list_partitions(conn)
+                  if month and month < cutoff]
+
+    archived = []
+    for month, table_name in candidates:
+        archived.append(archive_month(conn, month, table_name, archive_dir))
+        print(f"✓ Archived {table_name}: {archived[-1]['row_count']:,} rows, "
+              f"{archived[-1]['size_bytes'] / 1024:,.1f} KB")
+
+    if archived:
+        refresh_partition_view(conn)
+        conn.execute("VACUUM")
+    return archived
+
+
+def touches_transactions(sql):
+    return bool(_TRANSACTIONS_PATTERN.search(sql))
+
+
+def _load_archive_months(conn, months, archive_dir):
+    """
+    SQLite fallback: copy archived months into a temp table on this
+    connection (once per month), since SQLite cannot read Parquet.
+    """
+    import pyarrow.parquet as pq
+
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS archive_transactions ({columns})")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_loaded (month INTEGER PRIMARY KEY)")
+    loaded = {row[0] for row in conn.execute("SELECT month FROM temp.archive_loaded")}
+    for month, file_name in months:
+        if month in loaded:
+            continue
+        rows = pq.read_table(os.path.join(archive_dir, file_name)).to_pylist()
+        conn.executemany(
+            f"INSERT INTO temp.archive_transactions ({columns}) "
+            f"VALUES ({', '.join(':' + c for c in TRANSACTION_COLUMNS)})", rows,
+        )
+        conn.execute("INSERT INTO temp.archive_loaded VALUES (?)", (month,))
+    conn.commit()
+
+
+def read_with_archive(conn, backend, sql, start=None, end=None):
+    """
+    Run sql on backend and return an Arrow table. Archived months are
+    unioned into "transactions" only when sql reads transactions and
+    [start, end) overlaps the archive; a range narrows the live side too.
+    conn is a SQLite connection to the hot database (catalog source);
+    SQLite backends use their own connection so partitions and catalog
+    match the database the query actually reads.
+    """
+    import pyarrow as pa
+
+    # A snapshot manager resolves to one snapshot for the whole read
+    if hasattr(backend, "current"):
+        backend = backend.current()
+    if backend.dialect == "sqlite":
+        conn = backend.conn
+    if not touches_transactions(sql):
+        return backend.read_arrow(sql)
+    months = archived_months(conn, start, end)
+    if not months and start is None and end is None:
+        return backend.read_arrow(sql)
+
+    bounds = epoch_bounds(start, end)
+    where = f" WHERE {' AND '.join(bounds)}" if bounds else ""
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    archive_dir = archive_dir_for(conn)
+
+    if backend.dialect == "duckdb":
+        branches = [f"SELECT {columns} FROM main.transactions{where}"]
+        if months:
+            files = ", ".join(f"'{os.path.join(archive_dir, file_name)}'" for _, file_name in months)
+            branches.append(f"SELECT {columns} FROM read_parquet([{files}]){where}")
+        return backend.read_arrow(with_transactions(sql, "\nUNION ALL\n".join(branches)))
+
+    # SQLite: only the live partitions in range, plus archived rows if needed
+    body = transactions_sql(conn, start, end)
+    if not months:
+        return backend.read_arrow(with_transactions(sql, body))
+    _load_archive_months(conn, months, archive_dir)
+    month_list = ", ".join(str(month) for month, _ in months)
+    archive_where = " AND ".join([f"txn_month IN ({month_list})"] + bounds)
+    body += f"\nUNION ALL\nSELECT {columns} FROM temp.archive_transactions WHERE {archive_where}"
+    # The temp table lives on this connection, so read through it directly
+    df = pd.read_sql_query(with_transactions(sql, body), conn)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def archive_status(conn):
+    """The archive catalog as a DataFrame (empty if nothing is archived)."""
+    ensure_archive_catalog(conn)
+    return pd.read_sql_query(
+        "SELECT month, file_name, row_count, ROUND(total_amount, 2) AS total_amount, "
+        "size_bytes, archived_at FROM transaction_archive ORDER BY month", conn
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old BankSight transactions to Parquet")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--older-than", type=int, default=KEEP_MONTHS,
+                        help="keep this many recent months live")
+    parser.add_argument("--before", help="archive months before this date (YYYY-MM-DD)")
+    parser.add_argument("--status", action="store_true", help="only show the archive catalog")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if not args.status:
+            size_before = os.path.getsize(args.db)
+            archived = archive_transactions(conn, args.before, args.older_than)
+            print(f"\n✓ Archived {len(archived)} months; banking.db "
+                  f"{size_before / 1024:,.0f} KB -> {os.path.getsize(args.db) / 1024:,.0f} KB")
+        print(archive_status(conn).to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
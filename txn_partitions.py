@@ -0,0 +1,441 @@
+"""
+Monthly partitions for transactions.
+transactions is a view over one table per calendar month
+(transactions_p202401, ...) plus transactions_default for rows whose
+month has no partition yet. INSTEAD OF triggers on the view route
+inserts, updates and deletes to the right partition, so pages and
+queries keep using "transactions" unchanged; insert_partitioned() does
+the same routing for DataFrames at load time. Months older than the
+open window are compacted and sealed read-only, and scoped_query()
+restricts a query to the partitions overlapping a txn_time range, so
+recent-window queries do not grow with the amount of history kept.
+
+Run from the project root to seal old months and show the catalog:
+    python txn_partitions.py --keep-open 2
+"""
+import argparse
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from change_log import change_capture_enabled, log_statement
+from typed_columns import SQL_CONVERSIONS
+
+DB_PATH = 'database/banking.db'
+VIEW_NAME = 'transactions'
+DEFAULT_PARTITION = 'transactions_default'
+# Current and previous month stay writable for late postings
+OPEN_MONTHS = 2
+
+TRANSACTION_COLUMNS = ['txn_id', 'customer_id', 'txn_type', 'amount', 'txn_time', 'status',
+                       'customer_key', 'txn_epoch', 'txn_month']
+
+PARTITION_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS {table} (
+    txn_id TEXT PRIMARY KEY,
+    customer_id TEXT,
+    txn_type TEXT,
+    amount REAL,
+    txn_time DATETIME,
+    status TEXT,
+    customer_key INTEGER,
+    txn_epoch INTEGER,
+    txn_month INTEGER,
+    FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+)
+'''
+
+PARTITION_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_{table}_customer_key_time ON {table}(customer_key, txn_time)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_epoch ON {table}(txn_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_status_month ON {table}(status, txn_month)",
+]
+
+# One row per partition; month 0 is the default partition
+PARTITION_CATALOG = '''
+CREATE TABLE IF NOT EXISTS transaction_partitions (
+    month INTEGER PRIMARY KEY,
+    table_name TEXT NOT NULL UNIQUE,
+    sealed INTEGER NOT NULL DEFAULT 0,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    compacted_at TEXT
+)
+'''
+
+SEAL_OPERATIONS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def month_key(value):
+    """YYYYMM integer for a date, datetime or date string."""
+    ts = pd.Timestamp(value)
+    return ts.year * 100 + ts.month
+
+
+def add_months(month, count):
+    """Shift a YYYYMM key by a number of months."""
+    index = (month // 100) * 12 + (month % 100 - 1) + count
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def partition_name(month):
+    return f"transactions_p{month}" if month else DEFAULT_PARTITION
+
+
+def _object_type(conn, name):
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def list_partitions(conn):
+    """Catalog rows as (month, table_name, sealed), oldest month first."""
+    return conn.execute(
+        "SELECT month, table_name, sealed FROM transaction_partitions ORDER BY month"
+    ).fetchall()
+
+
+def partition_tables(conn, start=None, end=None):
+    """
+    Partition tables that can hold rows with start <= txn_time < end.
+    Months outside the range are pruned; the default partition is kept
+    whenever it has rows, since it may hold any month.
+    """
+    start_month = month_key(start) if start is not None else None
+    end_month = month_key(pd.Timestamp(end) - pd.Timedelta(seconds=1)) if end is not None else None
+    tables = []
+    for month, table_name, _ in list_partitions(conn):
+        if month == 0:
+            if conn.execute(f"SELECT 1 FROM {table_name} LIMIT 1").fetchone():
+                tables.append(table_name)
+            continue
+        if start_month is not None and month < start_month:
+            continue
+        if end_month is not None and month > end_month:
+            continue
+        tables.append(table_name)
+    return tables
+
+
+def transactions_sql(conn, start=None, end=None):
+    """
+    SELECT over only the partitions overlapping [start, end), with the
+    range applied to txn_epoch inside every branch.
+    """
+    bounds = epoch_bounds(start, end)
+    where = f" WHERE {' AND '.join(bounds)}" if bounds else ""
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    tables = partition_tables(conn, start, end) or [DEFAULT_PARTITION]
+    return "\nUNION ALL\n".join(f"SELECT {columns} FROM {table}{where}" for table in tables)
+
+
+def epoch_bounds(start=None, end=None):
+    """txn_epoch predicates for [start, end), as a list of SQL terms."""
+    bounds = []
+    if start is not None:
+        bounds.append(f"txn_epoch >= {int(pd.Timestamp(start).timestamp())}")
+    if end is not None:
+        bounds.append(f"txn_epoch < {int(pd.Timestamp(end).timestamp())}")
+    return bounds
+
+
+def with_transactions(sql, body):
+    """
+    Prefix sql with a "transactions" CTE over body, which shadows the
+    view for this statement (works in SQLite and DuckDB).
+    """
+    cte = f"transactions AS (\n{body}\n)"
+    stripped = sql.lstrip()
+    if stripped[:4].upper() == "WITH":
+        return f"WITH {cte},{stripped[4:]}"
+    return f"WITH {cte}\n{sql}"
+
+
+def scoped_query(conn, sql, start=None, end=None):
+    """
+    Run-ready SQL where "transactions" only covers [start, end).
+    """
+    return with_transactions(sql, transactions_sql(conn, start, end))
+
+
+def _routed_values(prefix="NEW", customer_key=None):
+    """Column values for a routed row; derived columns are recomputed."""
+    values = [f"{prefix}.{column}" for column in TRANSACTION_COLUMNS[:6]]
+    customer_key = customer_key or f"{prefix}.customer_key"
+    values.append(f"COALESCE(NULLIF({customer_key}, ''), "
+                  f"(SELECT customer_key FROM customer_keys WHERE customer_id = {prefix}.customer_id))")
+    values.append(SQL_CONVERSIONS["epoch"].format(col=f"{prefix}.txn_time"))
+    values.append(SQL_CONVERSIONS["month"].format(col=f"{prefix}.txn_time"))
+    return ", ".join(values)
+
+
+def refresh_partition_view(conn):
+    """
+    (Re)create the transactions view and its routing triggers from the
+    catalog. Dropping the view drops its triggers with it.
+    """
+    cursor = conn.cursor()
+    partitions = list_partitions(conn)
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    months = [month for month, _, _ in partitions if month]
+
+    cursor.execute(f"DROP VIEW IF EXISTS {VIEW_NAME}")
+    cursor.execute(f"CREATE VIEW {VIEW_NAME} AS\n" + "\nUNION ALL\n".join(
+        f"SELECT {columns} FROM {table_name}" for _, table_name, _ in partitions
+    ))
+
+    # Writes through the view are logged here rather than on the partitions,
+    # so compaction and partition moves do not show up as changes
+    capture = change_capture_enabled(conn)
+
+    def logged(op, key="NEW.txn_id", when=None):
+        return log_statement(VIEW_NAME, key, op, when) if capture else ""
+
+    def routes(values):
+        # One guarded INSERT per partition, the rest to the default
+        month_expr = SQL_CONVERSIONS["month"].format(col="NEW.txn_time")
+        statements = [
+            f"INSERT INTO {partition_name(month)} ({columns}) SELECT {values} "
+            f"WHERE {month_expr} = {month};"
+            for month in months
+        ]
+        statements.append(
+            f"INSERT INTO {DEFAULT_PARTITION} ({columns}) SELECT {values} "
+            f"WHERE COALESCE({month_expr}, 0) NOT IN ({', '.join(str(m) for m in months)});"
+        )
+        return chr(10).join(statements)
+
+    cursor.execute(f'''
+    CREATE TRIGGER trg_transactions_route_insert
+    INSTEAD OF INSERT ON {VIEW_NAME}
+    BEGIN
+        SELECT RAISE(ABORT, 'UNIQUE constraint failed: transactions.txn_id')
+        WHERE EXISTS (SELECT 1 FROM {VIEW_NAME} WHERE txn_id = NEW.txn_id);
+        {routes(_routed_values())}
+        {logged("I")}
+    END
+    ''')
+
+    # Deletes: probe only the row's own month partition (and the default)
+    deletes = [
+        f"DELETE FROM {partition_name(month)} WHERE OLD.txn_month = {month} AND txn_id = OLD.txn_id;"
+        for month in months
+    ]
+    deletes.append(f"DELETE FROM {DEFAULT_PARTITION} WHERE txn_id = OLD.txn_id;")
+    cursor.execute(f'''
+    CREATE TRIGGER trg_transactions_route_delete
+    INSTEAD OF DELETE ON {VIEW_NAME}
+    BEGIN
+        {chr(10).join(deletes)}
+        {logged("D", "OLD.txn_id")}
+    END
+    ''')
+
+    # Updates: move the row, since a new txn_time may change its month.
+    # customer_key is re-resolved when customer_id changes.
+    customer_key = "CASE WHEN NEW.customer_id IS OLD.customer_id THEN NEW.customer_key END"
+    cursor.execute(f'''
+    CREATE TRIGGER trg_transactions_route_update
+    INSTEAD OF UPDATE ON {VIEW_NAME}
+    BEGIN
+        SELECT RAISE(ABORT, 'UNIQUE constraint failed: transactions.txn_id')
+        WHERE NEW.txn_id IS NOT OLD.txn_id
+        AND EXISTS (SELECT 1 FROM {VIEW_NAME} WHERE txn_id = NEW.txn_id);
+        {chr(10).join(deletes)}
+        {routes(_routed_values(customer_key=customer_key))}
+        {logged("U", when="NEW.txn_id IS OLD.txn_id")}
+        {logged("D", "OLD.txn_id", when="NEW.txn_id IS NOT OLD.txn_id")}
+        {logged("I", when="NEW.txn_id IS NOT OLD.txn_id")}
+    END
+    ''')
+    conn.commit()
+
+
+def _create_partition(conn, month):
+    table_name = partition_name(month)
+    cursor = conn.cursor()
+    cursor.execute(PARTITION_SCHEMA.format(table=table_name))
+    for statement in PARTITION_INDEXES:
+        cursor.execute(statement.format(table=table_name))
+    cursor.execute(
+        "INSERT OR IGNORE INTO transaction_partitions (month, table_name) VALUES (?, ?)",
+        (month, table_name),
+    )
+    return table_name
+
+
+def reset_partitions(conn):
+    """
+    Drop the transactions view and every partition, then start over with
+    an empty catalog and default partition.
+    """
+    cursor = conn.cursor()
+    kind = _object_type(conn, VIEW_NAME)
+    if kind == 'view':
+        cursor.execute(f"DROP VIEW {VIEW_NAME}")
+    elif kind == 'table':
+        cursor.execute(f"DROP TABLE {VIEW_NAME}")
+
+    partitions = [row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' "
+        "AND (name LIKE 'transactions\\_p%' ESCAPE '\\' OR name = ?)", (DEFAULT_PARTITION,)
+    ).fetchall()]
+    for table_name in partitions:
+        cursor.execute(f"DROP TABLE {table_name}")
+    cursor.execute("DROP TABLE IF EXISTS transaction_partitions")
+    cursor.execute(PARTITION_CATALOG)
+    _create_partition(conn, 0)
+    refresh_partition_view(conn)
+
+
+def ensure_partition(conn, month, refresh=True):
+    """
+    Partition table for a YYYYMM month, created on first use. Rows of that
+    month parked in the default partition move into it.
+    """
+    table_name = partition_name(month)
+    if _object_type(conn, table_name) == 'table':
+        return table_name
+
+    _create_partition(conn, month)
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    conn.execute(f"INSERT INTO {table_name} ({columns}) "
+                 f"SELECT {columns} FROM {DEFAULT_PARTITION} WHERE txn_month = ?", (month,))
+    conn.execute(f"DELETE FROM {DEFAULT_PARTITION} WHERE txn_month = ?", (month,))
+    if refresh:
+        refresh_partition_view(conn)
+    return table_name
+
+
+def ensure_upcoming_partitions(conn, as_of=None, ahead=1):
+    """Pre-create partitions for the current month and the next `ahead`."""
+    current = month_key(as_of or datetime.now())
+    for offset in range(ahead + 1):
+        ensure_partition(conn, add_months(current, offset), refresh=False)
+    refresh_partition_view(conn)
+
+
+def insert_partitioned(conn, df):
+    """
+    Bulk-load a prepared transactions frame (with typed columns) straight
+    into its month partitions.
+    """
+    months = df['txn_month'].fillna(0).astype('int64')
+    for month, part in df.groupby(months):
+        table_name = ensure_partition(conn, int(month), refresh=False) if month else DEFAULT_PARTITION
+        part[TRANSACTION_COLUMNS].to_sql(table_name, conn, if_exists='append', index=False)
+    refresh_partition_view(conn)
+    refresh_row_counts(conn)
+
+
+def refresh_row_counts(conn):
+    for _, table_name, _ in list_partitions(conn):
+        conn.execute("UPDATE transaction_partitions SET row_count = "
+                     f"(SELECT COUNT(*) FROM {table_name}) WHERE table_name = ?", (table_name,))
+    conn.commit()
+
+
+def _create_seal_triggers(conn, table_name):
+    for operation in SEAL_OPERATIONS:
+        conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_sealed_{operation.lower()}
+        BEFORE {operation} ON {table_name}
+        BEGIN
+            SELECT RAISE(ABORT, '{table_name} is sealed (read-only)');
+        END
+        ''')
+
+
+def _drop_seal_triggers(conn, table_name):
+    for operation in SEAL_OPERATIONS:
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_sealed_{operation.lower()}")
+
+
+def compact_partition(conn, table_name):
+    """
+    Rewrite a partition in txn_epoch order so time-range scans read
+    neighbouring rows; freed pages are returned by the VACUUM that
+    follows sealing.
+    """
+    columns = ", ".join(TRANSACTION_COLUMNS)
+    conn.execute(f"CREATE TEMP TABLE compact_rows AS SELECT {columns} FROM {table_name} "
+                 "ORDER BY txn_epoch, txn_id")
+    conn.execute(f"DELETE FROM {table_name}")
+    conn.execute(f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM compact_rows")
+    conn.execute("DROP TABLE temp.compact_rows")
+
+
+def seal_partitions(conn, keep_open=OPEN_MONTHS, as_of=None):
+    """
+    Compact and seal every month partition older than the open window.
+    Returns the sealed table names.
+    """
+    cutoff = add_months(month_key(as_of or datetime.now()), -(keep_open - 1))
+    to_seal = [(month, table_name) for month, table_name, sealed in list_partitions(conn)
+               if month and not sealed and month < cutoff]
+    for month, table_name in to_seal:
+        compact_partition(conn, table_name)
+        _create_seal_triggers(conn, table_name)
+        conn.execute(
+            "UPDATE transaction_partitions SET sealed = 1, compacted_at = ?, "
+            f"row_count = (SELECT COUNT(*) FROM {table_name}) WHERE month = ?",
+            (datetime.now().isoformat(timespec='seconds'), month),
+        )
+    conn.commit()
+
+    if to_seal:
+        for table_name in (name for _, name in to_seal):
+            conn.execute(f"ANALYZE {table_name}")
+        conn.commit()
+        if conn.execute("PRAGMA freelist_count").fetchone()[0]:
+            conn.execute("VACUUM")
+    return [name for _, name in to_seal]
+
+
+@contextmanager
+def unsealed(conn):
+    """
+    Temporarily lift the read-only guard on sealed partitions, for
+    maintenance such as backfills or benchmark scaling.
+    """
+    sealed = [table_name for _, table_name, is_sealed in list_partitions(conn) if is_sealed]
+    for table_name in sealed:
+        _drop_seal_triggers(conn, table_name)
+    try:
+        yield sealed
+    finally:
+        for table_name in sealed:
+            _create_seal_triggers(conn, table_name)
+        conn.commit()
+
+
+def partition_status(conn):
+    """The partition catalog with live row counts, as a DataFrame."""
+    refresh_row_counts(conn)
+    return pd.read_sql_query(
+        "SELECT month, table_name, sealed, row_count, compacted_at "
+        "FROM transaction_partitions ORDER BY month", conn
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain BankSight transaction partitions")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--keep-open", type=int, default=OPEN_MONTHS,
+                        help="most recent months that stay writable")
+    parser.add_argument("--status", action="store_true", help="only show the catalog")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if not args.status:
+            ensure_upcoming_partitions(conn)
+            sealed = seal_partitions(conn, args.keep_open)
+            print(f"✓ Sealed {len(sealed)} partitions" + (f": {', '.join(sealed)}" if sealed else ""))
+        print(partition_status(conn).to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
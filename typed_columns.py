@@ -0,0 +1,120 @@
+"""
+Typed date columns.
+Dates arrive as ISO text ('%Y-%m-%d' or '%Y-%m-%d %H:%M:%S'). Next to each
+one the loader stores an integer column (days or seconds since the Unix
+epoch, or a YYYYMM month key) that triggers keep in step with later
+writes. Queries filter and group on the integers, so date predicates are
+index range scans instead of per-row strftime/julianday calls. The text
+columns stay as the display and CRUD form values.
+"""
+import pandas as pd
+
+EPOCH = pd.Timestamp("1970-01-01")
+
+# Table -> {typed column: (source text column, kind)}
+TYPED_DATE_COLUMNS = {
+    "customers": {
+        "join_day": ("join_date", "day"),
+    },
+    "transactions": {
+        "txn_epoch": ("txn_time", "epoch"),
+        "txn_month": ("txn_time", "month"),
+    },
+    "loans": {
+        "start_day": ("Start_Date", "day"),
+        "end_day": ("End_Date", "day"),
+    },
+    "credit_cards": {
+        "issued_day": ("Issued_Date", "day"),
+        "expiry_day": ("Expiry_Date", "day"),
+    },
+    "support_tickets": {
+        "opened_day": ("Date_Opened", "day"),
+        "closed_day": ("Date_Closed", "day"),
+    },
+}
+
+# Kind -> SQLite expression over a text value ({col}); '' counts as NULL
+SQL_CONVERSIONS = {
+    "day": "CAST(julianday(NULLIF({col}, '')) - 2440587.5 AS INTEGER)",
+    "epoch": "CAST(strftime('%s', NULLIF({col}, '')) AS INTEGER)",
+    "month": "CAST(strftime('%Y%m', NULLIF({col}, '')) AS INTEGER)",
+}
+
+TYPED_COLUMN_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_customers_join_day ON customers(join_day)",
+    "CREATE INDEX IF NOT EXISTS idx_loans_start_day ON loans(start_day)",
+    "CREATE INDEX IF NOT EXISTS idx_support_tickets_closed_day ON support_tickets(closed_day)",
+    "CREATE INDEX IF NOT EXISTS idx_support_tickets_rating ON support_tickets(Customer_Rating)",
+]
+
+
+def epoch_day(value):
+    """Days since 1970-01-01 for a date string or date, e.g. '2023-01-01' -> 19358."""
+    return (pd.Timestamp(value).normalize() - EPOCH).days
+
+
+def _convert(series, kind):
+    """Vectorized text -> integer conversion matching SQL_CONVERSIONS."""
+    parsed = pd.to_datetime(series.replace("", None), errors="coerce")
+    if kind == "day":
+        values = (parsed - EPOCH).dt.days
+    elif kind == "epoch":
+        values = (parsed - EPOCH) // pd.Timedelta(seconds=1)
+    else:
+        values = parsed.dt.year * 100 + parsed.dt.month
+    return values.astype("Int64")
+
+
+def attach_typed_columns(df, table_name):
+    """
+    Add the typed date columns to a dataset before it is loaded.
+    """
+    columns = TYPED_DATE_COLUMNS.get(table_name)
+    if not columns:
+        return df
+    df = df.copy()
+    for typed, (source, kind) in columns.items():
+        df[typed] = _convert(df[source], kind)
+    return df
+
+
+def ensure_typed_column_indexes(conn):
+    """
+    Create the indexes that serve date ranges and rating filters.
+    """
+    cursor = conn.cursor()
+    for statement in TYPED_COLUMN_INDEXES:
+        cursor.execute(statement)
+    conn.commit()
+
+
+def ensure_typed_column_triggers(conn):
+    """
+    Keep typed columns populated for rows written outside the loader.
+    """
+    cursor = conn.cursor()
+    for table_name, columns in TYPED_DATE_COLUMNS.items():
+        # Partitioned transactions compute these in their routing triggers
+        if table_name == "transactions":
+            continue
+        assignments = ", ".join(
+            f"{typed} = {SQL_CONVERSIONS[kind].format(col=source)}"
+            for typed, (source, kind) in columns.items()
+        )
+        sources = ", ".join(dict.fromkeys(source for source, _ in columns.values()))
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_typed_dates_insert
+        AFTER INSERT ON {table_name}
+        BEGIN
+            UPDATE {table_name} SET {assignments} WHERE rowid = NEW.rowid;
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_typed_dates_update
+        AFTER UPDATE OF {sources} ON {table_name}
+        BEGIN
+            UPDATE {table_name} SET {assignments} WHERE rowid = NEW.rowid;
+        END
+        ''')
+    conn.commit()
@@ -0,0 +1,27 @@
+"""
+Per-page views for the BankSight dashboard.
+app.py imports only the selected page's module, so heavy dependencies
+such as Plotly and DuckDB load the first time a page needs them instead
+of on every startup. Each module exposes render(ctx).
+"""
+import importlib
+
+# Sidebar label -> module in this package
+PAGES = {
+    "🏠 Introduction": "introduction",
+    "📊 View Tables": "view_tables",
+    "🔍 Filter Data": "filter_data",
+    "👤 Customer 360": "customer_lookup",
+    "✏️ CRUD Operations": "crud",
+    "💰 Credit/Debit Simulation": "simulation",
+    "🧠 Analytical Insights": "insights",
+    "🎫 Support Backlog": "support_backlog",
+    "👩‍💻 About Creator": "about",
+}
+
+
+def load_page(label):
+    """
+    Import (once per process) and return the module for a sidebar label.
+    """
+    return importlib.import_module(f"{__name__}.{PAGES[label]}")
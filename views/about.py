@@ -0,0 +1,77 @@
+"""
+About Creator page.
+"""
+import streamlit as st
+
+
+def render(ctx):
+    st.markdown('<p class="main-header">👩‍💻 About the Creator</p>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        # Placeholder for profile image
+        st.image("https://via.placeholder.com/300x300.png?text=Your+Photo", width=250)
+    
+    with col2:
+        st.markdown("""
+        ## [Your Name]
+        ### Banking Analytics & Data Science Professional
+        
+        ---
+        
+        **Expertise:**
+        - Banking & Financial Analytics
+        - Data Engineering
+        - SQL & Database Design
+        - Python Development
+        - Streamlit Applications
+        - Machine Learning & AI
+        
+        ---
+        
+        **Contact Information:**
+        - 📧 Email: your.email@example.com
+        - 💼 LinkedIn: linkedin.com/in/yourprofile
+        - 🐱 GitHub: github.com/yourusername
+        - 🌐 Portfolio: yourwebsite.com
+        
+        ---
+        
+        **About This Project:**
+        
+        BankSight was developed as a comprehensive banking analytics platform to demonstrate:
+        - Full-stack data application development
+        - Database design and SQL query optimization
+        - Interactive data visualization
+        - Real-world banking operations simulation
+        - CRUD operations and data management
+        
+        The project integrates 7 datasets with 17+ analytical queries to provide actionable insights
+        for banking operations, fraud detection, and customer behavior analysis.
+        """)
+    
+    st.markdown("---")
+    
+    st.markdown("""
+    ### 🏆 Project Achievements
+    
+    - ✅ Integrated 7 comprehensive banking datasets
+    - ✅ Implemented 17+ analytical SQL queries
+    - ✅ Built full CRUD functionality for all tables
+    - ✅ Created interactive filtering system
+    - ✅ Developed credit/debit transaction simulator
+    - ✅ Designed responsive UI with Streamlit
+    - ✅ Implemented data visualization with Plotly
+    
+    ---
+    
+    ### 🙏 Acknowledgments
+    
+    Special thanks to all the open-source libraries and frameworks that made this project possible:
+    - Streamlit
+    - Pandas
+    - SQLite
+    - Plotly
+    - Python Community
+    """)
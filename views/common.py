@@ -0,0 +1,133 @@
+"""
+Shared resources for the page views.
+Connections and services are created once per process with
+st.cache_resource, and only when the first page that needs them runs.
+"""
+import os
+import sqlite3
+
+import streamlit as st
+
+from Scripts.result_store import data_version, get_result_store
+
+DB_PATH = 'database/banking.db'
+
+
+@st.cache_resource
+def get_database_connection():
+    """
+    Create and return database connection. Statements the app runs are
+    captured for the index advisor.
+    """
+    # Plain import: the same module (and recorder) backends and sql_queries use
+    from index_advisor import start_capture, trace_connection
+
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    start_capture(DB_PATH)
+    trace_connection(conn)
+    return conn
+
+
+@st.cache_resource
+def get_sqlite_backend():
+    """Arrow-backed reader for display queries; writes keep using the connection."""
+    from Scripts.backends import SQLiteBackend
+
+    return SQLiteBackend(get_database_connection())
+
+
+@st.cache_resource
+def get_snapshot_manager():
+    """
+    Read-only snapshot of banking.db for analytics, republished in the
+    background while the app runs.
+    """
+    from Scripts.analytics_snapshot import SnapshotManager, SnapshotPublisher
+
+    manager = SnapshotManager(DB_PATH)
+    manager.current()
+    SnapshotPublisher(DB_PATH).start()
+    return manager
+
+
+@st.cache_resource
+def get_approx_refresher():
+    """
+    Background refresh of the samples and sketches behind approximate
+    answers, so reads never write to the shared connection.
+    """
+    from Scripts.approx_analytics import ApproxRefresher
+
+    refresher = ApproxRefresher(DB_PATH)
+    refresher.start()
+    return refresher
+
+
+@st.cache_resource
+def get_query_router():
+    """
+    Route scan-heavy analytics to DuckDB when available; the rest reads
+    the SQLite snapshot, away from CRUD writes.
+    """
+    from Scripts.backends import PARQUET_DIR, QueryRouter, create_analytics_backend
+
+    parquet_dir = PARQUET_DIR if os.path.isdir(PARQUET_DIR) else None
+    return QueryRouter(get_snapshot_manager(), create_analytics_backend(parquet_dir=parquet_dir))
+
+
+@st.cache_resource
+def get_posting_queue():
+    """Single writer for balance postings from every session."""
+    from Scripts.posting_queue import PostingQueue
+
+    return PostingQueue(DB_PATH)
+
+
+def snapshot_age():
+    """Seconds since the analytics snapshot was published, or None."""
+    from Scripts.analytics_snapshot import snapshot_age as pointer_age
+
+    return pointer_age(DB_PATH)
+
+
+@st.cache_resource
+def get_customer_360_service():
+    """Create the shared Customer 360 service and its lookup indexes."""
+    from Scripts.customer_360 import Customer360Service, ensure_profile_indexes
+
+    conn = get_database_connection()
+    ensure_profile_indexes(conn)
+    return Customer360Service(conn)
+
+
+class PageContext:
+    """
+    What a page needs for one rerun. Backends and services are looked up
+    on first access, so pages that never use them never create them.
+    """
+
+    def __init__(self, session_state):
+        self.conn = get_database_connection()
+        # Results survive reruns until the data version changes
+        self.result_store = get_result_store(session_state)
+        self.current_version = data_version(self.conn)
+
+    @property
+    def oltp(self):
+        return get_sqlite_backend()
+
+    @property
+    def router(self):
+        return get_query_router()
+
+    @property
+    def approx_refresher(self):
+        return get_approx_refresher()
+
+    @property
+    def customer_360(self):
+        return get_customer_360_service()
+
+    @property
+    def postings(self):
+        return get_posting_queue()
@@ -0,0 +1,237 @@
+"""
+CRUD Operations page: create, read, update and delete records, one at a
+time or in bulk from an uploaded file.
+"""
+import hashlib
+
+import pandas as pd
+import streamlit as st
+
+from Scripts.backends import database_file
+from Scripts.typed_columns import TYPED_DATE_COLUMNS
+
+
+def _form_value(value):
+    """Blank form fields are stored as NULL, not ''."""
+    return None if value.strip() == "" else value
+
+
+def _render_bulk(ctx, table_name):
+    """Upload, validate, preview and apply a file of changes."""
+    from Scripts.bulk_crud import (
+        BATCH_ROWS,
+        apply_bulk,
+        connect,
+        diff_preview,
+        read_upload,
+        stage_rows,
+        table_schema,
+        validate_upload,
+    )
+
+    st.markdown("### 📦 Bulk Upload")
+    st.caption("One row per record. Upsert inserts new keys and updates existing ones; "
+               "update and delete match rows on the key column.")
+    operation = st.radio("Bulk operation:", ["upsert", "update", "delete"], horizontal=True)
+    uploaded = st.file_uploader("CSV or Parquet file:", type=["csv", "parquet"])
+    if uploaded is None:
+        return
+
+    data = uploaded.getvalue()
+    df = read_upload(uploaded.name, data)
+    # Each bulk change stages on its own connection, so sessions never
+    # share a temp table with each other or with the page's connection
+    bulk_conn = connect(database_file(ctx.conn))
+    try:
+        schema = table_schema(bulk_conn, table_name)
+        clean, problems = validate_upload(df, schema, operation)
+        if len(problems):
+            st.error(f"❌ {len(problems)} problems found; nothing will be applied until they are fixed.")
+            st.dataframe(problems, use_container_width=True)
+            return
+        
+        stage_rows(bulk_conn, clean, schema)
+        summary, sample = diff_preview(bulk_conn, table_name, schema)
+        
+        col1, col2, col3 = st.columns(3)
+        if operation == "delete":
+            col1.metric("Rows to delete", f"{summary['matched']:,}")
+            col2.metric("Keys not found", f"{summary['not_found']:,}")
+        else:
+            col1.metric("Rows changed", f"{summary['changed']:,}")
+            col2.metric("Unchanged", f"{summary['unchanged']:,}")
+            label = "New rows" if operation == "upsert" else "Keys not found"
+            col3.metric(label, f"{summary['not_found']:,}")
+        if len(sample):
+            st.markdown("**Preview**" + (" (rows to delete)" if operation == "delete" else " (old → new)"))
+            st.dataframe(sample, use_container_width=True)
+        
+        # Only apply the file that was previewed
+        digest = hashlib.sha256(data).hexdigest()
+        if st.button(f"🚀 Apply {operation} to {len(clean):,} rows", type="primary"):
+            progress = st.progress(0.0)
+            stats = apply_bulk(bulk_conn, table_name, schema, operation, BATCH_ROWS,
+                               progress=lambda done, total: progress.progress(done / total))
+            ctx.customer_360.clear()
+            st.session_state["bulk_applied"] = digest
+            st.success(f"✅ {operation.capitalize()} applied: {stats['rows']:,} rows in "
+                       f"{stats['batches']} batches, {stats['seconds'] * 1000:.0f} ms "
+                       f"({stats['rows_per_sec']:,.0f} rows/s)")
+        elif st.session_state.get("bulk_applied") == digest:
+            st.info("ℹ️ This file has already been applied.")
+    except Exception as e:
+        st.error(f"❌ Error: {e}")
+    finally:
+        bulk_conn.close()
+
+
+def render(ctx):
+    conn = ctx.conn
+    oltp = ctx.oltp
+    customer_360 = ctx.customer_360
+    
+    st.markdown('<p class="main-header">✏️ CRUD Operations</p>', unsafe_allow_html=True)
+    
+    tables = {
+        "Customers": "customers",
+        "Accounts": "accounts",
+        "Transactions": "transactions",
+        "Support Tickets": "support_tickets"
+    }
+    
+    operation = st.radio("Select Operation:", ["Create", "Read", "Update", "Delete", "Bulk Upload"])
+    
+    selected_table = st.selectbox("Select Table:", list(tables.keys()))
+    table_name = tables[selected_table]
+    
+    # Get columns
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns_info = cursor.fetchall()
+    # Typed date columns are derived by triggers, so forms leave them out
+    derived = TYPED_DATE_COLUMNS.get(table_name, {})
+    column_names = [col[1] for col in columns_info if col[1] not in derived]
+    
+    st.markdown("---")
+    
+    if operation == "Bulk Upload":
+        _render_bulk(ctx, table_name)
+        return
+    
+    # CREATE OPERATION
+    if operation == "Create":
+        st.markdown("### ➕ Create New Record")
+        
+        with st.form("create_form"):
+            new_record = {}
+            
+            for col in column_names:
+                new_record[col] = st.text_input(f"{col}:")
+            
+            submitted = st.form_submit_button("Create Record")
+            
+            if submitted:
+                try:
+                    cols = ", ".join(column_names)
+                    placeholders = ", ".join(["?" for _ in column_names])
+                    values = [_form_value(new_record[col]) for col in column_names]
+                    
+                    insert_query = f"INSERT INTO {table_name} ({cols}) VALUES ({placeholders})"
+                    cursor.execute(insert_query, values)
+                    conn.commit()
+                    customer_360.invalidate_record(table_name, new_record)
+                    
+                    st.success("✅ Record created successfully!")
+                except Exception as e:
+                    st.error(f"❌ Error: {e}")
+    
+    # READ OPERATION
+    elif operation == "Read":
+        st.markdown("### 🔍 Read Records")
+        
+        search_col = st.selectbox("Search by column:", column_names)
+        search_value = st.text_input(f"Enter {search_col} value:")
+        
+        if st.button("Search"):
+            try:
+                query = f"SELECT * FROM {table_name} WHERE {search_col} LIKE '%{search_value}%'"
+                df = oltp.read_frame(query)
+                
+                st.dataframe(df, use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Error: {e}")
+    
+    # UPDATE OPERATION
+    elif operation == "Update":
+        st.markdown("### ✏️ Update Record")
+        
+        primary_key = column_names[0]  # Assume first column is primary key
+        
+        record_id = st.text_input(f"Enter {primary_key} to update:")
+        
+        if record_id:
+            # Fetch existing record
+            query = f"SELECT * FROM {table_name} WHERE {primary_key} = '{record_id}'"
+            existing_df = pd.read_sql_query(query, conn)
+            
+            if len(existing_df) > 0:
+                st.info("Current values:")
+                st.dataframe(existing_df)
+                
+                with st.form("update_form"):
+                    updated_record = {}
+                    
+                    for col in column_names[1:]:  # Skip primary key
+                        current_value = existing_df.iloc[0][col]
+                        current_value = "" if pd.isna(current_value) else str(current_value)
+                        updated_record[col] = st.text_input(f"{col}:", value=current_value)
+                    
+                    submitted = st.form_submit_button("Update Record")
+                    
+                    if submitted:
+                        try:
+                            set_clause = ", ".join([f"{col} = ?" for col in column_names[1:]])
+                            values = [_form_value(updated_record[col]) for col in column_names[1:]]
+                            values.append(record_id)
+                            
+                            update_query = f"UPDATE {table_name} SET {set_clause} WHERE {primary_key} = ?"
+                            cursor.execute(update_query, values)
+                            conn.commit()
+                            customer_360.invalidate_record(table_name, existing_df.iloc[0].to_dict())
+                            customer_360.invalidate_record(table_name, updated_record)
+                            
+                            st.success("✅ Record updated successfully!")
+                        except Exception as e:
+                            st.error(f"❌ Error: {e}")
+            else:
+                st.warning("No record found with that ID")
+    
+    # DELETE OPERATION
+    elif operation == "Delete":
+        st.markdown("### 🗑️ Delete Record")
+        
+        primary_key = column_names[0]
+        
+        record_id = st.text_input(f"Enter {primary_key} to delete:")
+        
+        if record_id:
+            # Show record to be deleted
+            query = f"SELECT * FROM {table_name} WHERE {primary_key} = '{record_id}'"
+            df = pd.read_sql_query(query, conn)
+            
+            if len(df) > 0:
+                st.warning("⚠️ You are about to delete this record:")
+                st.dataframe(df)
+                
+                if st.button("🗑️ Confirm Delete", type="primary"):
+                    try:
+                        delete_query = f"DELETE FROM {table_name} WHERE {primary_key} = ?"
+                        cursor.execute(delete_query, (record_id,))
+                        conn.commit()
+                        customer_360.invalidate_record(table_name, df.iloc[0].to_dict())
+                        
+                        st.success("✅ Record deleted successfully!")
+                    except Exception as e:
+                        st.error(f"❌ Error: {e}")
+            else:
+                st.info("No record found with that ID")
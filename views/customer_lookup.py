@@ -0,0 +1,87 @@
+"""
+Customer 360 page: one-shot customer profile lookup.
+"""
+import pandas as pd
+import streamlit as st
+
+
+def render(ctx):
+    customer_360 = ctx.customer_360
+    
+    st.markdown('<p class="main-header">👤 Customer 360</p>', unsafe_allow_html=True)
+    
+    st.markdown("Look up everything about a customer in one place. "
+                "Accepts `CUST00001` style IDs or the numeric IDs used by loans and cards.")
+    
+    lookup_id = st.text_input("Enter Customer ID (e.g., CUST00001 or 1):")
+    
+    if lookup_id:
+        profile, elapsed_ms, from_cache = customer_360.get_profile(lookup_id)
+        
+        if profile is None:
+            st.error("❌ Customer ID not found!")
+        else:
+            source = "cache" if from_cache else "database"
+            st.caption(f"⏱️ Profile loaded in {elapsed_ms:.2f} ms from {source}")
+            
+            customer = profile["customer"]
+            summary = profile["transaction_summary"]
+            
+            st.markdown(f"### {customer['name']} ({profile['customer_id']})")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("City", customer["city"])
+            
+            with col2:
+                st.metric("Account Type", customer["account_type"])
+            
+            with col3:
+                balance = profile["accounts"]["account_balance"].sum() if len(profile["accounts"]) > 0 else 0
+                st.metric("Account Balance", f"₹{balance:,.2f}")
+            
+            with col4:
+                st.metric("Transactions", f"{summary['total_transactions']:,}")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("Transaction Volume", f"₹{summary['total_volume']:,.2f}")
+            
+            with col2:
+                st.metric("Failed Transactions", f"{summary['failed']:,}")
+            
+            with col3:
+                st.metric("Loans", f"{len(profile['loans']):,}")
+            
+            with col4:
+                st.metric("Credit Cards", f"{len(profile['credit_cards']):,}")
+            
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(
+                ["👥 Profile", "💸 Recent Transactions", "📋 Loans", "💳 Credit Cards", "🎫 Support Tickets"]
+            )
+            
+            with tab1:
+                st.dataframe(pd.DataFrame([customer]), use_container_width=True)
+                st.dataframe(profile["accounts"], use_container_width=True)
+            
+            with tab2:
+                st.dataframe(profile["transactions"], use_container_width=True)
+            
+            with tab3:
+                st.dataframe(profile["loans"], use_container_width=True)
+            
+            with tab4:
+                st.dataframe(profile["credit_cards"], use_container_width=True)
+            
+            with tab5:
+                st.dataframe(profile["support_tickets"], use_container_width=True)
+    
+    with st.expander("⚙️ Profile Cache"):
+        stats = customer_360.stats()
+        st.write(f"Cached profiles: {stats['cached_profiles']} / {stats['max_profiles']} "
+                 f"(hits: {stats['hits']}, misses: {stats['misses']})")
+        if st.button("Clear Cache"):
+            customer_360.clear()
+            st.success("✅ Profile cache cleared")
@@ -0,0 +1,122 @@
+"""
+Filter Data page: multi-column filters over any table.
+"""
+import streamlit as st
+
+from Scripts.arrow_results import frame_to_csv_bytes
+from Scripts.customer_segments import SEGMENTS, refresh_segments, segments_available
+from Scripts.result_store import ResultStore
+
+
+def render(ctx):
+    conn = ctx.conn
+    oltp = ctx.oltp
+    result_store = ctx.result_store
+    current_version = ctx.current_version
+    
+    st.markdown('<p class="main-header">🔍 Filter Data</p>', unsafe_allow_html=True)
+    
+    tables = {
+        "Customers": "customers",
+        "Accounts": "accounts",
+        "Transactions": "transactions",
+        "Branches": "branches",
+        "Loans": "loans",
+        "Credit Cards": "credit_cards",
+        "Support Tickets": "support_tickets",
+        "Customer Segments": "customer_segments"
+    }
+    
+    selected_table = st.selectbox("Select a table:", list(tables.keys()))
+    table_name = tables[selected_table]
+    
+    # Get columns
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns_info = cursor.fetchall()
+    column_names = [col[1] for col in columns_info]
+    
+    st.markdown("### Apply Filters")
+    
+    # Multi-select for columns to filter
+    filter_columns = st.multiselect("Select columns to filter:", column_names)
+    
+    filters = {}
+    
+    if filter_columns:
+        for col in filter_columns:
+            st.markdown(f"**Filter: {col}**")
+            
+            # Get unique values for the column
+            unique_query = f"SELECT DISTINCT {col} FROM {table_name} WHERE {col} IS NOT NULL LIMIT 100"
+            unique_values = oltp.read_frame(unique_query)[col].tolist()
+            
+            if len(unique_values) <= 20:
+                # Use multiselect for small number of unique values
+                selected_values = st.multiselect(f"Select {col} values:", unique_values)
+                if selected_values:
+                    filters[col] = selected_values
+            else:
+                # Use text input for large number of unique values
+                filter_text = st.text_input(f"Enter {col} value (supports wildcards %):")
+                if filter_text:
+                    filters[col] = filter_text
+    
+    # RFM segment as a filter dimension for every customer-keyed table
+    selected_segments = []
+    if "customer_key" in column_names and table_name != "customer_segments" and segments_available(conn):
+        st.markdown("### Customer Segment")
+        selected_segments = st.multiselect("Limit to RFM segments:", SEGMENTS)
+        if st.button("🔄 Refresh segments"):
+            result = refresh_segments(conn)
+            st.success(f"{result['mode'].capitalize()} refresh: {result['written']} segment rows updated "
+                       f"in {result['seconds'] * 1000:.0f} ms")
+    
+    # Build query with filters
+    query = f"SELECT * FROM {table_name}"
+    
+    if filters or selected_segments:
+        where_clauses = []
+        if selected_segments:
+            segment_str = "', '".join(selected_segments)
+            where_clauses.append(
+                f"customer_key IN (SELECT customer_key FROM customer_segments WHERE segment IN ('{segment_str}'))"
+            )
+        for col, value in filters.items():
+            if isinstance(value, list):
+                # Multiple values - use IN clause
+                value_str = "', '".join(str(v) for v in value)
+                where_clauses.append(f"{col} IN ('{value_str}')")
+            else:
+                # Single value - use LIKE for text search
+                where_clauses.append(f"{col} LIKE '{value}'")
+        
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+    
+    filter_key = ResultStore.make_key("filter", table_name, query=query)
+    
+    if st.button("Apply Filters"):
+        st.session_state["applied_filter_key"] = filter_key
+    
+    # Keep showing the applied result while other widgets change
+    if st.session_state.get("applied_filter_key") == filter_key:
+        try:
+            df, from_cache = result_store.get_or_compute(
+                filter_key, lambda: oltp.read_frame(query), current_version
+            )
+            
+            st.success(f"Found {len(df)} records")
+            if from_cache:
+                st.caption("♻️ Served from session cache")
+            st.dataframe(df, use_container_width=True)
+            
+            # Download button
+            st.download_button(
+                label="📥 Download Filtered Data",
+                data=frame_to_csv_bytes(df),
+                file_name=f"filtered_{table_name}.csv",
+                mime="text/csv"
+            )
+        except Exception as e:
+            st.error(f"Error executing query: {e}")
@@ -0,0 +1,202 @@
+"""
+Analytical Insights page: catalog queries, charts and the transaction trend.
+The only page that charts, so Plotly is imported here rather than in app.py.
+"""
+import time
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from Scripts.arrow_results import arrow_to_frame, frame_to_csv_bytes, frame_to_parquet_bytes
+from Scripts.analytics_snapshot import format_age
+from Scripts.backends import QueryRouter, query_for_backend
+from Scripts.chart_data import TIME_BUCKETS, prepare_chart_data, time_bucket_sql
+from Scripts.result_store import ResultStore
+from Scripts.sql_queries import execute_query, get_all_queries
+from Scripts.txn_archive import read_with_archive, touches_transactions
+
+# Transaction window label -> months of history (None = everything)
+TXN_WINDOWS = {"All time": None, "Last 12 months": 12, "Last 6 months": 6, "Last 3 months": 3}
+
+
+def window_start(label):
+    """First day of the earliest month in a window, or None for all time."""
+    months = TXN_WINDOWS[label]
+    if not months:
+        return None
+    return (pd.Timestamp.now().normalize() - pd.DateOffset(months=months)).replace(day=1)
+
+
+def render(ctx):
+    conn = ctx.conn
+    result_store = ctx.result_store
+    current_version = ctx.current_version
+    
+    st.markdown('<p class="main-header">🧠 Analytical Insights</p>', unsafe_allow_html=True)
+    
+    queries = get_all_queries()
+    
+    query_options = list(queries.keys())
+    
+    selected_query = st.selectbox("Select an analytical query:", query_options)
+    
+    if selected_query:
+        query_info = queries[selected_query]
+        
+        st.markdown(f"### {selected_query}")
+        st.info(f"**Description**: {query_info['description']}")
+        
+        router = ctx.router
+        engine_options = ["Auto (DuckDB for heavy scans)", "SQLite only"]
+        if router.olap_backend is None:
+            engine_options = ["SQLite only"]
+        engine = st.radio("Query Engine:", engine_options, horizontal=True)
+        # "SQLite only" still reads the snapshot, never the live database
+        active_router = router if engine.startswith("Auto") else QueryRouter(router.oltp_backend)
+        backend = active_router.backend_for(query_info)
+        
+        # Estimates from samples and sketches in the live database, kept
+        # current by a background refresh
+        approximate = False
+        if query_info.get("approximate"):
+            ctx.approx_refresher
+            answer = st.radio("Answer:", ["Exact", "Approximate (95% error bounds)"], horizontal=True)
+            approximate = answer != "Exact"
+        
+        # Queries over transactions can be limited to recent months, which
+        # keeps archived history out of the read
+        window = "All time"
+        if touches_transactions(query_info["query"]):
+            window = st.selectbox("Transaction period:", list(TXN_WINDOWS.keys()))
+        
+        # Show SQL query
+        with st.expander("📝 View SQL Query"):
+            st.code(query_for_backend(query_info, backend), language='sql')
+        
+        # A newer snapshot is new data even when banking.db has not changed since
+        result_key = ResultStore.make_key("analytics", selected_query, window, engine=backend.name,
+                                          snapshot=getattr(backend, "snapshot_id", None),
+                                          approximate=approximate)
+        run_now = st.button("🚀 Execute Query")
+        if run_now:
+            st.session_state["executed_query_key"] = result_key
+        
+        # Chart and download widgets rerun the script; render from the store
+        if st.session_state.get("executed_query_key") == result_key:
+            try:
+                entry = None if run_now else result_store.get(result_key, current_version)
+                
+                if entry is None:
+                    start = time.perf_counter()
+                    df, description, _ = execute_query(conn, selected_query, active_router,
+                                                       start=window_start(window), approximate=approximate)
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    result_store.put(result_key, df, current_version, elapsed_ms=elapsed_ms,
+                                     description=description)
+                    from_cache = False
+                else:
+                    df = entry["df"]
+                    elapsed_ms = entry["meta"]["elapsed_ms"]
+                    description = entry["meta"].get("description", "")
+                    from_cache = True
+                
+                st.success(f"✅ Query executed successfully! Returned {len(df)} rows.")
+                engine_name = "samples and sketches" if approximate else backend.name
+                source = "session cache" if from_cache else f"{engine_name} in {elapsed_ms:.1f} ms"
+                if backend.name == "snapshot" and not approximate:
+                    source += f" (snapshot {format_age(backend.age_seconds())} old)"
+                st.caption(f"⚙️ Served by {source}")
+                if approximate:
+                    st.caption(f"🎯 {description}; "
+                               "columns ending in _moe are 95% margins of error")
+                
+                # Display results
+                st.dataframe(df, use_container_width=True)
+                
+                # Visualization (if applicable)
+                if len(df) > 0 and len(df.columns) >= 2:
+                    st.markdown("### 📊 Visualization")
+                    
+                    # Determine chart type based on data
+                    numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+                    
+                    if len(numeric_cols) >= 1:
+                        chart_type = st.selectbox("Select Chart Type:", ["Bar Chart", "Line Chart", "Pie Chart"])
+                        x_col = df.columns[0]
+                        y_col = next((col for col in numeric_cols if col != x_col), numeric_cols[0])
+                        
+                        # Aggregate / downsample before the frame is sent to the browser
+                        chart_df, chart_note = prepare_chart_data(df, x_col, y_col, chart_type)
+                        
+                        if chart_type == "Bar Chart":
+                            fig = px.bar(chart_df, x=x_col, y=y_col,
+                                        title=f"{selected_query} - Bar Chart")
+                        
+                        elif chart_type == "Line Chart":
+                            fig = px.line(chart_df, x=x_col, y=y_col,
+                                         title=f"{selected_query} - Line Chart")
+                        
+                        else:
+                            fig = px.pie(chart_df, names=x_col, values=y_col,
+                                        title=f"{selected_query} - Pie Chart")
+                        
+                        st.plotly_chart(fig, use_container_width=True)
+                        if chart_note:
+                            st.caption(f"📉 {chart_note}")
+                
+                # Download buttons
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.download_button(
+                        label="📥 Download Results as CSV",
+                        data=frame_to_csv_bytes(df),
+                        file_name=f"{selected_query.replace(' ', '_')}.csv",
+                        mime="text/csv"
+                    )
+                
+                with col2:
+                    st.download_button(
+                        label="📥 Download Results as Parquet",
+                        data=frame_to_parquet_bytes(df),
+                        file_name=f"{selected_query.replace(' ', '_')}.parquet",
+                        mime="application/octet-stream"
+                    )
+                
+            except Exception as e:
+                st.error(f"❌ Error executing query: {e}")
+
+    st.markdown("---")
+    st.markdown("### 📈 Transaction Trend")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        bucket = st.selectbox("Group by:", list(TIME_BUCKETS.keys()), index=2)
+    with col2:
+        metric = st.selectbox("Metric:", ["total_amount", "txn_count"])
+    with col3:
+        window = st.selectbox("Window:", list(TXN_WINDOWS.keys()))
+    
+    # Heavy scan: use the analytics engine when available
+    router = ctx.router
+    trend_backend = router.olap_backend or router.oltp_backend
+    trend_query = time_bucket_sql("transactions", "txn_epoch", "amount", bucket,
+                                  dialect=trend_backend.dialect, where="status = 'success'",
+                                  month_col="txn_month")
+    try:
+        # Only the month partitions (and archived months) inside the window are read
+        trend_df, _ = result_store.get_or_compute(
+            ResultStore.make_key("trend", bucket, window, engine=trend_backend.name,
+                                 snapshot=getattr(trend_backend, "snapshot_id", None)),
+            lambda: arrow_to_frame(read_with_archive(conn, trend_backend, trend_query,
+                                                     start=window_start(window))),
+            current_version,
+        )
+        chart_df, chart_note = prepare_chart_data(trend_df, "period", metric, "Line Chart")
+        fig = px.line(chart_df, x="period", y=metric, title=f"Successful transactions per {bucket.lower()}")
+        st.plotly_chart(fig, use_container_width=True)
+        if chart_note:
+            st.caption(f"📉 {chart_note}")
+    except Exception as e:
+        st.error(f"❌ Error building trend: {e}")
@@ -0,0 +1,98 @@
+"""
+Introduction page: project overview and headline counts.
+"""
+import streamlit as st
+
+
+def render(ctx):
+    conn = ctx.conn
+    
+    st.markdown('<p class="main-header">🏦 BankSight: Transaction Intelligence Dashboard</p>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    ## Welcome to BankSight
+    
+    BankSight is a comprehensive banking analytics platform designed to provide deep insights into:
+    - Customer demographics and behavior
+    - Transaction patterns and trends
+    - Loan portfolio analysis
+    - Credit card utilization
+    - Support ticket management
+    - Branch performance metrics
+    
+    ### 🎯 Project Objectives
+    
+    1. **Customer Analytics**: Profile customer transaction behavior to tailor banking products
+    2. **Fraud Detection**: Identify high-risk transactions and accounts for fraud prevention
+    3. **Performance Evaluation**: Assess branch performance based on transactions and accounts
+    4. **Interactive Queries**: Enable customers and bank officials to query transaction histories
+    
+    ### 📁 Datasets Used
+    
+    This system integrates **7 comprehensive datasets**:
+    """)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        **Core Banking Data:**
+        - 👥 **Customers** - Demographics and account info
+        - 💰 **Accounts** - Balance and transaction history
+        - 💸 **Transactions** - Detailed transaction logs
+        - 🏢 **Branches** - Branch locations and performance
+        """)
+    
+    with col2:
+        st.markdown("""
+        **Financial Products:**
+        - 📋 **Loans** - Loan details and repayment status
+        - 💳 **Credit Cards** - Card info and utilization
+        - 🎫 **Support Tickets** - Customer service interactions
+        """)
+    
+    st.markdown("---")
+    
+    # Display key metrics
+    st.markdown("### 📊 System Overview")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        total_customers = conn.execute("SELECT COUNT(*) as count FROM customers").fetchone()[0]
+        st.metric("Total Customers", f"{total_customers:,}")
+    
+    with col2:
+        total_transactions = conn.execute("SELECT COUNT(*) as count FROM transactions").fetchone()[0]
+        st.metric("Total Transactions", f"{total_transactions:,}")
+    
+    with col3:
+        total_loans = conn.execute("SELECT COUNT(*) as count FROM loans").fetchone()[0]
+        st.metric("Total Loans", f"{total_loans:,}")
+    
+    with col4:
+        total_branches = conn.execute("SELECT COUNT(*) as count FROM branches").fetchone()[0]
+        st.metric("Total Branches", f"{total_branches:,}")
+    
+    st.markdown("---")
+    
+    st.markdown("""
+    ### 🚀 Features
+    
+    - **View Tables**: Browse all datasets directly from the database
+    - **Filter Data**: Apply multi-column filters to any dataset
+    - **CRUD Operations**: Create, Read, Update, and Delete records
+    - **Credit/Debit Simulation**: Simulate banking transactions with balance validation
+    - **Analytical Insights**: Execute 17+ pre-built analytical queries
+    - **Support Backlog**: Live open tickets, aging and SLA breaches
+    
+    ---
+    
+    ### 🛠️ Technical Stack
+    
+    - **Frontend**: Streamlit
+    - **Database**: SQLite3
+    - **Data Processing**: Pandas, NumPy
+    - **Visualization**: Plotly
+    - **Language**: Python 3.8+
+    """)
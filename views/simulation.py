@@ -0,0 +1,79 @@
+"""
+Credit/Debit Simulation page: deposits and withdrawals with the minimum balance rule.
+Postings go through the shared group-commit queue (see posting_queue).
+"""
+import pandas as pd
+import streamlit as st
+
+
+def render(ctx):
+    conn = ctx.conn
+    customer_360 = ctx.customer_360
+    
+    st.markdown('<p class="main-header">💰 Credit/Debit Simulation</p>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    This module simulates real banking operations with the following rules:
+    - Minimum balance requirement: ₹1,000
+    - All transactions are logged in real-time
+    - Balance is updated immediately in the database
+    """)
+    
+    st.markdown("---")
+    
+    # Account selection
+    account_id = st.text_input("Enter Customer ID (e.g., CUST00001):")
+    
+    if account_id:
+        # Fetch account details
+        query = f"""
+        SELECT c.customer_id, c.name, c.city, a.account_balance
+        FROM customers c
+        JOIN accounts a ON c.customer_id = a.customer_id
+        WHERE c.customer_id = '{account_id}'
+        """
+        
+        account_df = pd.read_sql_query(query, conn)
+        
+        if len(account_df) > 0:
+            current_balance = account_df.iloc[0]['account_balance']
+            customer_name = account_df.iloc[0]['name']
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.success(f"**Customer**: {customer_name}")
+            
+            with col2:
+                st.success(f"**Current Balance**: ₹{current_balance:,.2f}")
+            
+            st.markdown("---")
+            
+            # Transaction type
+            transaction_type = st.radio("Select Transaction Type:", ["Deposit", "Withdraw"])
+            
+            amount = st.number_input("Enter Amount (₹):", min_value=0.01, step=100.0)
+            
+            if st.button("Process Transaction", type="primary"):
+                txn_type = "deposit" if transaction_type == "Deposit" else "withdrawal"
+                
+                # The balance check runs in the writer against the committed
+                # balance, not the one displayed above
+                try:
+                    result = ctx.postings.post(account_id, txn_type, amount)
+                except Exception as e:
+                    st.error(f"❌ Error: {e}")
+                    return
+                
+                if result["ok"]:
+                    customer_360.invalidate(account_id)
+                    label = "Deposit" if txn_type == "deposit" else "Withdrawal"
+                    st.success(f"✅ {label} of ₹{amount:,.2f} successful!")
+                    st.info(f"New Balance: ₹{result['balance']:,.2f}")
+                elif result["balance"] is None:
+                    st.error("❌ Customer ID not found!")
+                else:
+                    st.error(f"❌ {result['message']}")
+                    st.warning(f"Available for withdrawal: ₹{max(0, result['balance'] - 1000):,.2f}")
+        else:
+            st.error("❌ Customer ID not found!")
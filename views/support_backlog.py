@@ -0,0 +1,78 @@
+"""
+Support Backlog page: live open tickets, aging and SLA breaches.
+Reads the trigger-maintained backlog tables, so it costs the same however
+many tickets there are.
+"""
+import streamlit as st
+
+from Scripts.ticket_sla import AGING_BUCKETS, SLA_DAYS, ensure_ticket_backlog, ticket_backlog
+
+
+def backlog_available(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_support_tickets_backlog_insert'"
+    ).fetchone() is not None
+
+
+def render(ctx):
+    conn = ctx.conn
+
+    st.markdown('<p class="main-header">🎫 Support Backlog</p>', unsafe_allow_html=True)
+
+    st.markdown("Open tickets (`Open` or `In Progress`) against their SLA: "
+                + ", ".join(f"{priority} {days}d" for priority, days in SLA_DAYS.items()) + ".")
+
+    if not backlog_available(conn):
+        st.warning("⚠️ Backlog tables are not built yet.")
+        if st.button("🔄 Build backlog"):
+            ensure_ticket_backlog(conn)
+            st.rerun()
+        return
+
+    backlog = ticket_backlog(conn)
+    totals = backlog["totals"].iloc[0]
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Open Tickets", f"{totals['open_tickets']:,}")
+
+    with col2:
+        st.metric("SLA Breached", f"{totals['overdue']:,}")
+
+    with col3:
+        st.metric("Due Today", f"{totals['due_today']:,}")
+
+    tab1, tab2, tab3, tab4 = st.tabs(["🚨 SLA Breaches", "📋 By Priority", "👩‍💼 By Agent", "🏦 By Branch"])
+
+    aging = backlog["aging"]
+    bucket_labels = [label for label, _, _ in AGING_BUCKETS]
+
+    def aging_table(dimension, column):
+        rows = aging[aging["dimension"] == dimension]
+        table = rows.pivot_table(index="value", columns="bucket", values="open_tickets",
+                                 aggfunc="sum", fill_value=0)
+        table = table.reindex(columns=bucket_labels, fill_value=0)
+        table.index.name = column
+        return table
+
+    with tab1:
+        breaches = backlog["breaches"]
+        if len(breaches):
+            st.caption(f"Most overdue first (showing {len(breaches):,} of {totals['overdue']:,})")
+            st.dataframe(breaches, use_container_width=True)
+        else:
+            st.success("✅ No open ticket is past its SLA")
+
+    with tab2:
+        st.dataframe(backlog["by_priority"], use_container_width=True)
+        st.markdown("**Aging (days open)**")
+        st.dataframe(aging_table("priority", "Priority"), use_container_width=True)
+
+    with tab3:
+        st.dataframe(backlog["by_agent"], use_container_width=True)
+        st.markdown("**Aging (days open)**")
+        st.dataframe(aging_table("agent", "Support_Agent"), use_container_width=True)
+
+    with tab4:
+        st.dataframe(backlog["by_branch"], use_container_width=True)
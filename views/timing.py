@@ -0,0 +1,73 @@
+"""
+Startup and rerun timing for the dashboard.
+Every rerun records how long setup, the page import and the page render
+took. The sidebar report shows the last rerun, the median per page for
+this session and the process's first render.
+"""
+import statistics
+import time
+
+import streamlit as st
+
+SESSION_KEY = "rerun_timings"
+MAX_HISTORY = 100
+
+
+@st.cache_resource
+def _process_timings():
+    """Process-wide timings, shared by every session."""
+    return {"first_render_ms": None, "reruns": 0}
+
+
+class RerunTimer:
+    """
+    Splits one script run into named phases.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self._last = started
+        self.phases = []
+
+    def mark(self, phase):
+        """Close the current phase under the given name."""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    def finish(self, session_state, page):
+        """Record this run in the session history and process stats."""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        history = session_state.setdefault(SESSION_KEY, [])
+        history.append({"page": page, "total_ms": total_ms, "phases": self.phases})
+        del history[:-MAX_HISTORY]
+
+        process = _process_timings()
+        process["reruns"] += 1
+        if process["first_render_ms"] is None:
+            process["first_render_ms"] = total_ms
+        return total_ms
+
+    @staticmethod
+    def render_report(session_state):
+        """Sidebar expander with the timing report."""
+        history = session_state.get(SESSION_KEY, [])
+        if not history:
+            return
+        process = _process_timings()
+        last = history[-1]
+
+        with st.sidebar.expander("⏱️ Timing"):
+            st.caption(f"First render (this process): {process['first_render_ms']:,.0f} ms")
+            st.caption(f"Last rerun: {last['total_ms']:,.1f} ms — " + ", ".join(
+                f"{phase} {ms:,.1f}" for phase, ms in last["phases"]
+            ))
+
+            per_page = {}
+            for run in history:
+                per_page.setdefault(run["page"], []).append(run["total_ms"])
+            rows = ["| Page | Runs | Median ms |", "|---|---:|---:|"] + [
+                f"| {page} | {len(times)} | {statistics.median(times):,.1f} |"
+                for page, times in per_page.items()
+            ]
+            st.markdown("\n".join(rows))
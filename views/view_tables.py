@@ -0,0 +1,83 @@
+"""
+View Tables page: paginated browsing of each table.
+"""
+import streamlit as st
+
+from Scripts.arrow_results import frame_to_csv_bytes, frame_to_parquet_bytes
+from Scripts.result_store import ResultStore
+
+
+def render(ctx):
+    oltp = ctx.oltp
+    result_store = ctx.result_store
+    current_version = ctx.current_version
+    
+    st.markdown('<p class="main-header">📊 View Database Tables</p>', unsafe_allow_html=True)
+    
+    tables = {
+        "Customers": "customers",
+        "Accounts": "accounts",
+        "Transactions": "transactions",
+        "Branches": "branches",
+        "Loans": "loans",
+        "Credit Cards": "credit_cards",
+        "Support Tickets": "support_tickets",
+        "Customer Segments": "customer_segments"
+    }
+    
+    selected_table = st.selectbox("Select a table to view:", list(tables.keys()))
+    
+    if selected_table:
+        table_name = tables[selected_table]
+        
+        # Get record count
+        count_query = f"SELECT COUNT(*) as count FROM {table_name}"
+        count_df, _ = result_store.get_or_compute(
+            ResultStore.make_key("table_count", table_name),
+            lambda: oltp.read_frame(count_query),
+            current_version
+        )
+        record_count = count_df.iloc[0]['count']
+        
+        st.info(f"**Total Records**: {record_count:,}")
+        
+        # Pagination
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            page_size = st.selectbox("Records per page:", [10, 25, 50, 100], index=1)
+        
+        with col2:
+            total_pages = (record_count + page_size - 1) // page_size
+            current_page = st.number_input("Page:", min_value=1, max_value=total_pages, value=1)
+        
+        offset = (current_page - 1) * page_size
+        
+        # Fetch data
+        query = f"SELECT * FROM {table_name} LIMIT {page_size} OFFSET {offset}"
+        df, _ = result_store.get_or_compute(
+            ResultStore.make_key("table_page", table_name, page_size=page_size, offset=offset),
+            lambda: oltp.read_frame(query),
+            current_version
+        )
+        
+        st.dataframe(df, use_container_width=True, height=500)
+        
+        # Download buttons
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.download_button(
+                label="📥 Download as CSV",
+                data=frame_to_csv_bytes(df),
+                file_name=f"{table_name}.csv",
+                mime="text/csv"
+            )
+        
+        with col2:
+            st.download_button(
+                label="📥 Download as Parquet",
+                data=frame_to_parquet_bytes(df),
+                file_name=f"{table_name}.parquet",
+                mime="application/octet-stream"
+            )